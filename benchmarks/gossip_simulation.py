@@ -0,0 +1,349 @@
+"""Deterministic simulation of replicas of a LWW-Element-Graph gossiping merges.
+
+Simulation runs in rounds. In every write round each replica applies random
+operations, then every replica pushes its state to peers chosen by the
+topology - a peer merges the state into its own. After the write rounds
+replicas only gossip, until all of them are equal.
+
+Timestamps come from a logical clock and randomness from a seeded generator,
+so runs with the same config end with the same replicas. Measured times
+(ops/sec, merge latency) are wall times and differ between runs.
+
+Run `python -m benchmarks.gossip_simulation --help` for options.
+"""
+import argparse
+import enum
+import itertools
+import random
+import statistics
+import time
+import tracemalloc
+from functools import reduce
+from typing import NamedTuple, Optional
+
+from lww_element_graph.structures.lww_element_graph import LwwElementGraph
+from lww_element_graph.utils.timestamp import use_clock
+
+
+class Topology(enum.Enum):
+    """Indicates which peers a replica pushes its state to."""
+
+    # Next `fan_out` replicas on a ring.
+    RING = "ring"
+    # `fan_out` random replicas.
+    RANDOM = "random"
+    # All other replicas, `fan_out` is ignored.
+    FULL = "full"
+
+
+class SimulationConfig(NamedTuple):
+    """Parameters of a simulation.
+
+    Attributes:
+        replicas: number of replicas.
+        write_rounds: number of rounds with writes.
+        operations_per_round: operations applied by each replica in a write round.
+        vertices: number of distinct vertex ids operations choose from.
+        topology: how replicas choose peers.
+        fan_out: number of peers every replica pushes its state to in a round.
+        max_gossip_rounds: limit of rounds without writes spent converging.
+        seed: seed of the random generator.
+        persistent: if True, replicas use persistent storage.
+        track_memory: if True, memory is traced with tracemalloc, which
+            slows down the simulation.
+    """
+
+    replicas: int = 10
+    write_rounds: int = 20
+    operations_per_round: int = 10
+    vertices: int = 100
+    topology: Topology = Topology.RANDOM
+    fan_out: int = 2
+    max_gossip_rounds: int = 100
+    seed: int = 0
+    persistent: bool = False
+    track_memory: bool = True
+
+
+class RoundStats(NamedTuple):
+    """Statistics of a single round.
+
+    Attributes:
+        round: number of the round, starting from 0.
+        memory: bytes allocated by the simulation, 0 if memory is not tracked.
+        tombstones: number of remove timestamps of the first replica.
+        median_merge_latency: median merge time in seconds.
+    """
+
+    round: int
+    memory: int
+    tombstones: int
+    median_merge_latency: float
+
+
+class SimulationReport(NamedTuple):
+    """Results of a simulation.
+
+    Attributes:
+        operations: number of applied graph operations.
+        operations_per_second: operations applied per second of writing.
+        merges: number of merges.
+        merge_latency_percentiles: merge time in seconds by percentile
+            (50, 90, 99).
+        converged: True if all replicas ended equal.
+        rounds_to_converge: gossip rounds after the last write until all
+            replicas were equal, None if they did not converge.
+        crdt_property_violations: properties violated by merges of replicas
+            from the end of writes, empty if all hold. Not checked (empty)
+            if replicas did not converge.
+        rounds: statistics of every round.
+        replicas: final states of replicas.
+    """
+
+    operations: int
+    operations_per_second: float
+    merges: int
+    merge_latency_percentiles: dict[int, float]
+    converged: bool
+    rounds_to_converge: Optional[int]
+    crdt_property_violations: list[str]
+    rounds: list[RoundStats]
+    replicas: list[LwwElementGraph[int]]
+
+
+def _percentile(sorted_values: list[float], percentile: int) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, len(sorted_values) * percentile // 100)
+    return sorted_values[index]
+
+
+def _tombstones(graph: LwwElementGraph) -> int:
+    return len(graph.vertices.remove_timestamps) + len(graph.edges.remove_timestamps)
+
+
+def _all_equal(replicas: list[LwwElementGraph[int]]) -> bool:
+    return all(replica == replicas[0] for replica in replicas[1:])
+
+
+def _check_crdt_properties(
+    replicas: list[LwwElementGraph[int]],
+    converged_replica: LwwElementGraph[int],
+    generator: random.Random,
+) -> list[str]:
+    """Returns names of violated properties, checked on random replicas.
+
+    Properties are those of test_crdt_properties.py and convergence - gossip
+    should end with a merge of all replicas.
+    """
+    violations = set()
+    for _ in range(min(10, len(replicas))):
+        first, second, third = (generator.choice(replicas) for _ in range(3))
+        if first.merge(second) != second.merge(first):
+            violations.add("commutativity")
+        if first.merge(second).merge(third) != first.merge(second.merge(third)):
+            violations.add("associativity")
+        if first.merge(first) != first:
+            violations.add("idempotence")
+    if reduce(LwwElementGraph.merge, replicas) != converged_replica:
+        violations.add("convergence to merge of all replicas")
+    return sorted(violations)
+
+
+class GossipSimulator:
+    """Runs a simulation described by a SimulationConfig."""
+
+    def __init__(self, config: SimulationConfig):
+        if config.replicas < 1:
+            raise ValueError("Number of replicas should be positive.")
+        if config.fan_out < 1 and config.topology != Topology.FULL:
+            raise ValueError("Fan-out should be positive.")
+        self.config = config
+        self._generator = random.Random(config.seed)
+        self._clock = itertools.count(1)
+        self._merge_latencies: list[float] = []
+        self._round_merge_latencies: list[float] = []
+        self._operations = 0
+        self._writing_time = 0.0
+
+    def _peers(self, replica_index: int) -> list[int]:
+        replicas_count = self.config.replicas
+        others = [i for i in range(replicas_count) if i != replica_index]
+        if self.config.topology == Topology.FULL:
+            return others
+        if self.config.topology == Topology.RING:
+            return [
+                (replica_index + offset) % replicas_count
+                for offset in range(1, min(self.config.fan_out, len(others)) + 1)
+            ]
+        return self._generator.sample(others, min(self.config.fan_out, len(others)))
+
+    def _apply_random_operation(self, graph: LwwElementGraph[int]) -> None:
+        generator = self._generator
+        first_vertex_id = str(generator.randrange(self.config.vertices))
+        second_vertex_id = str(generator.randrange(self.config.vertices))
+        roll = generator.random()
+
+        if not graph.has_vertex(first_vertex_id):
+            graph.add_vertex(first_vertex_id)
+        elif roll < 0.1:
+            graph.remove_vertex(first_vertex_id, cascade=True)
+        elif roll < 0.3 or first_vertex_id == second_vertex_id:
+            graph.set_vertex_value(first_vertex_id, generator.randrange(1000))
+        elif not graph.has_vertex(second_vertex_id):
+            graph.add_vertex(second_vertex_id)
+        elif graph.has_edge(first_vertex_id, second_vertex_id):
+            graph.remove_edge(first_vertex_id, second_vertex_id)
+        else:
+            graph.add_edge(first_vertex_id, second_vertex_id)
+
+    def _write(self, replicas: list[LwwElementGraph[int]]) -> None:
+        start = time.perf_counter()
+        for replica in replicas:
+            for _ in range(self.config.operations_per_round):
+                self._apply_random_operation(replica)
+        self._writing_time += time.perf_counter() - start
+        self._operations += len(replicas) * self.config.operations_per_round
+
+    def _gossip(self, replicas: list[LwwElementGraph[int]]) -> None:
+        # Peers merge states from before the round, like concurrent messages.
+        states = list(replicas)
+        for replica_index, state in enumerate(states):
+            for peer_index in self._peers(replica_index):
+                start = time.perf_counter()
+                replicas[peer_index] = replicas[peer_index].merge(state)
+                self._round_merge_latencies.append(time.perf_counter() - start)
+
+    def _round_stats(
+        self, round_number: int, replicas: list[LwwElementGraph[int]]
+    ) -> RoundStats:
+        latencies = self._round_merge_latencies
+        self._merge_latencies.extend(latencies)
+        self._round_merge_latencies = []
+        return RoundStats(
+            round=round_number,
+            memory=(
+                tracemalloc.get_traced_memory()[0] if self.config.track_memory else 0
+            ),
+            tombstones=_tombstones(replicas[0]),
+            median_merge_latency=statistics.median(latencies) if latencies else 0.0,
+        )
+
+    def run(self) -> SimulationReport:
+        config = self.config
+        if config.track_memory:
+            tracemalloc.start()
+        try:
+            with use_clock(lambda: next(self._clock)):
+                return self._run()
+        finally:
+            if config.track_memory:
+                tracemalloc.stop()
+
+    def _run(self) -> SimulationReport:
+        config = self.config
+        replicas: list[LwwElementGraph[int]] = [
+            LwwElementGraph(persistent=config.persistent)
+            for _ in range(config.replicas)
+        ]
+        rounds: list[RoundStats] = []
+
+        for round_number in range(config.write_rounds):
+            self._write(replicas)
+            self._gossip(replicas)
+            rounds.append(self._round_stats(round_number, replicas))
+        replicas_after_writes = list(replicas)
+
+        rounds_to_converge: Optional[int] = None
+        for gossip_round in range(config.max_gossip_rounds + 1):
+            if _all_equal(replicas):
+                rounds_to_converge = gossip_round
+                break
+            if gossip_round == config.max_gossip_rounds:
+                break
+            self._gossip(replicas)
+            rounds.append(self._round_stats(len(rounds), replicas))
+
+        converged = rounds_to_converge is not None
+        crdt_property_violations = (
+            _check_crdt_properties(replicas_after_writes, replicas[0], self._generator)
+            if converged
+            else []
+        )
+        latencies = sorted(self._merge_latencies)
+        return SimulationReport(
+            operations=self._operations,
+            operations_per_second=(
+                self._operations / self._writing_time if self._writing_time else 0.0
+            ),
+            merges=len(latencies),
+            merge_latency_percentiles={
+                percentile: _percentile(latencies, percentile)
+                for percentile in (50, 90, 99)
+            },
+            converged=converged,
+            rounds_to_converge=rounds_to_converge,
+            crdt_property_violations=crdt_property_violations,
+            rounds=rounds,
+            replicas=replicas,
+        )
+
+
+def main() -> None:
+    defaults = SimulationConfig()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--replicas", type=int, default=defaults.replicas)
+    parser.add_argument("--write-rounds", type=int, default=defaults.write_rounds)
+    parser.add_argument(
+        "--operations-per-round", type=int, default=defaults.operations_per_round
+    )
+    parser.add_argument("--vertices", type=int, default=defaults.vertices)
+    parser.add_argument(
+        "--topology",
+        choices=[topology.value for topology in Topology],
+        default=defaults.topology.value,
+    )
+    parser.add_argument("--fan-out", type=int, default=defaults.fan_out)
+    parser.add_argument(
+        "--max-gossip-rounds", type=int, default=defaults.max_gossip_rounds
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--persistent", action="store_true")
+    parser.add_argument("--no-memory-tracking", action="store_true")
+    arguments = parser.parse_args()
+
+    report = GossipSimulator(
+        SimulationConfig(
+            replicas=arguments.replicas,
+            write_rounds=arguments.write_rounds,
+            operations_per_round=arguments.operations_per_round,
+            vertices=arguments.vertices,
+            topology=Topology(arguments.topology),
+            fan_out=arguments.fan_out,
+            max_gossip_rounds=arguments.max_gossip_rounds,
+            seed=arguments.seed,
+            persistent=arguments.persistent,
+            track_memory=not arguments.no_memory_tracking,
+        )
+    ).run()
+
+    print(f"operations:            {report.operations}")
+    print(f"operations per second: {report.operations_per_second:.0f}")
+    print(f"merges:                {report.merges}")
+    for percentile, latency in report.merge_latency_percentiles.items():
+        print(f"merge latency p{percentile}:     {latency * 1000:.3f} ms")
+    print(f"converged:             {report.converged}")
+    print(f"rounds to converge:    {report.rounds_to_converge}")
+    violations = ", ".join(report.crdt_property_violations) or "none"
+    print(f"CRDT violations:       {violations}")
+    print()
+    print("round  memory (KiB)  tombstones  median merge (ms)")
+    for stats in report.rounds:
+        print(
+            f"{stats.round:5}  {stats.memory / 1024:12.1f}  {stats.tombstones:10}"
+            f"  {stats.median_merge_latency * 1000:17.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark of the cost of importing the graph module and creating graphs.
+
+Import time is measured in fresh interpreters, the best of several runs.
+Optional machinery (SQLite storage, sync, CSR export, ...) is imported on
+first use, so the report lists modules which should not be loaded by
+importing the graph module and the ones which were.
+
+Run `python -m benchmarks.startup --help` for options.
+"""
+import argparse
+import subprocess
+import sys
+import timeit
+from typing import NamedTuple
+
+from lww_element_graph.structures.lww_element_graph import LwwElementGraph
+
+GRAPH_MODULE = "lww_element_graph.structures.lww_element_graph"
+# Modules of optional machinery, imported on first use only.
+LAZY_MODULES = (
+    "array",
+    "hashlib",
+    "json",
+    "numpy",
+    "pickle",
+    "sqlite3",
+    "uuid",
+    "lww_element_graph.structures.csr_graph",
+    "lww_element_graph.utils.bloom_filter",
+    "lww_element_graph.utils.iblt",
+    "lww_element_graph.utils.sqlite_storage",
+)
+
+_IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(" ".join(name for name in {lazy_modules!r} if name in sys.modules))
+"""
+
+
+class StartupReport(NamedTuple):
+    """Results of a startup benchmark.
+
+    Attributes:
+        import_time: best time of importing the module in seconds.
+        eagerly_loaded: lazy modules loaded by importing the module.
+        construction_time: time of creating an empty graph in seconds.
+        fork_time: time of forking an empty graph in seconds.
+    """
+
+    import_time: float
+    eagerly_loaded: list[str]
+    construction_time: float
+    fork_time: float
+
+
+def measure_import(
+    module: str = GRAPH_MODULE, runs: int = 5
+) -> tuple[float, list[str]]:
+    """Returns best import time of module and lazy modules it loaded."""
+    if runs < 1:
+        raise ValueError("Number of runs should be positive.")
+    script = _IMPORT_SCRIPT.format(module=module, lazy_modules=LAZY_MODULES)
+    best_time = float("inf")
+    eagerly_loaded: list[str] = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.splitlines()
+        best_time = min(best_time, float(output[0]))
+        eagerly_loaded = output[1].split() if len(output) > 1 else []
+    return best_time, eagerly_loaded
+
+
+def measure_construction(number: int = 10000) -> tuple[float, float]:
+    """Returns times of creating and forking an empty graph in seconds."""
+    graph: LwwElementGraph = LwwElementGraph()
+    construction_time = min(timeit.repeat(LwwElementGraph, number=number, repeat=5))
+    fork_time = min(timeit.repeat(graph.fork, number=number, repeat=5))
+    return construction_time / number, fork_time / number
+
+
+def run(runs: int = 5, number: int = 10000) -> StartupReport:
+    import_time, eagerly_loaded = measure_import(GRAPH_MODULE, runs)
+    construction_time, fork_time = measure_construction(number)
+    return StartupReport(
+        import_time=import_time,
+        eagerly_loaded=eagerly_loaded,
+        construction_time=construction_time,
+        fork_time=fork_time,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--number", type=int, default=10000)
+    arguments = parser.parse_args()
+
+    report = run(arguments.runs, arguments.number)
+    eagerly_loaded = ", ".join(report.eagerly_loaded) or "none"
+    print(f"import time:       {report.import_time * 1000:.2f} ms")
+    print(f"eagerly loaded:    {eagerly_loaded}")
+    print(f"construction time: {report.construction_time * 1e6:.2f} us")
+    print(f"fork time:         {report.fork_time * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
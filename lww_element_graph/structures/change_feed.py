@@ -0,0 +1,104 @@
+"""This module contains implementation of a change feed of a LWW-Element-Graph.
+
+Graph publishes a Change for every vertex or edge which appeared or
+disappeared and for every changed vertex value - both for local operations
+and for merges. Subscribers receive changes either through a callback called
+with batches of changes or by draining them with a generator.
+"""
+import enum
+from typing import Any, Callable, Hashable, Iterator, NamedTuple, Optional
+
+
+class ChangeKind(enum.Enum):
+    """Indicates what happened to an element of the graph."""
+
+    VERTEX_ADDED = enum.auto()
+    VERTEX_REMOVED = enum.auto()
+    EDGE_ADDED = enum.auto()
+    EDGE_REMOVED = enum.auto()
+    VALUE_CHANGED = enum.auto()
+
+
+class Change(NamedTuple):
+    """Single change of the graph.
+
+    Attributes:
+        kind: what happened to the element.
+        element: vertex id or edge (a frozenset of two vertex ids).
+        value: new value of a vertex for VALUE_CHANGED, None otherwise.
+    """
+
+    kind: ChangeKind
+    element: Hashable
+    value: Any = None
+
+
+class Subscription:
+    """Subscription to a change feed.
+
+    If subscription has a callback, the callback is called with a list of
+    changes every time `batch_size` changes are pending and on `flush()`.
+    Otherwise changes are kept until drained with `changes()`.
+    """
+
+    def __init__(
+        self,
+        feed: "ChangeFeed",
+        callback: Optional[Callable[[list[Change]], None]],
+        batch_size: int,
+    ):
+        if batch_size < 1:
+            raise ValueError("Batch size should be positive.")
+        self._feed = feed
+        self._callback = callback
+        self._batch_size = batch_size
+        self._pending: list[Change] = []
+
+    def _publish(self, change: Change) -> None:
+        self._pending.append(change)
+        if self._callback is not None and len(self._pending) >= self._batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Calls callback with all pending changes."""
+        if self._callback is None or not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        self._callback(batch)
+
+    def changes(self) -> Iterator[Change]:
+        """Yields pending changes, removing them from the subscription."""
+        while self._pending:
+            batch, self._pending = self._pending, []
+            yield from batch
+
+    def close(self) -> None:
+        """Flushes pending changes and stops receiving new ones."""
+        self.flush()
+        self._feed._subscriptions.remove(self)
+
+
+class ChangeFeed:
+    """Distributes published changes to subscriptions."""
+
+    def __init__(self):
+        self._subscriptions: list[Subscription] = []
+
+    @property
+    def has_subscriptions(self) -> bool:
+        return bool(self._subscriptions)
+
+    def subscribe(
+        self,
+        callback: Optional[Callable[[list[Change]], None]] = None,
+        batch_size: int = 1,
+    ) -> Subscription:
+        """Returns a new subscription to the feed."""
+        subscription = Subscription(self, callback, batch_size)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def publish(self, change: Change) -> None:
+        """Passes change to all subscriptions."""
+        for subscription in self._subscriptions:
+            subscription._publish(change)
@@ -0,0 +1,407 @@
+"""This module contains a thread-safe wrapper of a LWW-Element-Graph.
+
+ConcurrentLwwElementGraph lets many threads share a single replica.
+Vertices are assigned to stripes by their hashes, each stripe has its own
+readers-writer lock, and there is one more readers-writer lock for the whole
+graph. Queries about a few vertices hold stripes of those vertices in shared
+mode, other queries hold the graph lock in shared mode, so queries run
+concurrently with each other. Operations modifying the graph hold the graph
+lock and stripes of vertices they touch exclusively - they block queries of
+the whole graph, but only those queries about a few vertices which touch
+the same stripes. Operations still run one at a time, they all update
+graph-wide state (timestamps, indexes, counts and the version).
+
+Queries never build indexes of the graph unguarded: indexes used by
+queries about a few vertices are built before the graph is shared and then
+kept up to date by the operations, other indexes are built under a lock of
+the graph.
+
+Merge does not block queries - it is computed while holding only the writer
+mutex (so the graph cannot change in the meantime) and the merged graph is
+swapped in under a short exclusive lock of the graph and all stripes. Until
+then queries see the graph from before the merge.
+
+Under the GIL queries running pure Python code do not run in parallel, but
+queries waiting for I/O (e.g. for SQLite storage, or in predicates and cost
+functions) do, and readers never wait for each other.
+"""
+import threading
+from concurrent.futures import Executor, Future
+from typing import (
+    Callable,
+    Generic,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    TypeVar,
+    Union,
+)
+
+from lww_element_graph.structures.csr_graph import CsrGraph
+from lww_element_graph.structures.lww_element_graph import (
+    CostFunction,
+    GraphIndex,
+    Heuristic,
+    LwwElementGraph,
+    PathResult,
+    ShortestPath,
+    VertexId,
+    _Edge,
+    _unit_cost,
+)
+from lww_element_graph.structures.lww_element_set import AsOf, Bias
+from lww_element_graph.types import SupportsRichComparison
+from lww_element_graph.utils.rw_lock import ReadWriteLock
+
+T = TypeVar("T", bound=SupportsRichComparison)
+
+
+class ConcurrentLwwElementGraph(Generic[T]):
+    """A LwwElementGraph which can be shared between threads.
+
+    Attributes:
+        bias: An enum indicating if graph should be biased towards adds or removals.
+        graph: Graph to wrap. If given, it should not be used directly anymore.
+        stripes_count: Number of stripes vertices are assigned to.
+    """
+
+    def __init__(
+        self,
+        bias: Bias = Bias.ADDS,
+        graph: Optional[LwwElementGraph[T]] = None,
+        stripes_count: int = 16,
+    ):
+        if stripes_count < 1:
+            raise ValueError("Number of stripes should be positive.")
+        self._graph: LwwElementGraph[T] = (
+            LwwElementGraph(bias=bias) if graph is None else graph
+        )
+        self._graph.build_indexes()
+        # Held by queries about the whole graph and by all operations.
+        self._graph_lock = ReadWriteLock()
+        # Held by queries about a few vertices and by operations on them.
+        self._stripes = [ReadWriteLock() for _ in range(stripes_count)]
+        # Serializes operations modifying the graph, including merges.
+        self._writer_mutex = threading.Lock()
+
+    def __repr__(self):
+        return f"<ConcurrentLwwElementGraph {self._graph=}>"
+
+    def _stripes_of(self, vertices_ids: Sequence[VertexId]) -> list[ReadWriteLock]:
+        """Returns stripes of vertices ordered by their indexes.
+
+        Taking stripes in this order prevents deadlocks.
+        """
+        stripes_count = len(self._stripes)
+        if len(vertices_ids) == 1:
+            return [self._stripes[hash(vertices_ids[0]) % stripes_count]]
+        indexes = sorted(
+            {hash(vertex_id) % stripes_count for vertex_id in vertices_ids}
+        )
+        return [self._stripes[index] for index in indexes]
+
+    def _read(self, *vertices_ids: VertexId) -> "_HeldLocks":
+        """Holds locks for a query about vertices, or the whole graph if none given.
+
+        Query about the whole graph holds only the graph lock, it excludes
+        operations modifying any vertices.
+        """
+        if vertices_ids:
+            return _HeldLocks(self._stripes_of(vertices_ids), exclusive=False)
+        return _HeldLocks((self._graph_lock,), exclusive=False)
+
+    def _write(self, *vertices_ids: VertexId) -> "_HeldLocks":
+        """Holds locks for an operation modifying vertices, all if none given.
+
+        Should be called with the writer mutex held.
+        """
+        stripes = self._stripes_of(vertices_ids) if vertices_ids else self._stripes
+        return _HeldLocks((self._graph_lock, *stripes), exclusive=True)
+
+    def _read_adjacency(self, vertex_id: VertexId):
+        """Holds locks for a query of adjacent vertices of the vertex.
+
+        Without the index of adjacent vertices such query scans all edges.
+        """
+        if GraphIndex.ADJACENCY in self._graph.indexes:
+            return self._read(vertex_id)
+        return self._read()
+
+    def _read_history(self, vertex_id: VertexId):
+        """Holds locks for an as-of query of adjacent vertices of the vertex."""
+        if GraphIndex.HISTORY in self._graph.indexes:
+            return self._read(vertex_id)
+        return self._read()
+
+    def snapshot(self) -> LwwElementGraph[T]:
+        """Returns an independent copy of the graph, e.g. for iteration."""
+        with self._read():
+            return self._graph.fork()
+
+    def has_vertex(self, vertex_id: VertexId) -> bool:
+        with self._read(vertex_id):
+            return self._graph.has_vertex(vertex_id)
+
+    def has_edge(self, first_vertex_id: VertexId, second_vertex_id: VertexId) -> bool:
+        with self._read(first_vertex_id, second_vertex_id):
+            return self._graph.has_edge(first_vertex_id, second_vertex_id)
+
+    def get_vertex_value(self, vertex_id: VertexId) -> Optional[T]:
+        with self._read(vertex_id):
+            return self._graph.get_vertex_value(vertex_id)
+
+    def get_adjacent_vertices(self, vertex_id: VertexId) -> frozenset[VertexId]:
+        with self._read_adjacency(vertex_id):
+            return self._graph.get_adjacent_vertices(vertex_id)
+
+    def has_vertex_as_of(self, vertex_id: VertexId, timestamp: int) -> Optional[bool]:
+        with self._read(vertex_id):
+            return self._graph.has_vertex_as_of(vertex_id, timestamp)
+
+    def vertices_as_of(self, timestamp: int) -> AsOf:
+        with self._read():
+            return self._graph.vertices_as_of(timestamp)
+
+    def has_edge_as_of(
+        self, first_vertex_id: VertexId, second_vertex_id: VertexId, timestamp: int
+    ) -> Optional[bool]:
+        with self._read(first_vertex_id, second_vertex_id):
+            return self._graph.has_edge_as_of(
+                first_vertex_id, second_vertex_id, timestamp
+            )
+
+    def get_adjacent_vertices_as_of(self, vertex_id: VertexId, timestamp: int) -> AsOf:
+        with self._read_history(vertex_id):
+            return self._graph.get_adjacent_vertices_as_of(vertex_id, timestamp)
+
+    def find_any_path(
+        self, first_vertex_id: VertexId, second_vertex_id: VertexId
+    ) -> Optional[tuple[VertexId, ...]]:
+        with self._read():
+            return self._graph.find_any_path(first_vertex_id, second_vertex_id)
+
+    def find_paths(
+        self,
+        pairs: Iterable[tuple[VertexId, VertexId]],
+        executor: Optional[Executor] = None,
+        sources_per_task: int = 16,
+    ) -> Iterator[PathResult]:
+        """See `LwwElementGraph.find_paths`.
+
+        Paths are searched in a snapshot, so the lock is not held while
+        results are consumed.
+        """
+        return self.snapshot().find_paths(pairs, executor, sources_per_task)
+
+    def shortest_path(
+        self,
+        first_vertex_id: VertexId,
+        second_vertex_id: VertexId,
+        cost: CostFunction = _unit_cost,
+        heuristic: Optional[Heuristic] = None,
+        max_cost: Optional[float] = None,
+        predicate: Optional[Callable[[VertexId], bool]] = None,
+    ) -> Optional[ShortestPath]:
+        with self._read():
+            return self._graph.shortest_path(
+                first_vertex_id, second_vertex_id, cost, heuristic, max_cost, predicate
+            )
+
+    def k_shortest_paths(
+        self,
+        first_vertex_id: VertexId,
+        second_vertex_id: VertexId,
+        k: int,
+        cost: CostFunction = _unit_cost,
+        heuristic: Optional[Heuristic] = None,
+        max_cost: Optional[float] = None,
+        predicate: Optional[Callable[[VertexId], bool]] = None,
+    ) -> list[ShortestPath]:
+        with self._read():
+            return self._graph.k_shortest_paths(
+                first_vertex_id,
+                second_vertex_id,
+                k,
+                cost,
+                heuristic,
+                max_cost,
+                predicate,
+            )
+
+    def is_connected(
+        self, first_vertex_id: VertexId, second_vertex_id: VertexId
+    ) -> bool:
+        with self._read():
+            return self._graph.is_connected(first_vertex_id, second_vertex_id)
+
+    def vertex_count(self) -> int:
+        with self._read():
+            return self._graph.vertex_count()
+
+    def edge_count(self) -> int:
+        with self._read():
+            return self._graph.edge_count()
+
+    def degree(self, vertex_id: VertexId) -> int:
+        with self._read_adjacency(vertex_id):
+            return self._graph.degree(vertex_id)
+
+    def find_vertices_with_value(self, value: T) -> list[VertexId]:
+        with self._read():
+            return self._graph.find_vertices_with_value(value)
+
+    def vertices_in_value_range(self, low: T, high: T) -> list[VertexId]:
+        with self._read():
+            return self._graph.vertices_in_value_range(low, high)
+
+    def k_hop_neighbourhood(
+        self, seeds: Iterable[VertexId], k: int, union: bool = False
+    ) -> Union[dict[VertexId, frozenset[VertexId]], frozenset[VertexId]]:
+        with self._read():
+            return self._graph.k_hop_neighbourhood(seeds, k, union=union)
+
+    def extract(self, predicate: Callable[[VertexId], bool]) -> LwwElementGraph[T]:
+        with self._read():
+            return self._graph.extract(predicate)
+
+    def extract_neighbourhood(
+        self, vertices_ids: Iterable[VertexId], k: int
+    ) -> LwwElementGraph[T]:
+        with self._read():
+            return self._graph.extract_neighbourhood(vertices_ids, k)
+
+    def to_csr(self) -> CsrGraph[T]:
+        with self._read():
+            return self._graph.to_csr()
+
+    def vertices(self) -> frozenset[VertexId]:
+        """Returns a frozenset of vertices of the graph."""
+        with self._read():
+            return frozenset(self._graph.vertices.values())
+
+    def edges(self) -> frozenset[_Edge]:
+        """Returns a frozenset of edges of the graph."""
+        with self._read():
+            return frozenset(self._graph.edges.values())
+
+    def add_vertex(self, vertex_id: VertexId) -> None:
+        with self._writer_mutex, self._write(vertex_id):
+            self._graph.add_vertex(vertex_id)
+
+    def set_vertex_value(self, vertex_id: VertexId, value: T) -> None:
+        with self._writer_mutex, self._write(vertex_id):
+            self._graph.set_vertex_value(vertex_id, value)
+
+    def _with_adjacent_vertices(
+        self, vertices_ids: Iterable[VertexId]
+    ) -> list[VertexId]:
+        """Returns vertices and vertices adjacent to them.
+
+        Should be called with the writer mutex held, so adjacency cannot change.
+        """
+        touched_vertices_ids = list(vertices_ids)
+        for vertex_id in tuple(touched_vertices_ids):
+            if self._graph.has_vertex(vertex_id):
+                touched_vertices_ids.extend(
+                    self._graph.get_adjacent_vertices(vertex_id)
+                )
+        return touched_vertices_ids
+
+    def remove_vertex(self, vertex_id: VertexId, cascade: bool = False) -> None:
+        self.remove_vertices((vertex_id,), cascade=cascade)
+
+    def remove_vertices(
+        self, vertices_ids: Iterable[VertexId], cascade: bool = False
+    ) -> None:
+        vertices_ids = tuple(vertices_ids)
+        with self._writer_mutex:
+            # Removed edges touch adjacent vertices as well.
+            with self._write(*self._with_adjacent_vertices(vertices_ids)):
+                self._graph.remove_vertices(vertices_ids, cascade=cascade)
+
+    def add_edge(self, first_vertex_id: VertexId, second_vertex_id: VertexId) -> None:
+        with self._writer_mutex, self._write(first_vertex_id, second_vertex_id):
+            self._graph.add_edge(first_vertex_id, second_vertex_id)
+
+    def remove_edge(
+        self, first_vertex_id: VertexId, second_vertex_id: VertexId
+    ) -> None:
+        with self._writer_mutex, self._write(first_vertex_id, second_vertex_id):
+            self._graph.remove_edge(first_vertex_id, second_vertex_id)
+
+    def merge(
+        self, other: Union[LwwElementGraph[T], "ConcurrentLwwElementGraph[T]"]
+    ) -> None:
+        """Merges other graph into this graph.
+
+        Queries are not blocked while the merge is computed. Subscriptions of
+        the graph move to the merged graph.
+        """
+        if isinstance(other, ConcurrentLwwElementGraph):
+            other = other.snapshot()
+
+        with self._writer_mutex:
+            # Writers are blocked, so the graph does not change while merging.
+            merged_graph, removed_orphant_edges = self._graph._merge(other)
+            merged_graph.build_indexes()
+            with self._write():
+                self._graph._move_subscriptions(
+                    other, merged_graph, removed_orphant_edges
+                )
+                self._graph = merged_graph
+
+    def merge_in_background(
+        self, other: Union[LwwElementGraph[T], "ConcurrentLwwElementGraph[T]"]
+    ) -> "Future[None]":
+        """Merges other graph into this graph in a separate thread.
+
+        Returns a Future resolved when the merged graph is swapped in.
+        """
+        future: Future[None] = Future()
+
+        def run_merge():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                self.merge(other)
+            except BaseException as error:
+                future.set_exception(error)
+            else:
+                future.set_result(None)
+
+        threading.Thread(target=run_merge, daemon=True).start()
+        return future
+
+
+class _HeldLocks:
+    """Context holding readers-writer locks, in the given order."""
+
+    __slots__ = ("_locks", "_exclusive")
+
+    def __init__(self, locks: Sequence[ReadWriteLock], exclusive: bool):
+        self._locks = locks
+        self._exclusive = exclusive
+
+    def __enter__(self) -> None:
+        acquired: list[ReadWriteLock] = []
+        try:
+            for lock in self._locks:
+                if self._exclusive:
+                    lock.acquire_write()
+                else:
+                    lock.acquire_read()
+                acquired.append(lock)
+        except BaseException:
+            self._release(acquired)
+            raise
+
+    def __exit__(self, *exc_info) -> None:
+        self._release(self._locks)
+
+    def _release(self, locks: Sequence[ReadWriteLock]) -> None:
+        for lock in reversed(locks):
+            if self._exclusive:
+                lock.release_write()
+            else:
+                lock.release_read()
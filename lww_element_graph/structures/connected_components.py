@@ -0,0 +1,62 @@
+"""This module contains implementation of a union-find (disjoint set) structure.
+
+It is used by LwwElementGraph to answer connectivity queries. Union-find
+supports adding elements and joining their sets in O(log n) time,
+but it does not support splitting sets - after edge or vertex removal
+the structure has to be rebuilt.
+"""
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class ConnectedComponents(Generic[T]):
+    """Union-find over elements, each set represents a connected component."""
+
+    def __init__(self):
+        self._parents: dict[T, T] = {}
+        self._sizes: dict[T, int] = {}
+
+    def __contains__(self, element: T) -> bool:
+        return element in self._parents
+
+    def add(self, element: T) -> None:
+        """Adds element as a single-element component if not present yet."""
+        if element not in self._parents:
+            self._parents[element] = element
+            self._sizes[element] = 1
+
+    def find(self, element: T) -> T:
+        """Returns representative of a component the element belongs to.
+
+        Paths are not compressed, so queries only read the structure and
+        can run concurrently. Union by size keeps trees O(log n) deep.
+        """
+        parents = self._parents
+        while parents[element] != element:
+            element = parents[element]
+        return element
+
+    def union(self, first_element: T, second_element: T) -> None:
+        """Joins components of both elements, adds elements if not present."""
+        self.add(first_element)
+        self.add(second_element)
+
+        first_root = self.find(first_element)
+        second_root = self.find(second_element)
+        if first_root == second_root:
+            return
+
+        # Union by size - attach smaller tree to the root of the bigger one.
+        if self._sizes[first_root] < self._sizes[second_root]:
+            first_root, second_root = second_root, first_root
+        self._parents[second_root] = first_root
+        self._sizes[first_root] += self._sizes.pop(second_root)
+
+    def size(self, element: T) -> int:
+        """Returns number of elements in a component the element belongs to."""
+        return self._sizes[self.find(element)]
+
+    def count(self) -> int:
+        """Returns number of components."""
+        return len(self._sizes)
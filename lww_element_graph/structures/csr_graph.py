@@ -0,0 +1,77 @@
+"""This module contains a compressed sparse row (CSR) export of a LWW-Element-Graph.
+
+CsrGraph numbers vertices 0..n-1 and stores adjacency in two integer arrays:
+neighbours of vertex `i` are `indices[indptr[i]:indptr[i + 1]]`. Arrays are
+read-only buffers, so they can be wrapped by NumPy (or any buffer consumer)
+without copying - see `CsrGraph.to_numpy`.
+
+CsrGraph is a snapshot, it does not change when the graph is modified.
+"""
+from array import array
+from typing import Any, Generic, Optional, TypeVar
+
+from lww_element_graph.types import SupportsRichComparison
+
+T = TypeVar("T", bound=SupportsRichComparison)
+
+VertexId = str
+
+
+class CsrGraph(Generic[T]):
+    """Read-only CSR representation of an undirected graph.
+
+    Every edge is stored twice, once for each of its vertices.
+
+    Attributes:
+        vertices_ids: ids of vertices, position in the tuple is vertex index.
+        indptr: offsets into `indices`, `len(indptr) == len(vertices_ids) + 1`.
+        indices: indexes of adjacent vertices, sorted for every vertex.
+        values: values of vertices by vertex index, None if no value associated.
+    """
+
+    def __init__(
+        self,
+        vertices_ids: tuple[VertexId, ...],
+        indptr: array,
+        indices: array,
+        values: tuple[Optional[T], ...],
+    ):
+        self.vertices_ids = vertices_ids
+        self.indptr = memoryview(indptr).toreadonly()
+        self.indices = memoryview(indices).toreadonly()
+        self.values = values
+        self._indexes: Optional[dict[VertexId, int]] = None
+
+    def __repr__(self):
+        return f"<CsrGraph vertices={len(self.vertices_ids)} {len(self.indices)=}>"
+
+    def index_of(self, vertex_id: VertexId) -> int:
+        """Returns index of a vertex, raises KeyError if vertex is not exported."""
+        if self._indexes is None:
+            self._indexes = {
+                vertex_id: index for index, vertex_id in enumerate(self.vertices_ids)
+            }
+        return self._indexes[vertex_id]
+
+    def degree(self, index: int) -> int:
+        """Returns number of edges connected to vertex with given index."""
+        return self.indptr[index + 1] - self.indptr[index]
+
+    def neighbours(self, index: int) -> memoryview:
+        """Returns indexes of vertices adjacent to vertex with given index."""
+        return self.indices[self.indptr[index] : self.indptr[index + 1]]
+
+    def to_numpy(self) -> tuple[Any, Any]:
+        """Returns (indptr, indices) as read-only int64 NumPy arrays.
+
+        Arrays share memory with the CsrGraph. NumPy is not a dependency of
+        the package, ImportError is raised if it is not installed.
+        """
+        try:
+            import numpy
+        except ImportError as error:
+            raise ImportError("CsrGraph.to_numpy requires NumPy.") from error
+        return (
+            numpy.frombuffer(self.indptr, dtype=numpy.int64),
+            numpy.frombuffer(self.indices, dtype=numpy.int64),
+        )
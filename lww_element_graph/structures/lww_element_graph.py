@@ -5,10 +5,52 @@ implements merge operation to merge two graphs. This structure is a CRDT.
 
 For more details check lww_element_set.py.
 """
-from typing import Generic, Optional, TypeVar
+import enum
+import heapq
+import math
+import threading
+from itertools import chain
+from typing import (
+    TYPE_CHECKING,
+    AbstractSet,
+    Callable,
+    Generic,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    NamedTuple,
+    Optional,
+    TypeVar,
+    Union,
+)
 
-from lww_element_graph.structures.lww_element_set import Bias, LwwElementSet
-from lww_element_graph.types import SupportsRichComparison
+from lww_element_graph.structures.change_feed import (
+    Change,
+    ChangeFeed,
+    ChangeKind,
+    Subscription,
+)
+from lww_element_graph.structures.connected_components import ConnectedComponents
+from lww_element_graph.structures.lww_element_set import AsOf, Bias, LwwElementSet
+from lww_element_graph.structures.value_index import ValueIndex
+from lww_element_graph.types import Storage, SupportsRichComparison
+from lww_element_graph.utils.persistent_map import PersistentMap
+from lww_element_graph.utils.timestamp import timestamp_now
+
+if TYPE_CHECKING:
+    # Imported on first use: first CSR export, cached query and summary.
+    from concurrent.futures import Executor, Future
+
+    from lww_element_graph.structures.csr_graph import CsrGraph
+    from lww_element_graph.structures.query_cache import CacheStats, QueryCache
+    from lww_element_graph.structures.timestamp_index import HistoryIndex
+    from lww_element_graph.utils.bloom_filter import BloomFilter
+    from lww_element_graph.utils.iblt import InvertibleBloomLookupTable
+    from lww_element_graph.utils.sqlite_storage import (
+        SqliteAdjacency,
+        SqliteScratchStorage,
+    )
 
 T = TypeVar("T", bound=SupportsRichComparison)
 
@@ -23,6 +65,133 @@ class GraphOperationError(Exception):
     """Thrown when unexpected graph operation occurs."""
 
 
+class GraphSummary(NamedTuple):
+    """Bloom filters of vertices and edges entries of a graph."""
+
+    vertices: "BloomFilter"
+    edges: "BloomFilter"
+
+
+class GraphDigests(NamedTuple):
+    """Invertible Bloom lookup tables of vertices and edges entries of a graph."""
+
+    vertices: "InvertibleBloomLookupTable"
+    edges: "InvertibleBloomLookupTable"
+
+
+class GraphIndex(enum.Flag):
+    """Indexes a LwwElementGraph keeps between queries.
+
+    Enabled indexes are built on first query and then kept up to date by
+    the graph operations. Queries on a graph with an index disabled build
+    the index for themselves and drop it, trading time for memory.
+    """
+
+    NONE = 0
+    # Adjacent vertices of every vertex, used by most of the queries.
+    ADJACENCY = enum.auto()
+    # Connected components, used by is_connected and component queries.
+    COMPONENTS = enum.auto()
+    # Sorted values of vertices, used by value queries.
+    VALUES = enum.auto()
+    # Last CSR export.
+    CSR = enum.auto()
+    # Vertices and edges ordered by timestamps, used by as-of queries.
+    HISTORY = enum.auto()
+    ALL = ADJACENCY | COMPONENTS | VALUES | CSR | HISTORY
+
+
+class ShortestPath(NamedTuple):
+    """Path found by a shortest path search and its total cost."""
+
+    path: tuple[VertexId, ...]
+    cost: float
+
+
+class PathResult(NamedTuple):
+    """Path between a pair of vertices found by a batched path search.
+
+    Path is None if vertices are not connected.
+    """
+
+    source: VertexId
+    target: VertexId
+    path: Optional[tuple[VertexId, ...]]
+
+
+def _paths_from(
+    adjacency: Mapping[VertexId, Iterable[VertexId]],
+    source: VertexId,
+    targets: list[VertexId],
+) -> list[PathResult]:
+    """Returns paths from source to targets read from a single BFS tree.
+
+    BFS stops once all targets are reached.
+    """
+    parents: dict[VertexId, Optional[VertexId]] = {source: None}
+    remaining_targets = set(targets)
+    remaining_targets.discard(source)
+    frontier = [source]
+    while frontier and remaining_targets:
+        next_frontier = []
+        for vertex_id in frontier:
+            for adjacent_vertex_id in adjacency.get(vertex_id, ()):
+                if adjacent_vertex_id not in parents:
+                    parents[adjacent_vertex_id] = vertex_id
+                    remaining_targets.discard(adjacent_vertex_id)
+                    next_frontier.append(adjacent_vertex_id)
+        frontier = next_frontier
+
+    results = []
+    for target in targets:
+        if target not in parents:
+            results.append(PathResult(source, target, None))
+            continue
+        path = [target]
+        while path[-1] != source:
+            path.append(parents[path[-1]])
+        results.append(PathResult(source, target, tuple(reversed(path))))
+    return results
+
+
+def _paths_from_sources(
+    adjacency: Mapping[VertexId, Iterable[VertexId]],
+    targets_by_source: list[tuple[VertexId, list[VertexId]]],
+) -> list[PathResult]:
+    """Task of an executor - returns paths of a group of sources."""
+    return [
+        result
+        for source, targets in targets_by_source
+        for result in _paths_from(adjacency, source, targets)
+    ]
+
+
+# Returns cost of moving from the first vertex to the second one.
+CostFunction = Callable[[VertexId, VertexId], float]
+# Returns lower bound of cost of moving from a vertex to the target vertex.
+Heuristic = Callable[[VertexId], float]
+
+
+def _unit_cost(first_vertex_id: VertexId, second_vertex_id: VertexId) -> float:
+    return 1
+
+
+def _changed_keys(*mappings_pairs: tuple[Mapping, Mapping]) -> Optional[set]:
+    """Returns keys with different entries in mappings of any pair.
+
+    None unless all mappings are PersistentMaps - other mappings cannot find
+    differences without visiting all their entries.
+    """
+    changed_keys: set = set()
+    for first_mapping, second_mapping in mappings_pairs:
+        if not isinstance(first_mapping, PersistentMap) or not isinstance(
+            second_mapping, PersistentMap
+        ):
+            return None
+        changed_keys.update(first_mapping.diff(second_mapping))
+    return changed_keys
+
+
 class LwwElementGraph(Generic[T]):
     """A Graph that is a CRDT.
 
@@ -35,22 +204,127 @@ class LwwElementGraph(Generic[T]):
         - bias towards adds means that element will remain in the merged graph
         - bias towards removes means that element will not be in the merged graph
 
+        persistent: If True, graph is stored in PersistentMaps, which share
+            structure with forks and merge results of the graph.
+
+        storage: If given, graph is stored in maps created by the storage,
+            e.g. in tables of a SqliteScratchStorage. Forks and merge results of the
+            graph use the same storage.
+
+        query_cache_size: Maximum number of cached results of path and adjacent
+            vertices queries, 0 disables the cache.
+
+        indexes: Indexes kept between queries, all by default. Forks and merge
+            results of the graph keep the same indexes.
+
+        version: A counter incremented by every operation modifying the graph.
+            Merged graph has version bigger than both merged graphs.
+
+        vertices_membership_timestamps: Timestamps of the last adds of vertices
+            whose add timestamps were moved later by setting their values.
+            Used by as-of queries, which do not count setting a value as adding
+            the vertex again.
+
         _initial_vertices: not part of a public API, used by the merge function.
         _initial_edges: not part of a public API, used by the merge function.
         _initial_vertices_values: not part of a public API, used by the merge function.
+        _initial_vertices_membership_timestamps: not part of a public API,
+            used by the merge function.
+        _initial_missing_vertices: not part of a public API, used by the merge
+            function.
     """
 
     def __init__(
         self,
         bias=Bias.ADDS,
+        persistent: bool = False,
+        storage: Optional[Storage] = None,
+        query_cache_size: int = 1024,
+        indexes: GraphIndex = GraphIndex.ALL,
         _initial_vertices: LwwElementSet[VertexId] = None,
         _initial_edges: LwwElementSet[_Edge] = None,
-        _initial_vertices_values: dict[VertexId, T] = None,
+        _initial_vertices_values: MutableMapping[VertexId, T] = None,
+        _initial_vertices_membership_timestamps: MutableMapping[VertexId, int] = None,
+        _initial_missing_vertices: Optional[set[VertexId]] = None,
     ):
-        self.vertices = _initial_vertices or LwwElementSet(bias=bias)
-        self.vertices_values: dict[VertexId, T] = _initial_vertices_values or {}
+        self.vertices = _initial_vertices or LwwElementSet(
+            bias=bias, persistent=persistent, storage=storage
+        )
+        self.vertices_values: MutableMapping[VertexId, T]
+        if _initial_vertices_values is not None:
+            self.vertices_values = _initial_vertices_values
+        elif storage is not None:
+            self.vertices_values = storage.new_map(serialize_values=True)
+        else:
+            self.vertices_values = PersistentMap() if persistent else {}
 
-        self.edges = _initial_edges or LwwElementSet(bias=bias)
+        self.vertices_membership_timestamps: MutableMapping[VertexId, int]
+        if _initial_vertices_membership_timestamps is not None:
+            self.vertices_membership_timestamps = (
+                _initial_vertices_membership_timestamps
+            )
+        elif storage is not None:
+            self.vertices_membership_timestamps = storage.new_map()
+        else:
+            self.vertices_membership_timestamps = PersistentMap() if persistent else {}
+
+        self.edges = _initial_edges or LwwElementSet(
+            bias=bias, persistent=persistent, storage=storage
+        )
+
+        # Maps vertex id to ids of adjacent vertices. Built on first use and
+        # then kept up to date by the graph operations. Graphs in a SqliteScratchStorage
+        # keep it in a table of the storage, see `_get_adjacency`.
+        self._adjacency: Optional[
+            Union[dict[VertexId, set[VertexId]], "SqliteAdjacency[VertexId]"]
+        ] = None
+        if storage is not None and _initial_edges is None:
+            new_adjacency = getattr(storage, "new_adjacency", None)
+            if new_adjacency is not None:
+                self._adjacency = new_adjacency()
+        # Connected components of the graph. Built on first use, kept up to date
+        # on additions and dropped (to be rebuilt) on removals.
+        self._components: Optional[ConnectedComponents[VertexId]] = None
+        # Created on first subscription. Merged graph takes it over from the
+        # graph merge was called on if asked to, see `merge`.
+        self._change_feed: Optional[ChangeFeed] = None
+        # Vertices not in the graph which edges or values of the graph refer to,
+        # merge removes those edges and values. None if unknown - for graphs
+        # created from given elements, which are not checked.
+        self._missing_vertices: Optional[set[VertexId]]
+        if _initial_missing_vertices is not None:
+            self._missing_vertices = _initial_missing_vertices
+        elif (
+            _initial_vertices is None
+            and _initial_edges is None
+            and _initial_vertices_values is None
+        ):
+            self._missing_vertices = set()
+        else:
+            self._missing_vertices = None
+        # Numbers of vertices and edges. Counted on first use, then kept up to date.
+        self._vertex_count: Optional[int] = None
+        self._edge_count: Optional[int] = None
+
+        self.version = 0
+        self.indexes = indexes
+        self._query_cache_size = query_cache_size
+        # Cache of find_any_path and get_adjacent_vertices results, created on
+        # first query and invalidated by vertices touched by graph operations.
+        self._query_cache: Optional["QueryCache"] = None
+        # Sorted index of values of vertices in the graph. Built on first value
+        # query and then kept up to date by the graph operations.
+        self._value_index: Optional[ValueIndex[VertexId, T]] = None
+        # Last CSR export together with the version of the graph it was built at.
+        self._csr: Optional[tuple[int, "CsrGraph[T]"]] = None
+        # Vertices and, for every vertex, edges ever connected to it, ordered
+        # by their timestamps. Built on first as-of query and then kept up to date.
+        self._vertices_history: Optional["HistoryIndex[VertexId]"] = None
+        self._incident_edges: Optional[dict[VertexId, "HistoryIndex[_Edge]"]] = None
+        # Serializes building of the indexes and counts above, so concurrent
+        # queries (see ConcurrentLwwElementGraph) do not build them at once.
+        # Queries only read indexes which are already built.
+        self._build_lock = threading.RLock()
 
     def __repr__(self):
         return f"<LwwElementGraph {self.vertices=} {self.edges=}>"
@@ -62,11 +336,59 @@ class LwwElementGraph(Generic[T]):
             and self.vertices_values == other.vertices_values
         )
 
+    def fork(self) -> "LwwElementGraph[T]":
+        """Returns an independent copy of the graph.
+
+        For persistent graphs it is O(1), the copy shares structure with the graph.
+        """
+        forked_graph: LwwElementGraph[T] = LwwElementGraph(
+            query_cache_size=self._query_cache_size,
+            indexes=self.indexes,
+            _initial_vertices=self.vertices.fork(),
+            _initial_edges=self.edges.fork(),
+            _initial_vertices_values=self.vertices_values.copy(),
+            _initial_vertices_membership_timestamps=(
+                self.vertices_membership_timestamps.copy()
+            ),
+            _initial_missing_vertices=(
+                None if self._missing_vertices is None else set(self._missing_vertices)
+            ),
+        )
+        if self._sqlite_storage() is not None and self._adjacency is not None:
+            forked_graph._adjacency = self._adjacency.copy()
+        return forked_graph
+
+    def _sqlite_storage(self) -> Optional["SqliteScratchStorage"]:
+        """Returns SqliteScratchStorage keeping the graph, None for other graphs."""
+        # Checked by attributes, so the storage module is not imported until
+        # a storage is used.
+        storage = getattr(self.edges.add_timestamps, "storage", None)
+        return storage if hasattr(storage, "new_adjacency") else None
+
     def add_vertex(self, vertex_id: VertexId) -> None:
         """Adds vertex to the graph."""
         if self.has_vertex(vertex_id):
             raise GraphOperationError(f"Vertex with id {vertex_id} already in graph.")
-        self.vertices.add(vertex_id)
+        membership_timestamp = self._membership_timestamp(vertex_id)
+        timestamp = timestamp_now()
+        self.vertices.add(vertex_id, timestamp)
+        if membership_timestamp is None or membership_timestamp < timestamp:
+            membership_timestamp = timestamp
+        self._set_membership_timestamp(vertex_id, membership_timestamp)
+        self._on_vertex_added(vertex_id)
+
+    def _membership_timestamp(self, vertex_id: VertexId) -> Optional[int]:
+        """Returns timestamp of the last add of vertex, not of setting its value."""
+        if vertex_id in self.vertices_membership_timestamps:
+            return self.vertices_membership_timestamps[vertex_id]
+        return self.vertices.add_timestamps.get(vertex_id)
+
+    def _set_membership_timestamp(self, vertex_id: VertexId, timestamp: int) -> None:
+        # Stored only if it differs from the add timestamp.
+        if timestamp == self.vertices.add_timestamps[vertex_id]:
+            self.vertices_membership_timestamps.pop(vertex_id, None)
+        else:
+            self.vertices_membership_timestamps[vertex_id] = timestamp
 
     def _assert_vertex_in_graph(self, vertex_id: VertexId) -> None:
         """Raises GraphOperationError if vertex not found in graph."""
@@ -76,26 +398,288 @@ class LwwElementGraph(Generic[T]):
     def set_vertex_value(self, vertex_id: VertexId, value: T) -> None:
         """Updates value associated with a vertex."""
         self._assert_vertex_in_graph(vertex_id)
+        membership_timestamp = self._membership_timestamp(vertex_id)
         self.vertices.add(vertex_id)  # Simulate add - it will update timestamp.
+        self._set_membership_timestamp(vertex_id, membership_timestamp)
+        self.version += 1
+        if self.vertices_values.get(vertex_id) != value:
+            self._publish(ChangeKind.VALUE_CHANGED, vertex_id, value)
         self.vertices_values[vertex_id] = value
+        if self._value_index is not None:
+            self._value_index.set(vertex_id, value)
 
     def get_vertex_value(self, vertex_id: VertexId) -> Optional[T]:
         """Returns value associated with a vertex, None if no value associated."""
         self._assert_vertex_in_graph(vertex_id)
         return self.vertices_values.get(vertex_id)
 
+    def _get_adjacency(self) -> Mapping[VertexId, AbstractSet[VertexId]]:
+        """Returns adjacency index, builds it from edges if not built yet.
+
+        Graphs in a SqliteScratchStorage keep adjacency in a table of the storage,
+        regardless of GraphIndex.ADJACENCY - it does not take memory and
+        merge of such graphs builds adjacency of merged graph in SQL.
+        """
+        adjacency = self._adjacency
+        if adjacency is None:
+            with self._build_lock:
+                adjacency = self._adjacency
+                if adjacency is None:
+                    adjacency = self._build_adjacency()
+        return adjacency
+
+    def _build_adjacency(self) -> Mapping[VertexId, AbstractSet[VertexId]]:
+        storage = self._sqlite_storage()
+        if storage is not None:
+            sqlite_adjacency = storage.new_adjacency()
+            sqlite_adjacency.link_all(tuple(edge) for edge in self.edges.values())
+            self._adjacency = sqlite_adjacency
+            return sqlite_adjacency
+
+        adjacency: dict[VertexId, set[VertexId]] = {}
+        for edge in self.edges.values():
+            first_vertex_id, second_vertex_id = edge
+            adjacency.setdefault(first_vertex_id, set()).add(second_vertex_id)
+            adjacency.setdefault(second_vertex_id, set()).add(first_vertex_id)
+        if GraphIndex.ADJACENCY in self.indexes:
+            self._adjacency = adjacency
+        return adjacency
+
+    def _get_value_index(self) -> ValueIndex[VertexId, T]:
+        """Returns value index, builds it if not built yet."""
+        value_index = self._value_index
+        if value_index is None:
+            with self._build_lock:
+                value_index = self._value_index
+                if value_index is None:
+                    value_index = self._build_value_index()
+        return value_index
+
+    def _build_value_index(self) -> ValueIndex[VertexId, T]:
+        value_index: ValueIndex[VertexId, T] = ValueIndex()
+        for vertex_id in self.vertices.values():
+            if vertex_id in self.vertices_values:
+                value_index.set(vertex_id, self.vertices_values[vertex_id])
+        if GraphIndex.VALUES in self.indexes:
+            self._value_index = value_index
+        return value_index
+
+    def _copy_value_index(self) -> Optional[ValueIndex[VertexId, T]]:
+        """Returns copy of value index, None if index is not built."""
+        if self._value_index is None:
+            return None
+        return self._value_index.copy()
+
+    def build_indexes(self) -> None:
+        """Builds enabled indexes now instead of on first query.
+
+        Graph operations keep the indexes up to date afterwards, except that
+        removals drop components and every modification drops the CSR export,
+        those are built again on next query.
+        """
+        if GraphIndex.ADJACENCY in self.indexes:
+            self._get_adjacency()
+        if GraphIndex.COMPONENTS in self.indexes:
+            self._get_components()
+        if GraphIndex.VALUES in self.indexes:
+            self._get_value_index()
+        if GraphIndex.CSR in self.indexes:
+            self.to_csr()
+        if GraphIndex.HISTORY in self.indexes:
+            self._get_vertices_history()
+            self._get_incident_edges()
+
+    def _get_components(self) -> ConnectedComponents[VertexId]:
+        """Returns connected components, builds them if not built yet."""
+        components = self._components
+        if components is None:
+            with self._build_lock:
+                components = self._components
+                if components is None:
+                    components = self._build_components()
+        return components
+
+    def _build_components(self) -> ConnectedComponents[VertexId]:
+        components: ConnectedComponents[VertexId] = ConnectedComponents()
+        for vertex_id in self.vertices.values():
+            components.add(vertex_id)
+        for vertex_id, adjacent_vertices in self._get_adjacency().items():
+            for adjacent_vertex_id in adjacent_vertices:
+                components.union(vertex_id, adjacent_vertex_id)
+        if GraphIndex.COMPONENTS in self.indexes:
+            self._components = components
+        return components
+
+    def subscribe(
+        self,
+        callback: Optional[Callable[[list[Change]], None]] = None,
+        batch_size: int = 1,
+    ) -> Subscription:
+        """Subscribes to changes of the graph.
+
+        If `callback` is given, it is called with lists of `batch_size` changes
+        (remaining changes are passed on `Subscription.flush()`), otherwise
+        changes are drained with `Subscription.changes()`.
+
+        Merge does not modify the graph, so it publishes nothing by default.
+        With `merge(other, move_subscriptions=True)` changes made by merge are
+        published and the subscriptions move to the merged graph.
+        """
+        if self._change_feed is None:
+            self._change_feed = ChangeFeed()
+        return self._change_feed.subscribe(callback, batch_size)
+
+    def _get_query_cache(self) -> Optional["QueryCache"]:
+        """Returns query cache, None if cache is disabled."""
+        if self._query_cache is None and self._query_cache_size > 0:
+            with self._build_lock:
+                if self._query_cache is None:
+                    from lww_element_graph.structures.query_cache import QueryCache
+
+                    self._query_cache = QueryCache(self._query_cache_size)
+        return self._query_cache
+
+    def query_cache_stats(self) -> "CacheStats":
+        """Returns hits, misses and size of the query cache."""
+        from lww_element_graph.structures.query_cache import CacheStats
+
+        query_cache = self._get_query_cache()
+        if query_cache is None:
+            return CacheStats(hits=0, misses=0, size=0)
+        return query_cache.stats()
+
+    def _on_vertices_touched(self, *vertices_ids: VertexId) -> None:
+        self.version += 1
+        if self._query_cache is not None:
+            self._query_cache.invalidate(vertices_ids)
+
+    def _publish(self, kind: ChangeKind, element, value: Optional[T] = None) -> None:
+        if self._change_feed is not None and self._change_feed.has_subscriptions:
+            self._change_feed.publish(Change(kind, element, value))
+
+    def _on_vertex_added(self, vertex_id: VertexId) -> None:
+        # New vertex has no edges, it does not invalidate cached results.
+        self.version += 1
+        if self._vertex_count is not None:
+            self._vertex_count += 1
+        if self._components is not None:
+            self._components.add(vertex_id)
+        if self._vertices_history is not None:
+            self._vertices_history.adds.set(
+                vertex_id, self._membership_timestamp(vertex_id)
+            )
+        self._publish(ChangeKind.VERTEX_ADDED, vertex_id)
+        if vertex_id in self.vertices_values:
+            # Vertex added again gets back its last value.
+            value = self.vertices_values[vertex_id]
+            if self._value_index is not None:
+                self._value_index.set(vertex_id, value)
+            self._publish(ChangeKind.VALUE_CHANGED, vertex_id, value)
+
+    def _on_vertex_removed(self, vertex_id: VertexId) -> None:
+        self._on_vertices_touched(vertex_id)
+        if self._vertex_count is not None:
+            self._vertex_count -= 1
+        # Union-find does not support splitting, rebuild on next query.
+        self._components = None
+        if self._value_index is not None:
+            self._value_index.discard(vertex_id)
+        if self._vertices_history is not None:
+            self._vertices_history.removes.set(
+                vertex_id, self.vertices.remove_timestamps[vertex_id]
+            )
+        self._publish(ChangeKind.VERTEX_REMOVED, vertex_id)
+
+    def _on_edge_added(self, edge: _Edge) -> None:
+        first_vertex_id, second_vertex_id = edge
+        self._on_vertices_touched(first_vertex_id, second_vertex_id)
+        if self._edge_count is not None:
+            self._edge_count += 1
+        if isinstance(self._adjacency, dict):
+            self._adjacency.setdefault(first_vertex_id, set()).add(second_vertex_id)
+            self._adjacency.setdefault(second_vertex_id, set()).add(first_vertex_id)
+        elif self._adjacency is not None:
+            self._adjacency.link(first_vertex_id, second_vertex_id)
+        if self._components is not None:
+            self._components.union(first_vertex_id, second_vertex_id)
+        if self._incident_edges is not None:
+            self._index_incident_edge(
+                self._incident_edges,
+                edge,
+                add_timestamp=self.edges.add_timestamps[edge],
+            )
+        self._publish(ChangeKind.EDGE_ADDED, edge)
+
+    def _on_edge_removed(self, edge: _Edge) -> None:
+        self._on_vertices_touched(*edge)
+        if self._edge_count is not None:
+            self._edge_count -= 1
+        if isinstance(self._adjacency, dict):
+            for vertex_id in edge:
+                adjacent_vertices = self._adjacency.get(vertex_id)
+                if adjacent_vertices is None:
+                    continue
+                adjacent_vertices.difference_update(edge)
+                if not adjacent_vertices:
+                    del self._adjacency[vertex_id]
+        elif self._adjacency is not None:
+            self._adjacency.unlink(*edge)
+        # Union-find does not support splitting, rebuild on next query.
+        self._components = None
+        if self._incident_edges is not None:
+            self._index_incident_edge(
+                self._incident_edges,
+                edge,
+                remove_timestamp=self.edges.remove_timestamps[edge],
+            )
+        self._publish(ChangeKind.EDGE_REMOVED, edge)
+
     def _has_any_edge_connected(self, vertex_id: VertexId) -> bool:
         self._assert_vertex_in_graph(vertex_id)
-        return any((vertex_id in edge) for edge in self.edges.values())
+        return bool(self._get_adjacency().get(vertex_id))
 
-    def remove_vertex(self, vertex_id: VertexId) -> None:
-        """Removes vertex from the graph."""
-        self._assert_vertex_in_graph(vertex_id)
+    def remove_vertex(self, vertex_id: VertexId, cascade: bool = False) -> None:
+        """Removes vertex from the graph.
 
-        if self._has_any_edge_connected(vertex_id):
+        If `cascade` is True, edges connected to the vertex are removed as well,
+        otherwise GraphOperationError is raised when vertex has edges connected.
+        """
+        self.remove_vertices((vertex_id,), cascade=cascade)
+
+    def remove_vertices(
+        self, vertices_ids: Iterable[VertexId], cascade: bool = False
+    ) -> None:
+        """Removes vertices from the graph.
+
+        All vertices and, if `cascade` is True, all edges connected to them are
+        removed under a single timestamp. Graph is not modified if any of the
+        vertices cannot be removed.
+        """
+        vertices_ids = frozenset(vertices_ids)
+        for vertex_id in vertices_ids:
+            self._assert_vertex_in_graph(vertex_id)
+
+        adjacency = self._get_adjacency()
+        if not cascade and any(adjacency.get(v) for v in vertices_ids):
             raise GraphOperationError("Cannot remove vertex if it has edges connected.")
 
-        self.vertices.remove(vertex_id)
+        # Edge connecting two removed vertices is removed once. Adjacency may be
+        # built just for this call (and not updated), so edges are collected first.
+        edges = {
+            self._build_edge(vertex_id, adjacent_vertex_id)
+            for vertex_id in vertices_ids
+            for adjacent_vertex_id in adjacency.get(vertex_id, ())
+        }
+        timestamp = timestamp_now()
+        for edge in edges:
+            self.edges.remove(edge, timestamp=timestamp)
+            self._on_edge_removed(edge)
+        for vertex_id in vertices_ids:
+            self.vertices.remove(vertex_id, timestamp=timestamp)
+            # Value is kept for the vertex added again, merge drops it.
+            if self._missing_vertices is not None and vertex_id in self.vertices_values:
+                self._missing_vertices.add(vertex_id)
+            self._on_vertex_removed(vertex_id)
 
     def has_vertex(self, vertex_id: VertexId) -> bool:
         """Returns boolean indicating if vertex is in graph."""
@@ -114,7 +698,12 @@ class LwwElementGraph(Generic[T]):
         edge = self._build_edge(first_vertex_id, second_vertex_id)
         if edge in self.edges:
             raise GraphOperationError(f"Edge {edge} already in graph.")
+        if self._missing_vertices is not None:
+            self._missing_vertices.update(
+                vertex_id for vertex_id in edge if vertex_id not in self.vertices
+            )
         self.edges.add(edge)
+        self._on_edge_added(edge)
 
     def remove_edge(
         self, first_vertex_id: VertexId, second_vertex_id: VertexId
@@ -124,6 +713,7 @@ class LwwElementGraph(Generic[T]):
         if edge not in self.edges:
             raise GraphOperationError(f"Edge {edge} not found in graph.")
         self.edges.remove(edge)
+        self._on_edge_removed(edge)
 
     def has_edge(self, first_vertex_id: VertexId, second_vertex_id: VertexId) -> bool:
         """Returns boolean indicating if graph has edge connecting vertices."""
@@ -133,28 +723,388 @@ class LwwElementGraph(Generic[T]):
         """Returns a frozenset of vertices adjacent to the vertex."""
         self._assert_vertex_in_graph(vertex_id)
 
-        adjacent_vertices = []
-        for edge in self.edges.values():
-            assert len(edge) == 2, "Edges should be of length 2."
+        query_cache = self._get_query_cache()
+        key = ("get_adjacent_vertices", vertex_id)
+        if query_cache is not None:
+            found, adjacent_vertices = query_cache.get(key)
+            if found:
+                return adjacent_vertices
+
+        adjacent_vertices = frozenset(self._get_adjacency().get(vertex_id, ()))
+        if query_cache is not None:
+            query_cache.put(key, adjacent_vertices, dependencies=(vertex_id,))
+        return adjacent_vertices
+
+    def has_vertex_as_of(self, vertex_id: VertexId, timestamp: int) -> Optional[bool]:
+        """Returns boolean indicating if vertex was in graph at `timestamp`.
+
+        Graph keeps only the last add and remove timestamp of every vertex and
+        edge, so None is returned if the answer is unknown - for elements both
+        added and removed after `timestamp`. See `LwwElementSet.lookup_as_of`
+        for details. Setting value of a vertex does not count as adding it.
+        """
+        add_timestamp = self.vertices.add_timestamps.get(vertex_id)
+        if add_timestamp is not None and add_timestamp > timestamp:
+            # Last add could be setting a value, take the last actual add.
+            add_timestamp = self._membership_timestamp(vertex_id)
+        return self.vertices._lookup_as_of(
+            add_timestamp, self.vertices.remove_timestamps.get(vertex_id), timestamp
+        )
+
+    def _get_vertices_history(self) -> "HistoryIndex[VertexId]":
+        """Returns index of vertices timestamps, builds it if not built yet."""
+        vertices_history = self._vertices_history
+        if vertices_history is None:
+            with self._build_lock:
+                vertices_history = self._vertices_history
+                if vertices_history is None:
+                    vertices_history = self._build_vertices_history()
+        return vertices_history
+
+    def _build_vertices_history(self) -> "HistoryIndex[VertexId]":
+        from lww_element_graph.structures.timestamp_index import HistoryIndex
+
+        vertices_history: HistoryIndex[VertexId] = HistoryIndex(
+            (
+                (vertex_id, self._membership_timestamp(vertex_id))
+                for vertex_id in self.vertices.add_timestamps
+            ),
+            self.vertices.remove_timestamps.items(),
+        )
+        if GraphIndex.HISTORY in self.indexes:
+            self._vertices_history = vertices_history
+        return vertices_history
+
+    def vertices_as_of(self, timestamp: int) -> AsOf:
+        """Returns vertices in graph at `timestamp` and ones which might be.
+
+        Vertices are ordered by timestamps of their last adds. Runs in
+        O(log n + k), see `has_vertex_as_of` for limitations.
+        """
+        vertices_history = self._get_vertices_history()
+        return AsOf(
+            members=[
+                vertex_id
+                for vertex_id in vertices_history.adds.up_to(timestamp)
+                if self.has_vertex_as_of(vertex_id, timestamp)
+            ],
+            unknown=[
+                vertex_id
+                for vertex_id in vertices_history.removes.after(timestamp)
+                if self.has_vertex_as_of(vertex_id, timestamp) is None
+            ],
+        )
+
+    def has_edge_as_of(
+        self, first_vertex_id: VertexId, second_vertex_id: VertexId, timestamp: int
+    ) -> Optional[bool]:
+        """Returns boolean indicating if graph had the edge at `timestamp`.
+
+        See `has_vertex_as_of` for limitations.
+        """
+        edge = frozenset({first_vertex_id, second_vertex_id})
+        return self.edges.lookup_as_of(edge, timestamp)
+
+    @staticmethod
+    def _index_incident_edge(
+        incident_edges: dict[VertexId, "HistoryIndex[_Edge]"],
+        edge: _Edge,
+        add_timestamp: Optional[int] = None,
+        remove_timestamp: Optional[int] = None,
+    ) -> None:
+        from lww_element_graph.structures.timestamp_index import HistoryIndex
+
+        for vertex_id in edge:
+            if vertex_id not in incident_edges:
+                incident_edges[vertex_id] = HistoryIndex()
+            if add_timestamp is not None:
+                incident_edges[vertex_id].adds.set(edge, add_timestamp)
+            if remove_timestamp is not None:
+                incident_edges[vertex_id].removes.set(edge, remove_timestamp)
+
+    def _get_incident_edges(self) -> dict[VertexId, "HistoryIndex[_Edge]"]:
+        """Returns index of edges of every vertex, builds it if not built yet."""
+        incident_edges = self._incident_edges
+        if incident_edges is None:
+            with self._build_lock:
+                incident_edges = self._incident_edges
+                if incident_edges is None:
+                    incident_edges = self._build_incident_edges()
+        return incident_edges
 
-            if vertex_id not in edge:
+    def _build_incident_edges(self) -> dict[VertexId, "HistoryIndex[_Edge]"]:
+        incident_edges: dict[VertexId, HistoryIndex[_Edge]] = {}
+        for edge, timestamp in sorted(
+            self.edges.add_timestamps.items(), key=lambda item: item[1]
+        ):
+            self._index_incident_edge(incident_edges, edge, add_timestamp=timestamp)
+        for edge, timestamp in sorted(
+            self.edges.remove_timestamps.items(), key=lambda item: item[1]
+        ):
+            self._index_incident_edge(incident_edges, edge, remove_timestamp=timestamp)
+        if GraphIndex.HISTORY in self.indexes:
+            self._incident_edges = incident_edges
+        return incident_edges
+
+    def get_adjacent_vertices_as_of(self, vertex_id: VertexId, timestamp: int) -> AsOf:
+        """Returns vertices adjacent to the vertex at `timestamp` and ones which
+        might be.
+
+        Runs in O(log d + k), where d is the number of edges ever connected
+        to the vertex and k the number of them last added before `timestamp`
+        or last removed after it. Raises GraphOperationError if vertex was not
+        in graph at `timestamp`. See `has_vertex_as_of` for limitations.
+        """
+        if self.has_vertex_as_of(vertex_id, timestamp) is False:
+            raise GraphOperationError(
+                f"{vertex_id=} not found in graph at {timestamp=}"
+            )
+
+        edges_history = self._get_incident_edges().get(vertex_id)
+        if edges_history is None:
+            return AsOf(members=[], unknown=[])
+        return AsOf(
+            members=[
+                adjacent_vertex_id
+                for edge in edges_history.adds.up_to(timestamp)
+                if self.edges.lookup_as_of(edge, timestamp)
+                for adjacent_vertex_id in edge
+                if adjacent_vertex_id != vertex_id
+            ],
+            unknown=[
+                adjacent_vertex_id
+                for edge in edges_history.removes.after(timestamp)
+                if self.edges.lookup_as_of(edge, timestamp) is None
+                for adjacent_vertex_id in edge
+                if adjacent_vertex_id != vertex_id
+            ],
+        )
+
+    def vertex_count(self) -> int:
+        """Returns number of vertices in the graph."""
+        if self._vertex_count is None:
+            with self._build_lock:
+                if self._vertex_count is None:
+                    self._vertex_count = sum(1 for _ in self.vertices.values())
+        return self._vertex_count
+
+    def edge_count(self) -> int:
+        """Returns number of edges in the graph."""
+        if self._edge_count is None:
+            with self._build_lock:
+                if self._edge_count is None:
+                    self._edge_count = sum(1 for _ in self.edges.values())
+        return self._edge_count
+
+    def degree(self, vertex_id: VertexId) -> int:
+        """Returns number of edges connected to the vertex."""
+        self._assert_vertex_in_graph(vertex_id)
+        return len(self._get_adjacency().get(vertex_id, ()))
+
+    def highest_degree_vertices(self, k: int) -> list[tuple[VertexId, int]]:
+        """Returns up to k (vertex id, degree) pairs with the highest degrees.
+
+        Vertices without edges connected are not returned.
+        """
+        adjacency = self._get_adjacency()
+        return heapq.nlargest(
+            k,
+            ((vertex_id, len(adjacent)) for vertex_id, adjacent in adjacency.items()),
+            key=lambda vertex_degree: vertex_degree[1],
+        )
+
+    def iter_vertices(self, batch_size: int = 1000) -> Iterator[list[VertexId]]:
+        """Yields vertices of the graph in lists of up to `batch_size` vertices.
+
+        Graph can be modified between batches - vertices removed before their
+        batch is built are skipped, vertices added after the iteration started
+        are not yielded.
+        """
+        return self._iter_batches(self.vertices, batch_size)
+
+    def iter_edges(self, batch_size: int = 1000) -> Iterator[list[_Edge]]:
+        """Yields edges of the graph in lists of up to `batch_size` edges.
+
+        Graph can be modified between batches, like in `iter_vertices`.
+        """
+        return self._iter_batches(self.edges, batch_size)
+
+    def _iter_batches(self, elements: LwwElementSet, batch_size: int) -> Iterator[list]:
+        if batch_size < 1:
+            raise ValueError("Batch size should be positive.")
+
+        # Iterate over a snapshot of elements, so the graph can change in between.
+        batch = []
+        for element in list(elements.add_timestamps):
+            if element not in elements:
                 continue
+            batch.append(element)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def to_csr(self) -> "CsrGraph[T]":
+        """Exports the graph to a compressed sparse row representation.
+
+        Export is cached and returned again until the graph is modified.
+        Edges connected to vertices which are not in the graph are skipped.
+        """
+        cached_csr = self._csr
+        if cached_csr is not None and cached_csr[0] == self.version:
+            return cached_csr[1]
+
+        with self._build_lock:
+            cached_csr = self._csr
+            if cached_csr is not None and cached_csr[0] == self.version:
+                return cached_csr[1]
+            return self._build_csr()
+
+    def _build_csr(self) -> "CsrGraph[T]":
+        from array import array
+
+        from lww_element_graph.structures.csr_graph import CsrGraph
+
+        vertices_ids = tuple(self.vertices.values())
+        indexes = {vertex_id: index for index, vertex_id in enumerate(vertices_ids)}
+        adjacency = self._get_adjacency()
+        indptr = array("q", [0])
+        indices = array("q")
+        for vertex_id in vertices_ids:
+            indices.extend(
+                sorted(
+                    indexes[adjacent_vertex_id]
+                    for adjacent_vertex_id in adjacency.get(vertex_id, ())
+                    if adjacent_vertex_id in indexes
+                )
+            )
+            indptr.append(len(indices))
+        values = tuple(
+            self.vertices_values.get(vertex_id) for vertex_id in vertices_ids
+        )
+
+        csr: CsrGraph[T] = CsrGraph(vertices_ids, indptr, indices, values)
+        csr._indexes = indexes
+        if GraphIndex.CSR in self.indexes:
+            self._csr = (self.version, csr)
+        return csr
 
-            (adjacent_vertex_id,) = edge - {vertex_id}
-            adjacent_vertices.append(adjacent_vertex_id)
-        return frozenset(adjacent_vertices)
+    def find_vertices_with_value(self, value: T) -> list[VertexId]:
+        """Returns vertices with given value in O(log n + k)."""
+        return self._get_value_index().range(value, value)
+
+    def vertices_in_value_range(self, low: T, high: T) -> list[VertexId]:
+        """Returns vertices with low <= value <= high, ordered by value.
+
+        Runs in O(log n + k), vertices without value are not returned.
+        """
+        return self._get_value_index().range(low, high)
+
+    def k_hop_neighbourhood(
+        self, seeds: Iterable[VertexId], k: int, union: bool = False
+    ) -> Union[dict[VertexId, frozenset[VertexId]], frozenset[VertexId]]:
+        """Returns vertices within k edges of every seed vertex (including it).
+
+        Returns a dict mapping every seed to its neighbourhood or, if `union`
+        is True, a single frozenset with vertices within k edges of any seed,
+        found with one BFS started from all seeds at once.
+
+        Frontiers are expanded level by level over the CSR export of the graph.
+        """
+        if k < 0:
+            raise ValueError("Number of hops should not be negative.")
+        seeds = list(dict.fromkeys(seeds))
+        for seed in seeds:
+            self._assert_vertex_in_graph(seed)
+
+        csr = self.to_csr()
+        vertices_ids = csr.vertices_ids
+        if union:
+            reached = self._expand_frontiers(csr, {csr.index_of(s) for s in seeds}, k)
+            return frozenset(vertices_ids[index] for index in reached)
+
+        return {
+            seed: frozenset(
+                vertices_ids[index]
+                for index in self._expand_frontiers(csr, {csr.index_of(seed)}, k)
+            )
+            for seed in seeds
+        }
+
+    @staticmethod
+    def _expand_frontiers(csr: "CsrGraph", sources: set[int], k: int) -> set[int]:
+        """Returns indexes of vertices within k edges of any of sources."""
+        indptr, indices = csr.indptr, csr.indices
+        reached = set(sources)
+        frontier = sources
+        for _ in range(k):
+            next_frontier: set[int] = set()
+            for index in frontier:
+                next_frontier.update(indices[indptr[index] : indptr[index + 1]])
+            next_frontier -= reached
+            if not next_frontier:
+                break
+            reached |= next_frontier
+            frontier = next_frontier
+        return reached
+
+    def is_connected(
+        self, first_vertex_id: VertexId, second_vertex_id: VertexId
+    ) -> bool:
+        """Returns boolean indicating if there is a path between vertices."""
+        self._assert_vertex_in_graph(first_vertex_id)
+        self._assert_vertex_in_graph(second_vertex_id)
+        components = self._get_components()
+        return components.find(first_vertex_id) == components.find(second_vertex_id)
+
+    def component_of(self, vertex_id: VertexId) -> VertexId:
+        """Returns id of a connected component the vertex belongs to.
+
+        Component id is an id of one of the vertices in the component. It is
+        stable only until the graph is modified.
+        """
+        self._assert_vertex_in_graph(vertex_id)
+        return self._get_components().find(vertex_id)
+
+    def component_size(self, vertex_id: VertexId) -> int:
+        """Returns number of vertices in a connected component of the vertex."""
+        self._assert_vertex_in_graph(vertex_id)
+        return self._get_components().size(vertex_id)
 
     def find_any_path(
         self, first_vertex_id: VertexId, second_vertex_id: VertexId
     ) -> Optional[tuple[VertexId, ...]]:
-        """Finds a path between two vertices using BFS."""
+        """Finds a path between two vertices using BFS.
+
+        Results are cached. Cached path is invalidated when any vertex on
+        the path is touched, cached lack of path when any vertex reachable
+        from the first vertex is touched.
+        """
         self._assert_vertex_in_graph(first_vertex_id)
         self._assert_vertex_in_graph(second_vertex_id)
 
-        if first_vertex_id == second_vertex_id:
-            return (first_vertex_id,)
+        query_cache = self._get_query_cache()
+        key = ("find_any_path", first_vertex_id, second_vertex_id)
+        if query_cache is not None:
+            found, path = query_cache.get(key)
+            if found:
+                return path
+
+        path, visited = self._find_any_path(first_vertex_id, second_vertex_id)
+        if query_cache is not None:
+            query_cache.put(key, path, dependencies=visited if path is None else path)
+        return path
 
+    def _find_any_path(
+        self, first_vertex_id: VertexId, second_vertex_id: VertexId
+    ) -> tuple[Optional[tuple[VertexId, ...]], set[VertexId]]:
+        """Returns (path between vertices or None, set of visited vertices)."""
         visited: set[VertexId] = set()
+        if first_vertex_id == second_vertex_id:
+            return (first_vertex_id,), visited
+
+        adjacency = self._get_adjacency()
         paths_from_first: dict[VertexId, tuple[VertexId, ...]] = {
             first_vertex_id: (first_vertex_id,)
         }
@@ -167,14 +1117,15 @@ class LwwElementGraph(Generic[T]):
             # Mark current vertex as visited.
             visited.add(current_vertex)
 
-            for adjacent_vertex in self.get_adjacent_vertices(current_vertex):
+            for adjacent_vertex in adjacency.get(current_vertex, ()):
                 if adjacent_vertex in visited:
                     # Skip adjacent that is already visited.
                     continue
 
                 if adjacent_vertex == second_vertex_id:
                     # If the adjacent vertex is target vertex, we found the path.
-                    return (*paths_from_first[current_vertex], adjacent_vertex)
+                    path = (*paths_from_first[current_vertex], adjacent_vertex)
+                    return path, visited
 
                 paths_from_first[adjacent_vertex] = (
                     *paths_from_first[current_vertex],
@@ -182,18 +1133,276 @@ class LwwElementGraph(Generic[T]):
                 )
                 to_visit.append(adjacent_vertex)
 
+        return None, visited
+
+    def find_paths(
+        self,
+        pairs: Iterable[tuple[VertexId, VertexId]],
+        executor: Optional["Executor"] = None,
+        sources_per_task: int = 16,
+    ) -> Iterator[PathResult]:
+        """Finds paths between many pairs of vertices, yields results as found.
+
+        Pairs are grouped by their first vertex (source) and paths to all
+        targets of a source are read from a single BFS tree, so they have
+        the fewest edges. Every distinct pair is yielded once. Vertices are
+        checked once and GraphOperationError is raised by this call, before
+        any search, if any of them is not in graph. Results are not cached.
+
+        Without `executor`, sources are searched in order as results are
+        consumed, graph should not be modified in the meantime.
+
+        With `executor` (e.g. ThreadPoolExecutor or ProcessPoolExecutor),
+        tasks of `sources_per_task` sources each are submitted by this call.
+        Tasks search a frozen snapshot of the graph, so the graph can be
+        modified while they run. Results are yielded in order of completion
+        of the tasks, tasks not started yet are cancelled if the iteration
+        stops early. A process pool gets the snapshot with every task, so
+        use more sources per task with it.
+        """
+        if sources_per_task < 1:
+            raise ValueError("Number of sources per task should be positive.")
+
+        # Maps source to its targets, dicts keep order of the pairs.
+        targets_by_source: dict[VertexId, dict[VertexId, None]] = {}
+        for source, target in pairs:
+            targets_by_source.setdefault(source, {})[target] = None
+        for vertex_id in {
+            *targets_by_source,
+            *chain.from_iterable(targets_by_source.values()),
+        }:
+            self._assert_vertex_in_graph(vertex_id)
+
+        grouped_targets = [
+            (source, list(targets)) for source, targets in targets_by_source.items()
+        ]
+        if executor is None:
+            return self._find_paths(grouped_targets)
+
+        # Tasks should not see the graph changing, they get a frozen copy.
+        adjacency = {
+            vertex_id: tuple(adjacent_vertices)
+            for vertex_id, adjacent_vertices in self._get_adjacency().items()
+        }
+        futures = [
+            executor.submit(
+                _paths_from_sources,
+                adjacency,
+                grouped_targets[start : start + sources_per_task],
+            )
+            for start in range(0, len(grouped_targets), sources_per_task)
+        ]
+        return self._completed_paths(futures)
+
+    def _find_paths(
+        self, grouped_targets: list[tuple[VertexId, list[VertexId]]]
+    ) -> Iterator[PathResult]:
+        adjacency = self._get_adjacency()
+        for source, targets in grouped_targets:
+            yield from _paths_from(adjacency, source, targets)
+
+    @staticmethod
+    def _completed_paths(
+        futures: list["Future[list[PathResult]]"],
+    ) -> Iterator[PathResult]:
+        from concurrent.futures import as_completed
+
+        try:
+            for future in as_completed(futures):
+                yield from future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def shortest_path(
+        self,
+        first_vertex_id: VertexId,
+        second_vertex_id: VertexId,
+        cost: CostFunction = _unit_cost,
+        heuristic: Optional[Heuristic] = None,
+        max_cost: Optional[float] = None,
+        predicate: Optional[Callable[[VertexId], bool]] = None,
+    ) -> Optional[ShortestPath]:
+        """Finds a minimum cost path between two vertices.
+
+        Runs Dijkstra search with a binary heap frontier, stopped as soon as
+        the second vertex is reached. By default every edge costs 1, `cost`
+        returns a non-negative cost of moving between adjacent vertices,
+        e.g. based on vertex values.
+
+        If `heuristic` is given, it is A* search - heuristic has to return
+        a lower bound of cost of reaching the second vertex (it does not have
+        to be consistent, vertices are expanded again when reached with
+        a lower cost). Search is pruned
+        to paths costing at most `max_cost` and to vertices (other than the
+        first one) matching `predicate`.
+
+        Returns None if there is no such path.
+        """
+        self._assert_vertex_in_graph(first_vertex_id)
+        self._assert_vertex_in_graph(second_vertex_id)
+        return self._shortest_path(
+            first_vertex_id, second_vertex_id, cost, heuristic, max_cost, predicate
+        )
+
+    def _shortest_path(
+        self,
+        first_vertex_id: VertexId,
+        second_vertex_id: VertexId,
+        cost: CostFunction,
+        heuristic: Optional[Heuristic],
+        max_cost: Optional[float],
+        predicate: Optional[Callable[[VertexId], bool]],
+        blocked_vertices: frozenset[VertexId] = frozenset(),
+        blocked_edges: frozenset[_Edge] = frozenset(),
+    ) -> Optional[ShortestPath]:
+        adjacency = self._get_adjacency()
+        # Frontier of (estimated total cost, cost from first vertex, vertex).
+        frontier = [
+            (
+                0 if heuristic is None else heuristic(first_vertex_id),
+                0,
+                first_vertex_id,
+            )
+        ]
+        costs: dict[VertexId, float] = {first_vertex_id: 0}
+        previous: dict[VertexId, VertexId] = {}
+
+        while frontier:
+            _, current_cost, current_vertex = heapq.heappop(frontier)
+            if current_cost > costs[current_vertex]:
+                # Stale entry, vertex was reached with a lower cost already.
+                continue
+            if current_vertex == second_vertex_id:
+                path = [current_vertex]
+                while path[-1] != first_vertex_id:
+                    path.append(previous[path[-1]])
+                return ShortestPath(tuple(reversed(path)), current_cost)
+
+            # Vertices are not closed once expanded: with a heuristic that is
+            # admissible but not consistent, a vertex can be reached again
+            # with a lower cost and is then expanded again.
+            for adjacent_vertex in adjacency.get(current_vertex, ()):
+                if (
+                    adjacent_vertex in blocked_vertices
+                    or (predicate is not None and not predicate(adjacent_vertex))
+                    or (
+                        blocked_edges
+                        and frozenset((current_vertex, adjacent_vertex))
+                        in blocked_edges
+                    )
+                ):
+                    continue
+
+                edge_cost = cost(current_vertex, adjacent_vertex)
+                if edge_cost < 0:
+                    raise ValueError("Cost should not be negative.")
+                adjacent_cost = current_cost + edge_cost
+                if max_cost is not None and adjacent_cost > max_cost:
+                    continue
+                if adjacent_cost < costs.get(adjacent_vertex, math.inf):
+                    costs[adjacent_vertex] = adjacent_cost
+                    previous[adjacent_vertex] = current_vertex
+                    estimate = adjacent_cost + (
+                        0 if heuristic is None else heuristic(adjacent_vertex)
+                    )
+                    heapq.heappush(frontier, (estimate, adjacent_cost, adjacent_vertex))
+
         return None
 
+    def k_shortest_paths(
+        self,
+        first_vertex_id: VertexId,
+        second_vertex_id: VertexId,
+        k: int,
+        cost: CostFunction = _unit_cost,
+        heuristic: Optional[Heuristic] = None,
+        max_cost: Optional[float] = None,
+        predicate: Optional[Callable[[VertexId], bool]] = None,
+    ) -> list[ShortestPath]:
+        """Finds up to k minimum cost paths without repeated vertices.
+
+        Paths are ordered by cost. Uses Yen's algorithm, every alternative is
+        found with the search of `shortest_path`, parameters are the same.
+        """
+        if k < 1:
+            raise ValueError("Number of paths should be positive.")
+        shortest_path = self.shortest_path(
+            first_vertex_id, second_vertex_id, cost, heuristic, max_cost, predicate
+        )
+        if shortest_path is None:
+            return []
+
+        paths = [shortest_path]
+        candidates: list[tuple[float, tuple[VertexId, ...]]] = []
+        seen_paths = {shortest_path.path}
+        while len(paths) < k:
+            previous_path = paths[-1].path
+            root_cost: float = 0
+            for i, spur_vertex in enumerate(previous_path[:-1]):
+                root = previous_path[: i + 1]
+                # Block edges continuing the root of already found paths and
+                # vertices of the root, so spur path makes a new loopless path.
+                blocked_edges = frozenset(
+                    frozenset(path.path[i : i + 2])
+                    for path in paths
+                    if path.path[: i + 1] == root
+                )
+                spur_path = self._shortest_path(
+                    spur_vertex,
+                    second_vertex_id,
+                    cost,
+                    heuristic,
+                    None if max_cost is None else max_cost - root_cost,
+                    predicate,
+                    blocked_vertices=frozenset(root[:-1]),
+                    blocked_edges=blocked_edges,
+                )
+                if spur_path is not None:
+                    candidate = root[:-1] + spur_path.path
+                    if candidate not in seen_paths:
+                        seen_paths.add(candidate)
+                        heapq.heappush(
+                            candidates, (root_cost + spur_path.cost, candidate)
+                        )
+                root_cost += cost(spur_vertex, previous_path[i + 1])
+
+            if not candidates:
+                break
+            candidate_cost, candidate = heapq.heappop(candidates)
+            paths.append(ShortestPath(candidate, candidate_cost))
+
+        return paths
+
     def _merge_vertices_values(
-        self, other: "LwwElementGraph", merged_vertices: LwwElementSet[VertexId]
-    ) -> dict[VertexId, T]:
-        """Merge using value from graph with timestamp same as one in merged graph."""
+        self,
+        other: "LwwElementGraph",
+        merged_vertices: LwwElementSet[VertexId],
+        changed_vertices: Optional[set[VertexId]] = None,
+    ) -> MutableMapping[VertexId, T]:
+        """Merge using value from graph with timestamp same as one in merged graph.
+
+        If `changed_vertices` are given, other vertices are merged into what
+        the graph already holds and are not visited.
+        """
         self_values = self.vertices_values
         other_values = other.vertices_values
-        merged_values: dict[VertexId, T] = {}
 
-        for vertex_id in merged_vertices.values():
-            if vertex_id in self_values and vertex_id in other_values:
+        # Start from a copy of own values (O(1) for persistent storage) and
+        # overwrite only values taken from other graph to share structure.
+        merged_values = self_values.copy()
+        for vertex_id in tuple(
+            merged_values.keys() if changed_vertices is None else changed_vertices
+        ):
+            if vertex_id not in merged_vertices:
+                merged_values.pop(vertex_id, None)
+
+        # Own values (if any) are already in merged values.
+        for vertex_id in other_values if changed_vertices is None else changed_vertices:
+            if vertex_id not in merged_vertices or vertex_id not in other_values:
+                continue
+
+            if vertex_id in self_values:
                 timestamp = merged_vertices.add_timestamps[vertex_id]
                 self_timestamp = self.vertices.add_timestamps[vertex_id]
                 other_timestamp = other.vertices.add_timestamps[vertex_id]
@@ -201,32 +1410,188 @@ class LwwElementGraph(Generic[T]):
                     # Edge case: different replicas assigned value
                     # in the exact same moment - take max of those two values.
                     merged_values[vertex_id] = max(
-                        self.vertices_values[vertex_id],
-                        other.vertices_values[vertex_id],
+                        self_values[vertex_id], other_values[vertex_id]
                     )
-                elif timestamp == self_timestamp:
-                    merged_values[vertex_id] = self.vertices_values[vertex_id]
-                else:
-                    merged_values[vertex_id] = other.vertices_values[vertex_id]
-            elif vertex_id in self_values:
-                merged_values[vertex_id] = self.vertices_values[vertex_id]
-            elif vertex_id in other_values:
-                merged_values[vertex_id] = other.vertices_values[vertex_id]
+                elif timestamp != self_timestamp:
+                    merged_values[vertex_id] = other_values[vertex_id]
+            else:
+                merged_values[vertex_id] = other_values[vertex_id]
 
         return merged_values
 
+    def _merge_membership_timestamps(
+        self,
+        other: "LwwElementGraph",
+        merged_vertices: LwwElementSet[VertexId],
+        changed_vertices: Optional[set[VertexId]] = None,
+    ) -> MutableMapping[VertexId, int]:
+        """Merge taking the later membership timestamp of every vertex.
+
+        If `changed_vertices` are given, other vertices are merged into what
+        the graph already holds and are not visited.
+        """
+        merged_timestamps = self.vertices_membership_timestamps.copy()
+        vertices_ids = set(
+            chain(
+                self.vertices_membership_timestamps,
+                other.vertices_membership_timestamps,
+            )
+            if changed_vertices is None
+            else (
+                vertex_id
+                for vertex_id in changed_vertices
+                if vertex_id in self.vertices_membership_timestamps
+                or vertex_id in other.vertices_membership_timestamps
+            )
+        )
+        for vertex_id in vertices_ids:
+            timestamp = max(
+                graph._membership_timestamp(vertex_id)
+                for graph in (self, other)
+                if vertex_id in graph.vertices.add_timestamps
+            )
+            if timestamp == merged_vertices.add_timestamps[vertex_id]:
+                merged_timestamps.pop(vertex_id, None)
+            else:
+                merged_timestamps[vertex_id] = timestamp
+        return merged_timestamps
+
     def _remove_orphant_edges(
         self,
         merged_edges: LwwElementSet[_Edge],
         merged_vertices: LwwElementSet[VertexId],
-    ) -> None:
-        for edge in merged_edges.values():
+        changed_vertices: Optional[set[VertexId]] = None,
+        changed_edges: Optional[set[_Edge]] = None,
+    ) -> list[_Edge]:
+        """Removes edges connecting removed vertices, returns removed edges.
+
+        If changed vertices and edges are given, only changed edges and edges
+        of the graph connecting changed vertices are visited. Other edges of the
+        graph connect its vertices, except for edges of missing vertices, which
+        are among changed vertices.
+        """
+        if changed_vertices is None or changed_edges is None:
+            edges: Iterable[_Edge] = merged_edges.values()
+        else:
+            adjacency = self._get_adjacency()
+            edges = set(changed_edges)
+            for vertex_id in changed_vertices:
+                if vertex_id not in merged_vertices:
+                    edges.update(
+                        self._build_edge(vertex_id, adjacent_vertex_id)
+                        for adjacent_vertex_id in adjacency.get(vertex_id, ())
+                    )
+            edges = [edge for edge in edges if edge in merged_edges]
+
+        removed_edges = []
+        for edge in edges:
             first_vertex_id, second_vertex_id = edge
             if (
                 first_vertex_id not in merged_vertices
                 or second_vertex_id not in merged_vertices
             ):
-                merged_edges.remove(edge)
+                removed_edges.append(edge)
+
+        merged_edges.remove_all(removed_edges)
+        return removed_edges
+
+    def _merge_in_storage(
+        self,
+        other: "LwwElementGraph[T]",
+        storage: "SqliteScratchStorage",
+        merged_vertices: LwwElementSet[VertexId],
+        merged_edges: LwwElementSet[_Edge],
+    ) -> tuple[
+        MutableMapping[VertexId, T],
+        MutableMapping[VertexId, int],
+        "SqliteAdjacency[VertexId]",
+        list[_Edge],
+    ]:
+        """Merges values and removes orphant edges of graphs in the same storage.
+
+        Steps run as joins of tables of the storage, see `merge`. Returns
+        merged values, merged membership timestamps, adjacency of merged graph
+        and removed edges.
+        """
+        adds_win = self.vertices.bias == Bias.ADDS
+        merged_values = storage.merge_vertices_values(
+            self.vertices_values,
+            other.vertices_values,
+            self.vertices,
+            other.vertices,
+            merged_vertices,
+            adds_win,
+        )
+        merged_membership_timestamps = storage.merge_membership_timestamps(
+            self.vertices_membership_timestamps,
+            other.vertices_membership_timestamps,
+            self.vertices,
+            other.vertices,
+            merged_vertices,
+        )
+        merged_adjacency, removed_edges = storage.merge_adjacency(
+            self._get_adjacency(),
+            other._get_adjacency(),
+            merged_vertices,
+            merged_edges,
+            adds_win,
+        )
+        merged_edges.remove_all(removed_edges)
+        return (
+            merged_values,
+            merged_membership_timestamps,
+            merged_adjacency,
+            removed_edges,
+        )
+
+    def _publish_merge_changes(
+        self,
+        other: "LwwElementGraph[T]",
+        merged_graph: "LwwElementGraph[T]",
+        removed_orphant_edges: list[_Edge],
+    ) -> None:
+        """Publishes differences between the graph and the merged graph.
+
+        Only elements with timestamps in other graph and edges removed because
+        of removed vertices could have changed during merge.
+        """
+        vertices_ids = {
+            *other.vertices.add_timestamps,
+            *other.vertices.remove_timestamps,
+        }
+        edges = {
+            *other.edges.add_timestamps,
+            *other.edges.remove_timestamps,
+            *removed_orphant_edges,
+        }
+
+        for vertex_id in vertices_ids:
+            if vertex_id not in self.vertices and vertex_id in merged_graph.vertices:
+                merged_graph._publish(ChangeKind.VERTEX_ADDED, vertex_id)
+
+        # Values of other graph and values of vertices added again could change.
+        for vertex_id in vertices_ids:
+            if vertex_id not in merged_graph.vertices:
+                continue
+            value = merged_graph.vertices_values.get(vertex_id)
+            previous_value = (
+                self.vertices_values.get(vertex_id)
+                if vertex_id in self.vertices
+                else None
+            )
+            if value != previous_value:
+                merged_graph._publish(ChangeKind.VALUE_CHANGED, vertex_id, value)
+
+        for edge in edges:
+            if edge not in self.edges and edge in merged_graph.edges:
+                merged_graph._publish(ChangeKind.EDGE_ADDED, edge)
+        for edge in edges:
+            if edge in self.edges and edge not in merged_graph.edges:
+                merged_graph._publish(ChangeKind.EDGE_REMOVED, edge)
+
+        for vertex_id in vertices_ids:
+            if vertex_id in self.vertices and vertex_id not in merged_graph.vertices:
+                merged_graph._publish(ChangeKind.VERTEX_REMOVED, vertex_id)
 
     def _assert_bias_equals(self, other: "LwwElementGraph") -> None:
         expected_bias = self.vertices.bias
@@ -235,7 +1600,131 @@ class LwwElementGraph(Generic[T]):
         if not vertices_samebias or not edges_samebias:
             raise GraphOperationError("Each Graph should have same bias.")
 
-    def merge(self, other: "LwwElementGraph") -> "LwwElementGraph":
+    def _partial(
+        self, vertices: LwwElementSet[VertexId], edges: LwwElementSet[_Edge]
+    ) -> "LwwElementGraph[T]":
+        """Returns graph with given entries and values of their vertices.
+
+        Merge removes edges connecting vertices missing from the merged graph,
+        so entries of vertices of given added edges are included as well.
+        """
+        missing_vertices = {
+            vertex_id for edge in edges.values() for vertex_id in edge
+        }.difference(vertices.add_timestamps)
+        if missing_vertices:
+            vertices = self.vertices._partial(
+                (*vertices._entries(), *self.vertices._entries_of(missing_vertices))
+            )
+
+        vertices_values = {
+            vertex_id: value
+            for vertex_id, value in self.vertices_values.items()
+            if vertex_id in vertices.add_timestamps
+        }
+        membership_timestamps = {
+            vertex_id: timestamp
+            for vertex_id, timestamp in self.vertices_membership_timestamps.items()
+            if vertex_id in vertices.add_timestamps
+        }
+        return LwwElementGraph(
+            query_cache_size=self._query_cache_size,
+            indexes=self.indexes,
+            _initial_vertices=vertices,
+            _initial_edges=edges,
+            _initial_vertices_values=vertices_values,
+            _initial_vertices_membership_timestamps=membership_timestamps,
+        )
+
+    def extract(self, predicate: Callable[[VertexId], bool]) -> "LwwElementGraph[T]":
+        """Returns sub-replica with vertices matching the predicate.
+
+        Sub-replica holds add and remove entries and values of matching
+        vertices (including removed ones) and entries of edges connecting
+        them. It is an ordinary graph - it can be modified and merged back
+        into this graph (or any other replica) safely.
+        """
+        vertices_ids = {
+            vertex_id
+            for vertex_id in chain(
+                self.vertices.add_timestamps, self.vertices.remove_timestamps
+            )
+            if predicate(vertex_id)
+        }
+        return self._extract(vertices_ids)
+
+    def extract_neighbourhood(
+        self, vertices_ids: Iterable[VertexId], k: int
+    ) -> "LwwElementGraph[T]":
+        """Returns sub-replica with vertices within k edges of given vertices.
+
+        See `extract` for details.
+        """
+        return self._extract(self.k_hop_neighbourhood(vertices_ids, k, union=True))
+
+    def _extract(self, vertices_ids: Iterable[VertexId]) -> "LwwElementGraph[T]":
+        vertices_ids = frozenset(vertices_ids)
+        # Edges leaving the sub-replica are left out, merge of a sub-replica
+        # would remove them as edges connecting missing vertices.
+        edges = {
+            edge
+            for edge in chain(self.edges.add_timestamps, self.edges.remove_timestamps)
+            if edge <= vertices_ids
+        }
+        return self._partial(
+            self.vertices._partial(self.vertices._entries_of(vertices_ids)),
+            self.edges._partial(self.edges._entries_of(edges)),
+        )
+
+    def summary(self, error_rate: float = 0.01) -> GraphSummary:
+        """Returns summary of the graph entries for bandwidth-efficient sync.
+
+        Sync of graph A into graph B:
+
+        1. B sends `B.summary()` to A.
+        2. A sends `A.delta(summary)` to B, B merges it.
+        3. B sends `B.digests(expected_difference)` to A.
+        4. A sends `A.exact_delta(digests)` to B, B merges it. If it is None,
+           B goes back to step 3 with a doubled expected difference.
+
+        Step 4 sends entries which Bloom filter false positives left out
+        in step 2. The expected difference is the number of entries present
+        in only one of the graphs after step 2 - entries B did not send to A
+        and the missed ones. Updates are usually spread evenly, so the number
+        of entries of delta from step 2 is a good estimate. Digests and sent
+        deltas are proportional to differences of graphs.
+        """
+        return GraphSummary(
+            vertices=self.vertices.summary(error_rate),
+            edges=self.edges.summary(error_rate),
+        )
+
+    def delta(self, summary: GraphSummary) -> "LwwElementGraph[T]":
+        """Returns graph with entries probably not present in summarized graph."""
+        return self._partial(
+            self.vertices.delta(summary.vertices), self.edges.delta(summary.edges)
+        )
+
+    def digests(self, expected_difference: int = 64) -> GraphDigests:
+        """Returns digests of the graph entries, see `summary`."""
+        return GraphDigests(
+            vertices=self.vertices.digests(expected_difference),
+            edges=self.edges.digests(expected_difference),
+        )
+
+    def exact_delta(self, digests: GraphDigests) -> Optional["LwwElementGraph[T]"]:
+        """Returns graph with entries not present in graph with given digests.
+
+        Returns None if graphs differ too much for digests of that size.
+        """
+        vertices = self.vertices.exact_delta(digests.vertices)
+        edges = self.edges.exact_delta(digests.edges)
+        if vertices is None or edges is None:
+            return None
+        return self._partial(vertices, edges)
+
+    def merge(
+        self, other: "LwwElementGraph", move_subscriptions: bool = False
+    ) -> "LwwElementGraph":
         """Merges two graphs.
 
         It performs the merge with the following steps:
@@ -243,19 +1732,118 @@ class LwwElementGraph(Generic[T]):
         1. merges vertices & edges using LwwElementSet.
         2. merges vertices values given verties timestamps from merged LwwElementSet
         3. removes edges which connect vertices removed during merge
+
+        If version vectors show that one of the graphs includes all updates
+        of the other one, vertices and edges are not merged entry by entry
+        (see `LwwElementSet.merge`). Steps 2 and 3 always run, their results
+        depend on more than the entries of the sets. For graphs kept in the same
+        SqliteScratchStorage all steps run in SQL. For persistent graphs steps 2
+        and 3 visit only vertices and edges whose entries differ between the
+        graphs, skipping structure shared by both (e.g. by a graph and its fork).
+
+        If `move_subscriptions` is set, subscriptions of the graph move to the
+        merged graph and receive changes made by the merge. Later changes of
+        the graph are not published to them anymore, so changes of the graph
+        and of the merged graph, which can diverge, do not interleave.
         """
+        merged_graph, removed_orphant_edges = self._merge(other)
+        if move_subscriptions:
+            self._move_subscriptions(other, merged_graph, removed_orphant_edges)
+        return merged_graph
+
+    def _merge(self, other: "LwwElementGraph") -> tuple["LwwElementGraph", list[_Edge]]:
+        """Returns merged graph and edges removed because of removed vertices."""
         self._assert_bias_equals(other)
 
         merged_vertices = self.vertices.merge(other.vertices)
         merged_edges = self.edges.merge(other.edges)
 
-        merged_values: dict[VertexId, T] = self._merge_vertices_values(
-            other, merged_vertices
-        )
-        self._remove_orphant_edges(merged_edges, merged_vertices)
+        merged_adjacency: Optional["SqliteAdjacency[VertexId]"] = None
+        storage = self._sqlite_storage()
+        if storage is not None and other._sqlite_storage() is storage:
+            (
+                merged_values,
+                merged_membership_timestamps,
+                merged_adjacency,
+                removed_orphant_edges,
+            ) = self._merge_in_storage(other, storage, merged_vertices, merged_edges)
+            # Rebuilt on first value query, updating it would read values
+            # of vertices one by one.
+            merged_value_index = None
+        else:
+            # Vertices and edges with the same entries in both graphs, other
+            # than missing vertices, are merged into what the graph already
+            # holds. Persistent graphs find the others without visiting
+            # structure shared by both graphs.
+            changed_vertices = changed_edges = None
+            if self._missing_vertices is not None:
+                changed_vertices = _changed_keys(
+                    (self.vertices.add_timestamps, other.vertices.add_timestamps),
+                    (self.vertices.remove_timestamps, other.vertices.remove_timestamps),
+                    (self.vertices_values, other.vertices_values),
+                    (
+                        self.vertices_membership_timestamps,
+                        other.vertices_membership_timestamps,
+                    ),
+                )
+                changed_edges = _changed_keys(
+                    (self.edges.add_timestamps, other.edges.add_timestamps),
+                    (self.edges.remove_timestamps, other.edges.remove_timestamps),
+                )
+            if changed_vertices is not None:
+                changed_vertices.update(self._missing_vertices)
+            merged_values = self._merge_vertices_values(
+                other, merged_vertices, changed_vertices
+            )
+            merged_membership_timestamps = self._merge_membership_timestamps(
+                other, merged_vertices, changed_vertices
+            )
+            removed_orphant_edges = self._remove_orphant_edges(
+                merged_edges, merged_vertices, changed_vertices, changed_edges
+            )
+            merged_value_index = self._copy_value_index()
+            if merged_value_index is not None:
+                # Only vertices with entries in other graph could have changed.
+                for vertex_id in (
+                    chain(
+                        other.vertices.add_timestamps,
+                        other.vertices.remove_timestamps,
+                    )
+                    if changed_vertices is None
+                    else changed_vertices
+                ):
+                    if vertex_id in merged_vertices and vertex_id in merged_values:
+                        merged_value_index.set(vertex_id, merged_values[vertex_id])
+                    else:
+                        merged_value_index.discard(vertex_id)
 
-        return LwwElementGraph(
+        merged_graph: LwwElementGraph[T] = LwwElementGraph(
+            query_cache_size=self._query_cache_size,
+            indexes=self.indexes,
             _initial_edges=merged_edges,
             _initial_vertices=merged_vertices,
             _initial_vertices_values=merged_values,
+            _initial_vertices_membership_timestamps=merged_membership_timestamps,
+            _initial_missing_vertices=set(),
         )
+        if merged_adjacency is not None:
+            merged_graph._adjacency = merged_adjacency
+
+        if GraphIndex.VALUES in self.indexes:
+            merged_graph._value_index = merged_value_index
+        merged_graph.version = max(self.version, other.version) + 1
+        return merged_graph, removed_orphant_edges
+
+    def _move_subscriptions(
+        self,
+        other: "LwwElementGraph[T]",
+        merged_graph: "LwwElementGraph[T]",
+        removed_orphant_edges: list[_Edge],
+    ) -> None:
+        """Moves subscriptions to the merged graph, publishes changes of merge."""
+        change_feed, self._change_feed = self._change_feed, None
+        if change_feed is None:
+            return
+        merged_graph._change_feed = change_feed
+        if change_feed.has_subscriptions:
+            self._publish_merge_changes(other, merged_graph, removed_orphant_edges)
@@ -55,12 +55,61 @@ LWW-Element-Set allows an element to be reinserted after having been removed.
 For more details about this structure, search for "Conflict-free replicated data type".
 """
 import enum
-from typing import Generic, Iterable, TypeVar
-
+from typing import (
+    TYPE_CHECKING,
+    Generic,
+    Iterable,
+    Iterator,
+    MutableMapping,
+    NamedTuple,
+    Optional,
+    TypeVar,
+)
+
+from ..types import Storage
+from ..utils.persistent_map import PersistentMap
 from ..utils.timestamp import timestamp_now
 
+if TYPE_CHECKING:
+    # Sync machinery (bloom_filter, iblt, hashlib), uuid and the timestamp index are
+    # imported on first use, so importing the set stays as cheap as the set.
+    from ..utils.bloom_filter import BloomFilter
+    from ..utils.iblt import InvertibleBloomLookupTable
+    from .timestamp_index import HistoryIndex
+
 T = TypeVar("T")
 Timestamp = int
+ReplicaId = str
+# Maps replica id to number of updates made by the replica.
+VersionVector = dict[ReplicaId, int]
+
+
+def _canonical(element):
+    """Returns representation of element which does not depend on its order."""
+    if isinstance(element, frozenset):
+        return tuple(sorted(_canonical(item) for item in element))
+    return element
+
+
+def _hash_to_int(data: bytes, digest_size: int) -> int:
+    import hashlib
+
+    return int.from_bytes(
+        hashlib.blake2b(data, digest_size=digest_size).digest(), "big"
+    )
+
+
+class AsOf(NamedTuple):
+    """Elements which were members of a set at a timestamp.
+
+    Attributes:
+        members: elements which were members at the timestamp.
+        unknown: elements whose membership at the timestamp is unknown,
+            see `LwwElementSet.lookup_as_of`.
+    """
+
+    members: list
+    unknown: list
 
 
 class Bias(enum.Enum):
@@ -71,17 +120,68 @@ class Bias(enum.Enum):
 
 
 class LwwElementSet(Generic[T]):
-    """LWW-Element-Set is a Conflict-free Replicated Data Type."""
+    """LWW-Element-Set is a Conflict-free Replicated Data Type.
+
+    Attributes:
+        bias: An enum indicating if set should be biased towards adds or removals.
+        persistent: If True, timestamps are stored in PersistentMaps, which
+            share structure with forks and merge results of the set.
+        storage: If given, timestamps are stored in maps created by the storage,
+            e.g. in tables of a SqliteScratchStorage.
+        replica_id: Id of the replica updating the set, random if not given.
+            Forks and merge results get new ids.
+
+        version_vector: Number of updates of each replica the set includes.
+            None if unknown - for sets created from given timestamps, which
+            might not include all updates preceding them. Merging such a set
+            counts as a single update of a new replica.
+
+        _initial_add_timestamps: not part of a public API, used by merge.
+        _initial_remove_timestamps: not part of a public API, used by merge.
+        _initial_version_vector: not part of a public API, used by merge.
+    """
 
     def __init__(
         self,
         bias: Bias = Bias.ADDS,
-        _initial_add_timestamps: dict[T, Timestamp] = None,
-        _initial_remove_timestamps: dict[T, Timestamp] = None,
+        persistent: bool = False,
+        storage: Optional[Storage] = None,
+        replica_id: Optional[ReplicaId] = None,
+        _initial_add_timestamps: MutableMapping[T, Timestamp] = None,
+        _initial_remove_timestamps: MutableMapping[T, Timestamp] = None,
+        _initial_version_vector: Optional[VersionVector] = None,
     ):
         self.bias = bias
-        self.add_timestamps = _initial_add_timestamps or {}
-        self.remove_timestamps = _initial_remove_timestamps or {}
+        # Generated on first update, so creating a set stays cheap.
+        self._replica_id = replica_id
+
+        self.version_vector: Optional[VersionVector]
+        if _initial_version_vector is not None:
+            self.version_vector = _initial_version_vector
+        elif _initial_add_timestamps is None and _initial_remove_timestamps is None:
+            self.version_vector = {}
+        else:
+            self.version_vector = None
+
+        if persistent and storage is not None:
+            raise ValueError("Persistent set cannot use a storage.")
+        if storage is not None:
+            mapping_factory = storage.new_map
+        else:
+            mapping_factory = PersistentMap if persistent else dict
+        self.add_timestamps: MutableMapping[T, Timestamp] = (
+            mapping_factory()
+            if _initial_add_timestamps is None
+            else _initial_add_timestamps
+        )
+        self.remove_timestamps: MutableMapping[T, Timestamp] = (
+            mapping_factory()
+            if _initial_remove_timestamps is None
+            else _initial_remove_timestamps
+        )
+        # Add and remove timestamps ordered by time. Built on first as-of query
+        # and then kept up to date by adds and removes.
+        self._history: Optional["HistoryIndex[T]"] = None
 
     def __repr__(self):
         values = set(self.values())
@@ -118,46 +218,170 @@ class LwwElementSet(Generic[T]):
 
         return timestamp_add_set > timestamp_remove_set
 
-    def add(self, element: T) -> None:
+    def add(self, element: T, timestamp: Optional[Timestamp] = None) -> None:
         """Adds element to the structure.
 
         Elements are added to an LWW-Element-Set by inserting
         the element into the add set, with a timestamp.
-        """
-        self.add_timestamps[element] = timestamp_now()
 
-    def remove(self, element: T) -> None:
+        If `timestamp` is not given, current timestamp is used. Timestamp
+        older than the one already in the add set does not replace it.
+        """
+        if timestamp is None:
+            timestamp = timestamp_now()
+        if self._keep_later(self.add_timestamps, element, timestamp):
+            if self._history is not None:
+                self._history.adds.set(element, timestamp)
+        self._count_update()
+
+    def remove(self, element: T, timestamp: Optional[Timestamp] = None) -> None:
         """Removes element from the structure.
 
         Elements are removed from the LWW-Element-Set by being added
         to the remove set, again with a timestamp.
+
+        If `timestamp` is not given, current timestamp is used. Timestamp
+        older than the one already in the remove set does not replace it.
+        """
+        if timestamp is None:
+            timestamp = timestamp_now()
+        if self._keep_later(self.remove_timestamps, element, timestamp):
+            if self._history is not None:
+                self._history.removes.set(element, timestamp)
+        self._count_update()
+
+    def remove_all(
+        self, elements: Iterable[T], timestamp: Optional[Timestamp] = None
+    ) -> None:
+        """Removes elements from the structure, all with the same timestamp.
+
+        Same as `remove` of every element, but timestamps kept in a storage
+        supporting `update_max` (e.g. SqliteMap) are stored at once.
+        """
+        if timestamp is None:
+            timestamp = timestamp_now()
+        elements = list(elements)
+        update_max = getattr(self.remove_timestamps, "update_max", None)
+        if update_max is not None:
+            update_max((element, timestamp) for element in elements)
+        else:
+            for element in elements:
+                self._keep_later(self.remove_timestamps, element, timestamp)
+        if self._history is not None:
+            for element in elements:
+                if self.remove_timestamps[element] == timestamp:
+                    self._history.removes.set(element, timestamp)
+        self._count_update(len(elements))
+
+    @staticmethod
+    def _keep_later(
+        timestamps: MutableMapping[T, Timestamp], element: T, timestamp: Timestamp
+    ) -> bool:
+        """Stores timestamp of element unless a later one is stored already.
+
+        Updates never move timestamps back, so a set always equals the merge
+        of its updates, which dominance checks of merge rely on.
         """
-        self.remove_timestamps[element] = timestamp_now()
+        stored_timestamp = timestamps.get(element)
+        if stored_timestamp is not None and stored_timestamp > timestamp:
+            return False
+        timestamps[element] = timestamp
+        return True
 
-    def _merge_timestamps(
-        self, first_to_merge: dict[T, Timestamp], second_to_merge: dict[T, Timestamp]
-    ) -> dict[T, Timestamp]:
-        """Merges two dicts of elements mapped to timestamps.
+    @property
+    def replica_id(self) -> ReplicaId:
+        if self._replica_id is None:
+            import uuid
 
-        If element is present in only one of dicts, it is placed in merged dict.
-        If element is present in both dicts, the later (bigger) timestamp is placed
-        in merged dict.
+            self._replica_id = uuid.uuid4().hex
+        return self._replica_id
+
+    def _count_update(self, updates: int = 1) -> None:
+        if self.version_vector is not None and updates:
+            replica_id = self.replica_id
+            self.version_vector[replica_id] = (
+                self.version_vector.get(replica_id, 0) + updates
+            )
+
+    def dominates(self, other: "LwwElementSet[T]") -> bool:
+        """Returns boolean indicating if set includes all updates of other set.
+
+        It is O(number of replicas) - compares version vectors of both sets.
+        If version vector of any set is unknown, returns False.
+        """
+        if self.version_vector is None or other.version_vector is None:
+            return False
+        return all(
+            self.version_vector.get(replica_id, 0) >= updates
+            for replica_id, updates in other.version_vector.items()
+        )
+
+    def _merge_version_vectors(self, other: "LwwElementSet[T]") -> VersionVector:
+        """Returns version vector of the merge of both sets.
+
+        Entries of a set with unknown version vector are counted as a single
+        update of a new replica - only the merged set and sets merged with it
+        include that update, so dominance checks stay correct.
         """
+        merged = dict(self.version_vector or {})
+        for replica_id, updates in (other.version_vector or {}).items():
+            merged[replica_id] = max(merged.get(replica_id, 0), updates)
+        if self.version_vector is None or other.version_vector is None:
+            import uuid
 
-        elements = {*first_to_merge.keys(), *second_to_merge.keys()}
-        merged: dict[T, Timestamp] = {}
+            merged[uuid.uuid4().hex] = 1
+        return merged
 
-        for element in elements:
-            first_timestamp = first_to_merge.get(element)
-            second_timestamp = second_to_merge.get(element)
+    @property
+    def persistent(self) -> bool:
+        """Returns boolean indicating if set uses persistent storage."""
+        return isinstance(self.add_timestamps, PersistentMap)
 
-            if first_timestamp is not None and second_timestamp is not None:
-                merged[element] = max(first_timestamp, second_timestamp)
-            elif second_timestamp is not None:
+    def fork(self) -> "LwwElementSet[T]":
+        """Returns an independent copy of the set.
+
+        For persistent sets it is O(1), the copy shares structure with the set.
+        """
+        return LwwElementSet(
+            bias=self.bias,
+            _initial_add_timestamps=self.add_timestamps.copy(),
+            _initial_remove_timestamps=self.remove_timestamps.copy(),
+            _initial_version_vector=(
+                None if self.version_vector is None else dict(self.version_vector)
+            ),
+        )
+
+    def _merge_timestamps(
+        self,
+        first_to_merge: MutableMapping[T, Timestamp],
+        second_to_merge: MutableMapping[T, Timestamp],
+    ) -> MutableMapping[T, Timestamp]:
+        """Merges two mappings of elements mapped to timestamps.
+
+        If element is present in only one of mappings, it is placed in merged one.
+        If element is present in both mappings, the later (bigger) timestamp is
+        placed in merged mapping. Merged mapping is of the same type as the first.
+        """
+        if isinstance(first_to_merge, PersistentMap) and isinstance(
+            second_to_merge, PersistentMap
+        ):
+            return first_to_merge.merge(second_to_merge, max)
+        # Maps of a storage merge themselves, e.g. SqliteMap in SQL. Checked by
+        # type, so the storage module is not imported until a storage is used.
+        if (
+            type(first_to_merge) is type(second_to_merge)
+            and hasattr(first_to_merge, "merge_max")
+            and first_to_merge.storage is second_to_merge.storage
+        ):
+            return first_to_merge.merge_max(second_to_merge)
+
+        merged = first_to_merge.copy()
+
+        for element, second_timestamp in second_to_merge.items():
+            first_timestamp = merged.get(element)
+
+            if first_timestamp is None or first_timestamp < second_timestamp:
                 merged[element] = second_timestamp
-            else:
-                assert first_timestamp is not None
-                merged[element] = first_timestamp
 
         return merged
 
@@ -166,9 +390,17 @@ class LwwElementSet(Generic[T]):
 
         Merging two replicas of the LWW-Element-Set consists of taking
         the union of the add sets and the union of the remove sets.
+
+        If one of the sets includes all updates of the other one,
+        merge returns its fork without merging timestamps.
         """
         assert self.bias == other.bias, "Merged sets should have same bias."
 
+        if self.dominates(other):
+            return self.fork()
+        if other.dominates(self):
+            return other.fork()
+
         merged_add_timestamps = self._merge_timestamps(
             self.add_timestamps, other.add_timestamps
         )
@@ -181,10 +413,175 @@ class LwwElementSet(Generic[T]):
             bias=self.bias,
             _initial_add_timestamps=merged_add_timestamps,
             _initial_remove_timestamps=merged_remove_timestamps,
+            _initial_version_vector=self._merge_version_vectors(other),
         )
 
         return merged_set
 
+    def _entries(self) -> Iterator[tuple[bool, T, Timestamp]]:
+        """Yields (is add entry, element, timestamp) for all timestamps."""
+        for element, timestamp in self.add_timestamps.items():
+            yield True, element, timestamp
+        for element, timestamp in self.remove_timestamps.items():
+            yield False, element, timestamp
+
+    def _entries_of(self, elements: Iterable[T]) -> Iterator[tuple[bool, T, Timestamp]]:
+        """Yields (is add entry, element, timestamp) for given elements."""
+        for element in elements:
+            if element in self.add_timestamps:
+                yield True, element, self.add_timestamps[element]
+            if element in self.remove_timestamps:
+                yield False, element, self.remove_timestamps[element]
+
+    def _partial(
+        self, entries: Iterable[tuple[bool, T, Timestamp]]
+    ) -> "LwwElementSet[T]":
+        """Returns set with given entries only, its version vector is unknown."""
+        add_timestamps: dict[T, Timestamp] = {}
+        remove_timestamps: dict[T, Timestamp] = {}
+        for is_add, element, timestamp in entries:
+            timestamps = add_timestamps if is_add else remove_timestamps
+            timestamps[element] = timestamp
+
+        return LwwElementSet(
+            bias=self.bias,
+            _initial_add_timestamps=add_timestamps,
+            _initial_remove_timestamps=remove_timestamps,
+        )
+
+    @staticmethod
+    def _encode_entry(is_add: bool, element: T, timestamp: Timestamp) -> bytes:
+        return repr((is_add, _canonical(element), timestamp)).encode()
+
+    def summary(self, error_rate: float = 0.01) -> "BloomFilter":
+        """Returns Bloom filter of all (element, timestamp) entries of the set.
+
+        Other replica passes the summary to `delta` to get entries this
+        set probably does not have.
+        """
+        from ..utils.bloom_filter import BloomFilter
+
+        entries_count = len(self.add_timestamps) + len(self.remove_timestamps)
+        summary = BloomFilter(entries_count, error_rate)
+        for entry in self._entries():
+            summary.add(self._encode_entry(*entry))
+        return summary
+
+    def delta(self, summary: "BloomFilter") -> "LwwElementSet[T]":
+        """Returns set with entries not present in summarized set.
+
+        Because of Bloom filter false positives, some missing entries might
+        not be included - use `exact_delta` afterwards to get them.
+        """
+        return self._partial(
+            entry
+            for entry in self._entries()
+            if self._encode_entry(*entry) not in summary
+        )
+
+    def _entry_key(self, entry: tuple[bool, T, Timestamp]) -> int:
+        return _hash_to_int(self._encode_entry(*entry), 8)
+
+    def digests(self, expected_difference: int = 64) -> "InvertibleBloomLookupTable":
+        """Returns invertible Bloom lookup table of entries of the set.
+
+        Table size depends only on `expected_difference` - the expected
+        number of entries present in only one of the replicas.
+        """
+        from ..utils.iblt import InvertibleBloomLookupTable
+
+        digests = InvertibleBloomLookupTable.for_difference(expected_difference)
+        digests.add_all(self._entry_key(entry) for entry in self._entries())
+        return digests
+
+    def exact_delta(
+        self, digests: "InvertibleBloomLookupTable"
+    ) -> Optional["LwwElementSet[T]"]:
+        """Returns set with entries not present in the set with given digests.
+
+        Given digests are digests of other replica. After merging the returned
+        set, other replica has all entries of this set. Returns None if the
+        replicas differ by too many entries to decode them from digests of
+        that size - then the other replica should send bigger digests.
+        """
+        from ..utils.iblt import InvertibleBloomLookupTable
+
+        own_digests = InvertibleBloomLookupTable(
+            digests.cells_count, digests.hashes_count
+        )
+        entries = {self._entry_key(entry): entry for entry in self._entries()}
+        own_digests.add_all(entries)
+        decoded_keys = own_digests.subtract(digests).decode()
+        if decoded_keys is None:
+            return None
+        own_keys, _ = decoded_keys
+        return self._partial(entries[key] for key in own_keys if key in entries)
+
+    def lookup_as_of(self, element: T, timestamp: Timestamp) -> Optional[bool]:
+        """Returns boolean indicating if `element` was a member at `timestamp`.
+
+        The set keeps only the last add and remove timestamp of every element.
+        Assuming members are not added and non-members are not removed (which
+        LwwElementGraph does not allow), the answer is exact unless both
+        timestamps are after `timestamp` - then earlier updates, which decide
+        the answer, are lost and None is returned.
+        """
+        return self._lookup_as_of(
+            self.add_timestamps.get(element),
+            self.remove_timestamps.get(element),
+            timestamp,
+        )
+
+    def _lookup_as_of(
+        self,
+        add_timestamp: Optional[Timestamp],
+        remove_timestamp: Optional[Timestamp],
+        timestamp: Timestamp,
+    ) -> Optional[bool]:
+        if add_timestamp is None:
+            return False
+        if add_timestamp > timestamp:
+            if remove_timestamp is not None and remove_timestamp > timestamp:
+                return None
+            # Not added since the last remove (or ever) before `timestamp`.
+            return False
+
+        if remove_timestamp is None or remove_timestamp > timestamp:
+            return True
+        if add_timestamp == remove_timestamp:
+            return self.bias == Bias.ADDS
+        return add_timestamp > remove_timestamp
+
+    def _get_history(self) -> "HistoryIndex[T]":
+        """Returns index of add and remove timestamps, builds it if not built."""
+        if self._history is None:
+            from .timestamp_index import HistoryIndex
+
+            self._history = HistoryIndex(
+                self.add_timestamps.items(), self.remove_timestamps.items()
+            )
+        return self._history
+
+    def values_as_of(self, timestamp: Timestamp) -> AsOf:
+        """Returns members of the set at `timestamp`, see `lookup_as_of`.
+
+        Runs in O(log n + k), where k is the number of elements last added
+        before `timestamp` or last removed after it.
+        """
+        history = self._get_history()
+        return AsOf(
+            members=[
+                element
+                for element in history.adds.up_to(timestamp)
+                if self.lookup_as_of(element, timestamp)
+            ],
+            unknown=[
+                element
+                for element in history.removes.after(timestamp)
+                if self.lookup_as_of(element, timestamp) is None
+            ],
+        )
+
     def values(self) -> Iterable[T]:
         """Returns iterable over members of structure."""
         elements_in_add = self.add_timestamps.keys()
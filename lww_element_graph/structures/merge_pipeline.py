@@ -0,0 +1,186 @@
+"""This module contains implementation of a background merge pipeline.
+
+MergePipeline keeps the current graph and a queue of incoming replicas
+(or deltas). A worker thread takes all queued replicas at once, merges them
+into a single replica and merges that into the current graph. Merge builds
+a new graph (a shadow copy), which replaces the current one in a single
+assignment - readers never see a half-merged graph and are never blocked
+by merging. If the coalesced merge fails, replicas are merged one by one
+and only the ones failing to merge are dropped.
+
+Graph returned by `MergePipeline.current` should be treated as immutable.
+Subscriptions of the graph given to the pipeline move to the current graph
+with every merge, so they receive changes made by the merges.
+"""
+import threading
+import time
+from collections import deque
+from functools import reduce
+from typing import Generic, NamedTuple, Optional, TypeVar
+
+from lww_element_graph.structures.lww_element_graph import LwwElementGraph
+from lww_element_graph.types import SupportsRichComparison
+
+T = TypeVar("T", bound=SupportsRichComparison)
+
+
+class MergePipelineMetrics(NamedTuple):
+    """Metrics of a MergePipeline.
+
+    Attributes:
+        queue_depth: number of replicas waiting to be merged.
+        merges: number of merges into the current graph.
+        merged_replicas: number of replicas merged, bigger than `merges`
+            when bursts of replicas were coalesced.
+        last_merge_lag: seconds between submission of the oldest replica
+            of the last merge and swapping in its result.
+        max_merge_lag: the biggest lag of all merges.
+    """
+
+    queue_depth: int
+    merges: int
+    merged_replicas: int
+    last_merge_lag: float
+    max_merge_lag: float
+
+
+class MergePipeline(Generic[T]):
+    """Merges submitted replicas into the current graph in a worker thread."""
+
+    def __init__(self, graph: LwwElementGraph[T]):
+        self._current = graph
+        self._queue: deque[tuple[LwwElementGraph[T], float]] = deque()
+        self._condition = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._stopping = False
+        self._merging = False
+        # Error of the last replica which failed to merge, it is dropped.
+        self.last_error: Optional[Exception] = None
+
+        self._merges = 0
+        self._merged_replicas = 0
+        self._last_merge_lag = 0.0
+        self._max_merge_lag = 0.0
+
+    def __repr__(self):
+        return f"<MergePipeline {self.metrics()}>"
+
+    def __enter__(self) -> "MergePipeline[T]":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    @property
+    def current(self) -> LwwElementGraph[T]:
+        """Returns the current graph, it should not be modified."""
+        return self._current
+
+    def start(self) -> None:
+        """Starts the worker thread."""
+        with self._condition:
+            if self._worker is not None:
+                raise RuntimeError("Pipeline already started.")
+            self._stopping = False
+            self._worker = threading.Thread(target=self._run, daemon=True)
+            self._worker.start()
+
+    def stop(self) -> None:
+        """Merges queued replicas and stops the worker thread."""
+        with self._condition:
+            if self._worker is None:
+                return
+            worker = self._worker
+            self._stopping = True
+            self._condition.notify_all()
+        worker.join()
+        self._worker = None
+
+    def submit(self, replica: LwwElementGraph[T]) -> None:
+        """Queues replica to be merged into the current graph.
+
+        Raises GraphOperationError if replica has a different bias.
+        """
+        self._current._assert_bias_equals(replica)
+        with self._condition:
+            self._queue.append((replica, time.monotonic()))
+            self._condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Waits until all queued replicas are merged.
+
+        Returns False if timeout passed before that.
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._queue and not self._merging, timeout
+            )
+
+    def metrics(self) -> MergePipelineMetrics:
+        with self._condition:
+            return MergePipelineMetrics(
+                queue_depth=len(self._queue),
+                merges=self._merges,
+                merged_replicas=self._merged_replicas,
+                last_merge_lag=self._last_merge_lag,
+                max_merge_lag=self._max_merge_lag,
+            )
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue or self._stopping)
+                if not self._queue:
+                    return
+                # Coalesce all queued replicas into a single merge.
+                batch = list(self._queue)
+                self._queue.clear()
+                self._merging = True
+
+            merged_batch, merges, error = self._merge(batch)
+            with self._condition:
+                self._merging = False
+                if merged_batch:
+                    lag = time.monotonic() - min(
+                        submitted for _, submitted in merged_batch
+                    )
+                    self._merges += merges
+                    self._merged_replicas += len(merged_batch)
+                    self._last_merge_lag = lag
+                    self._max_merge_lag = max(self._max_merge_lag, lag)
+                if error is not None:
+                    self.last_error = error
+                self._condition.notify_all()
+
+    def _merge(
+        self, batch: list[tuple[LwwElementGraph[T], float]]
+    ) -> tuple[list[tuple[LwwElementGraph[T], float]], int, Optional[Exception]]:
+        """Merges batch into the current graph.
+
+        Returns merged part of the batch, number of merges into the current
+        graph and error of the last replica which failed to merge.
+        """
+        try:
+            incoming = reduce(LwwElementGraph.merge, [replica for replica, _ in batch])
+            # Merge builds a new graph, current one is not modified.
+            self._current = self._current.merge(incoming, move_subscriptions=True)
+        except Exception:
+            # Merge replicas one by one, so only replicas failing to merge
+            # are dropped.
+            return self._merge_one_by_one(batch)
+        return batch, 1, None
+
+    def _merge_one_by_one(
+        self, batch: list[tuple[LwwElementGraph[T], float]]
+    ) -> tuple[list[tuple[LwwElementGraph[T], float]], int, Optional[Exception]]:
+        merged_batch = []
+        error: Optional[Exception] = None
+        for replica, submitted in batch:
+            try:
+                self._current = self._current.merge(replica, move_subscriptions=True)
+            except Exception as merge_error:
+                error = merge_error
+            else:
+                merged_batch.append((replica, submitted))
+        return merged_batch, len(merged_batch), error
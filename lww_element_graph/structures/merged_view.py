@@ -0,0 +1,128 @@
+"""This module contains implementation of a lazy merged view over LWW-Element-Graphs.
+
+MergedView answers queries against a merge of several graphs without
+materializing the merge. Each query resolves only the element it asks about,
+with the same rules as LwwElementGraph.merge, and caches the result.
+"""
+from functools import reduce
+from typing import Generic, Optional, TypeVar
+
+from lww_element_graph.structures.lww_element_graph import (
+    GraphOperationError,
+    LwwElementGraph,
+    VertexId,
+    _Edge,
+)
+from lww_element_graph.structures.lww_element_set import LwwElementSet
+from lww_element_graph.types import SupportsRichComparison
+
+T = TypeVar("T", bound=SupportsRichComparison)
+E = TypeVar("E")
+
+
+class MergedView(Generic[T]):
+    """Read-only view of a merge of several graphs.
+
+    Graphs should not be modified while the view is in use - resolved
+    results are cached and are not invalidated.
+    """
+
+    def __init__(self, *graphs: LwwElementGraph[T]):
+        if not graphs:
+            raise GraphOperationError("MergedView requires at least one graph.")
+
+        for graph in graphs[1:]:
+            graphs[0]._assert_bias_equals(graph)
+
+        self.graphs = graphs
+        self._bias = graphs[0].vertices.bias
+        self._vertices_cache: dict[VertexId, bool] = {}
+        self._edges_cache: dict[_Edge, bool] = {}
+        self._values_cache: dict[VertexId, Optional[T]] = {}
+
+    def __repr__(self):
+        return f"<MergedView {len(self.graphs)=}>"
+
+    def _lookup(self, element_sets: list[LwwElementSet[E]], element: E) -> bool:
+        """Resolves membership of element in merge of sets."""
+        add_timestamps = [
+            element_set.add_timestamps[element]
+            for element_set in element_sets
+            if element in element_set.add_timestamps
+        ]
+        if not add_timestamps:
+            return False
+
+        remove_timestamps = [
+            element_set.remove_timestamps[element]
+            for element_set in element_sets
+            if element in element_set.remove_timestamps
+        ]
+
+        # Merge of sets restricted to a single element.
+        merged_set: LwwElementSet[E] = LwwElementSet(
+            bias=self._bias,
+            _initial_add_timestamps={element: max(add_timestamps)},
+            _initial_remove_timestamps=(
+                {element: max(remove_timestamps)} if remove_timestamps else {}
+            ),
+        )
+        return merged_set.lookup(element)
+
+    def has_vertex(self, vertex_id: VertexId) -> bool:
+        """Returns boolean indicating if vertex is in merged graph."""
+        if vertex_id not in self._vertices_cache:
+            self._vertices_cache[vertex_id] = self._lookup(
+                [graph.vertices for graph in self.graphs], vertex_id
+            )
+        return self._vertices_cache[vertex_id]
+
+    def has_edge(self, first_vertex_id: VertexId, second_vertex_id: VertexId) -> bool:
+        """Returns boolean indicating if merged graph has edge connecting vertices.
+
+        Like in LwwElementGraph.merge, edge connecting a removed vertex is
+        not in merged graph.
+        """
+        edge = frozenset({first_vertex_id, second_vertex_id})
+        if edge not in self._edges_cache:
+            self._edges_cache[edge] = (
+                self._lookup([graph.edges for graph in self.graphs], edge)
+                and self.has_vertex(first_vertex_id)
+                and self.has_vertex(second_vertex_id)
+            )
+        return self._edges_cache[edge]
+
+    def get_vertex_value(self, vertex_id: VertexId) -> Optional[T]:
+        """Returns value associated with a vertex, None if no value associated.
+
+        Value is taken from the graph which assigned it latest. When several
+        graphs assigned values at the same moment, the biggest value wins.
+        """
+        if not self.has_vertex(vertex_id):
+            raise GraphOperationError(f"{vertex_id=} not found in graph")
+
+        if vertex_id not in self._values_cache:
+            candidates = [
+                (
+                    graph.vertices.add_timestamps[vertex_id],
+                    graph.vertices_values[vertex_id],
+                )
+                for graph in self.graphs
+                if vertex_id in graph.vertices_values
+            ]
+            value: Optional[T] = None
+            if candidates:
+                latest_timestamp = max(timestamp for timestamp, _ in candidates)
+                value = max(
+                    candidate_value
+                    for timestamp, candidate_value in candidates
+                    if timestamp == latest_timestamp
+                )
+            self._values_cache[vertex_id] = value
+        return self._values_cache[vertex_id]
+
+    def materialize(self) -> LwwElementGraph[T]:
+        """Returns merged graph built with LwwElementGraph.merge."""
+        if len(self.graphs) == 1:
+            return self.graphs[0].fork()
+        return reduce(LwwElementGraph.merge, self.graphs)
@@ -0,0 +1,86 @@
+"""This module contains implementation of a query result cache of a LWW-Element-Graph.
+
+QueryCache is a bounded LRU cache. Each cached result is stored together
+with vertices it depends on - when graph operation touches any of those
+vertices, the result is invalidated, while results of unrelated queries stay
+in the cache.
+
+Cache operations are guarded by a lock, so concurrent readers of a graph
+can share its cache.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, NamedTuple, Tuple
+
+
+class CacheStats(NamedTuple):
+    """Statistics of a QueryCache."""
+
+    hits: int
+    misses: int
+    size: int
+
+
+class QueryCache:
+    """LRU cache of query results invalidated by touched vertices."""
+
+    def __init__(self, max_size: int):
+        if max_size < 1:
+            raise ValueError("Cache size should be positive.")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._results: OrderedDict[Hashable, Tuple[Any, frozenset]] = OrderedDict()
+        self._dependent_keys: dict[Hashable, set[Hashable]] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<QueryCache {self.stats()}>"
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self.hits, self.misses, len(self._results))
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Returns (boolean indicating if result was found, result)."""
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is None:
+                self.misses += 1
+                return False, None
+
+            self.hits += 1
+            self._results.move_to_end(key)
+            return True, cached[0]
+
+    def put(self, key: Hashable, result: Any, dependencies: Iterable[Hashable]):
+        """Caches result, which is valid until any of dependencies is touched."""
+        dependencies = frozenset(dependencies)
+        with self._lock:
+            self._discard(key)
+
+            self._results[key] = (result, dependencies)
+            for dependency in dependencies:
+                self._dependent_keys.setdefault(dependency, set()).add(key)
+
+            if len(self._results) > self.max_size:
+                least_recently_used_key = next(iter(self._results))
+                self._discard(least_recently_used_key)
+
+    def invalidate(self, touched: Iterable[Hashable]) -> None:
+        """Removes results depending on any of touched elements."""
+        with self._lock:
+            for dependency in touched:
+                for key in tuple(self._dependent_keys.get(dependency, ())):
+                    self._discard(key)
+
+    def _discard(self, key: Hashable) -> None:
+        cached = self._results.pop(key, None)
+        if cached is None:
+            return
+
+        for dependency in cached[1]:
+            dependent_keys = self._dependent_keys[dependency]
+            dependent_keys.discard(key)
+            if not dependent_keys:
+                del self._dependent_keys[dependency]
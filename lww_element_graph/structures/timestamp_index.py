@@ -0,0 +1,88 @@
+"""This module contains implementation of a timestamp-ordered index of elements.
+
+TimestampIndex keeps elements sorted by their timestamps, so elements with
+timestamps up to a given one are found with a binary search in O(log n + k),
+where k is the number of found elements.
+
+Elements are never compared - entries are ordered by (timestamp, sequence
+number), so elements can be e.g. frozensets (edges). An element indexed
+again leaves its old entry behind, stale entries are skipped by queries
+and dropped once they outnumber the live ones.
+
+HistoryIndex pairs indexes of add and remove timestamps of a set.
+"""
+import bisect
+import itertools
+import math
+from typing import Generic, Hashable, Iterable, TypeVar
+
+T = TypeVar("T", bound=Hashable)
+Timestamp = int
+
+
+class TimestampIndex(Generic[T]):
+    """Index of elements ordered by their timestamps."""
+
+    def __init__(self, timestamps: Iterable[tuple[T, Timestamp]] = ()):
+        # Sorted (timestamp, sequence number, element) entries.
+        self._entries: list[tuple[Timestamp, int, T]] = []
+        # Maps element to sequence number of its live entry.
+        self._sequence_numbers: dict[T, int] = {}
+        self._counter = itertools.count()
+        for element, timestamp in sorted(timestamps, key=lambda item: item[1]):
+            self.set(element, timestamp)
+
+    def __len__(self) -> int:
+        return len(self._sequence_numbers)
+
+    def set(self, element: T, timestamp: Timestamp) -> None:
+        """Indexes timestamp of an element, replacing its previous timestamp.
+
+        O(log n) for timestamps not older than all indexed ones, which is
+        the case for timestamps of local updates.
+        """
+        sequence_number = next(self._counter)
+        self._sequence_numbers[element] = sequence_number
+        bisect.insort(self._entries, (timestamp, sequence_number, element))
+        if len(self._entries) > 2 * len(self._sequence_numbers):
+            self._compact()
+
+    def _compact(self) -> None:
+        sequence_numbers = self._sequence_numbers
+        self._entries = [
+            entry for entry in self._entries if sequence_numbers[entry[2]] == entry[1]
+        ]
+
+    def _live(self, entries: list[tuple[Timestamp, int, T]]) -> list[T]:
+        sequence_numbers = self._sequence_numbers
+        return [
+            element
+            for _, sequence_number, element in entries
+            if sequence_numbers[element] == sequence_number
+        ]
+
+    def up_to(self, timestamp: Timestamp) -> list[T]:
+        """Returns elements with timestamps <= timestamp, ordered by timestamp."""
+        end = bisect.bisect_right(self._entries, (timestamp, math.inf))
+        return self._live(self._entries[:end])
+
+    def after(self, timestamp: Timestamp) -> list[T]:
+        """Returns elements with timestamps > timestamp, ordered by timestamp."""
+        start = bisect.bisect_right(self._entries, (timestamp, math.inf))
+        return self._live(self._entries[start:])
+
+
+class HistoryIndex(Generic[T]):
+    """Add and remove timestamps of elements, indexed for as-of queries.
+
+    Elements which could be members at a timestamp were added up to it,
+    elements with unknown membership at a timestamp were removed after it.
+    """
+
+    def __init__(
+        self,
+        add_timestamps: Iterable[tuple[T, Timestamp]] = (),
+        remove_timestamps: Iterable[tuple[T, Timestamp]] = (),
+    ):
+        self.adds: TimestampIndex[T] = TimestampIndex(add_timestamps)
+        self.removes: TimestampIndex[T] = TimestampIndex(remove_timestamps)
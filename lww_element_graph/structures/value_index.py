@@ -0,0 +1,58 @@
+"""This module contains implementation of a sorted index of vertices values.
+
+ValueIndex keeps (value, vertex id) pairs in a sorted list, so vertices with
+a given value or with values in a range are found with a binary search in
+O(log n + k), where k is the number of found vertices.
+"""
+import bisect
+from typing import Generic, Hashable, Optional, TypeVar
+
+from lww_element_graph.types import SupportsRichComparison
+
+T = TypeVar("T", bound=SupportsRichComparison)
+K = TypeVar("K", bound=Hashable)
+
+
+class ValueIndex(Generic[K, T]):
+    """Sorted index mapping values to keys having them."""
+
+    def __init__(self):
+        self._entries: list[tuple[T, K]] = []
+        self._values: dict[K, T] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def copy(self) -> "ValueIndex[K, T]":
+        """Returns an independent copy of the index in O(n)."""
+        value_index: ValueIndex[K, T] = ValueIndex()
+        value_index._entries = self._entries.copy()
+        value_index._values = self._values.copy()
+        return value_index
+
+    def set(self, key: K, value: T) -> None:
+        """Indexes value of a key, replacing its previous value."""
+        self.discard(key)
+        bisect.insort(self._entries, (value, key))
+        self._values[key] = value
+
+    def discard(self, key: K) -> None:
+        """Removes key from the index if present."""
+        if key not in self._values:
+            return
+        entry = (self._values.pop(key), key)
+        del self._entries[bisect.bisect_left(self._entries, entry)]
+
+    def get(self, key: K) -> Optional[T]:
+        return self._values.get(key)
+
+    def range(self, low: T, high: T) -> list[K]:
+        """Returns keys with low <= value <= high, ordered by value."""
+        entries = self._entries
+        start = bisect.bisect_left(entries, (low,))
+        end = start
+        # (low,) sorts before all entries with value equal to low. End is found
+        # by a scan, which costs O(k) like copying found keys does anyway.
+        while end < len(entries) and not high < entries[end][0]:
+            end += 1
+        return [key for _, key in entries[start:end]]
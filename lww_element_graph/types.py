@@ -1,4 +1,4 @@
-from typing import Protocol, Any, Union
+from typing import Protocol, Any, MutableMapping, Union
 
 
 class SupportsDunderLT(Protocol):
@@ -12,3 +12,8 @@ class SupportsDunderGT(Protocol):
 
 
 SupportsRichComparison = Union[SupportsDunderLT, SupportsDunderGT]
+
+
+class Storage(Protocol):
+    def new_map(self, serialize_values: bool = False) -> MutableMapping[Any, Any]:
+        ...
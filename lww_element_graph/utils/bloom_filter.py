@@ -0,0 +1,66 @@
+"""This module contains implementation of a Bloom filter.
+
+Bloom filter is a compact probabilistic set - it answers if an item
+is in the set with no false negatives and a configurable rate of false
+positives. It is used to summarize replica entries during sync.
+"""
+import hashlib
+import math
+import struct
+from typing import Iterable
+
+_HEADER = struct.Struct(">II")
+
+
+class BloomFilter:
+    """Bloom filter of byte strings.
+
+    Attributes:
+        capacity: expected number of items.
+        error_rate: expected rate of false positives when filter holds
+            `capacity` items.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        if not 0 < error_rate < 1:
+            raise ValueError("Error rate should be between 0 and 1.")
+        capacity = max(capacity, 1)
+        self.bits_count = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes_count = max(1, round(self.bits_count / capacity * math.log(2)))
+        self._bits = bytearray((self.bits_count + 7) // 8)
+
+    def __repr__(self):
+        return f"<BloomFilter {self.bits_count=} {self.hashes_count=}>"
+
+    def _positions(self, item: bytes) -> Iterable[int]:
+        # Double hashing - k positions derived from two 64-bit hashes.
+        digest = hashlib.blake2b(item, digest_size=16).digest()
+        first_hash, second_hash = struct.unpack(">QQ", digest)
+        for i in range(self.hashes_count):
+            yield (first_hash + i * second_hash) % self.bits_count
+
+    def add(self, item: bytes) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: bytes) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    def to_bytes(self) -> bytes:
+        """Serializes the filter, e.g. to send it to other replica."""
+        return _HEADER.pack(self.bits_count, self.hashes_count) + bytes(self._bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BloomFilter":
+        """Deserializes filter serialized with `to_bytes`."""
+        bloom_filter = cls.__new__(cls)
+        bloom_filter.bits_count, bloom_filter.hashes_count = _HEADER.unpack_from(data)
+        bloom_filter._bits = bytearray(data[_HEADER.size :])
+        if len(bloom_filter._bits) != (bloom_filter.bits_count + 7) // 8:
+            raise ValueError("Invalid serialized Bloom filter.")
+        return bloom_filter
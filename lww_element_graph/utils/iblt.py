@@ -0,0 +1,160 @@
+"""This module contains implementation of an invertible Bloom lookup table.
+
+Invertible Bloom lookup table (IBLT) is a compact set of 64-bit keys which
+can be subtracted from another one. Keys of both tables cancel out, so
+the difference holds only keys present in one of the tables and can be
+decoded ("peeled") if it has about 1.5 times more cells than such keys.
+Size of a table depends on the expected difference of the sets, not on
+the sizes of the sets. It is used to find entries missing from a replica
+during sync.
+"""
+import hashlib
+import math
+import struct
+from typing import Iterable, Optional
+
+_HEADER = struct.Struct(">II")
+_CELL = struct.Struct(">qQQ")
+_KEY = struct.Struct(">Q")
+# A 64-byte digest gives 8 hashes, one is the check hash.
+_MAX_HASHES_COUNT = 8
+# Cells per expected key, with a few extra cells for small differences.
+_CELLS_PER_KEY = 1.5
+_EXTRA_CELLS = 30
+
+
+class InvertibleBloomLookupTable:
+    """Invertible Bloom lookup table of 64-bit keys.
+
+    Attributes:
+        cells_count: number of cells, a multiple of `hashes_count`.
+        hashes_count: number of cells every key is stored in.
+    """
+
+    def __init__(self, cells_count: int, hashes_count: int = 3):
+        if not 0 < hashes_count < _MAX_HASHES_COUNT:
+            raise ValueError(
+                f"Number of hashes should be between 1 and {_MAX_HASHES_COUNT - 1}."
+            )
+        # Every hash function has its own range of cells, so keys are
+        # always stored in `hashes_count` different cells.
+        self.hashes_count = hashes_count
+        self.cells_count = max(1, math.ceil(cells_count / hashes_count)) * hashes_count
+        self._counts = [0] * self.cells_count
+        self._key_sums = [0] * self.cells_count
+        self._check_sums = [0] * self.cells_count
+
+    def __repr__(self):
+        return f"<InvertibleBloomLookupTable {self.cells_count=} {self.hashes_count=}>"
+
+    @classmethod
+    def for_difference(
+        cls, expected_difference: int, hashes_count: int = 3
+    ) -> "InvertibleBloomLookupTable":
+        """Returns table able to decode about `expected_difference` keys."""
+        if expected_difference < 0:
+            raise ValueError("Expected difference should not be negative.")
+        return cls(
+            math.ceil(expected_difference * _CELLS_PER_KEY) + _EXTRA_CELLS,
+            hashes_count,
+        )
+
+    def _hashes(self, key: int) -> tuple[list[int], int]:
+        """Returns cells of key and its check hash."""
+        # Hashes are independent - with double hashing keys would share
+        # all cells whenever both hashes are equal modulo the range size.
+        digest = hashlib.blake2b(
+            _KEY.pack(key), digest_size=_KEY.size * (self.hashes_count + 1)
+        ).digest()
+        check_hash, *hashes = (hash_ for hash_, in _KEY.iter_unpack(digest))
+        range_size = self.cells_count // self.hashes_count
+        cells = [i * range_size + hash_ % range_size for i, hash_ in enumerate(hashes)]
+        return cells, check_hash
+
+    def _update(self, key: int, count: int) -> None:
+        cells, check_hash = self._hashes(key)
+        for cell in cells:
+            self._counts[cell] += count
+            self._key_sums[cell] ^= key
+            self._check_sums[cell] ^= check_hash
+
+    def add(self, key: int) -> None:
+        self._update(key, 1)
+
+    def add_all(self, keys: Iterable[int]) -> None:
+        for key in keys:
+            self._update(key, 1)
+
+    def subtract(
+        self, other: "InvertibleBloomLookupTable"
+    ) -> "InvertibleBloomLookupTable":
+        """Returns table of keys of this table minus keys of other table."""
+        if (self.cells_count, self.hashes_count) != (
+            other.cells_count,
+            other.hashes_count,
+        ):
+            raise ValueError("Tables should have same number of cells and hashes.")
+        difference = InvertibleBloomLookupTable(self.cells_count, self.hashes_count)
+        difference._counts = [a - b for a, b in zip(self._counts, other._counts)]
+        difference._key_sums = [a ^ b for a, b in zip(self._key_sums, other._key_sums)]
+        difference._check_sums = [
+            a ^ b for a, b in zip(self._check_sums, other._check_sums)
+        ]
+        return difference
+
+    def _is_pure(self, cell: int) -> bool:
+        """Returns boolean indicating if cell holds a single key."""
+        if self._counts[cell] not in (1, -1):
+            return False
+        _, check_hash = self._hashes(self._key_sums[cell])
+        return self._check_sums[cell] == check_hash
+
+    def decode(self) -> Optional[tuple[list[int], list[int]]]:
+        """Returns keys only in this table and keys only in subtracted table.
+
+        Returns None if the table holds too many keys to decode them, then
+        a bigger table is needed. Decoding empties the table.
+        """
+        own_keys: list[int] = []
+        other_keys: list[int] = []
+        pure_cells = [cell for cell in range(self.cells_count) if self._is_pure(cell)]
+        while pure_cells:
+            cell = pure_cells.pop()
+            if not self._is_pure(cell):
+                continue
+            key, count = self._key_sums[cell], self._counts[cell]
+            (own_keys if count == 1 else other_keys).append(key)
+            self._update(key, -count)
+            pure_cells.extend(
+                key_cell for key_cell in self._hashes(key)[0] if self._is_pure(key_cell)
+            )
+
+        if any(self._counts) or any(self._key_sums) or any(self._check_sums):
+            return None
+        return own_keys, other_keys
+
+    def to_bytes(self) -> bytes:
+        """Serializes the table, e.g. to send it to other replica."""
+        return _HEADER.pack(self.cells_count, self.hashes_count) + b"".join(
+            _CELL.pack(*cell)
+            for cell in zip(self._counts, self._key_sums, self._check_sums)
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "InvertibleBloomLookupTable":
+        """Deserializes table serialized with `to_bytes`."""
+        cells_count, hashes_count = _HEADER.unpack_from(data)
+        if (
+            not 0 < hashes_count < _MAX_HASHES_COUNT
+            or cells_count % hashes_count
+            or len(data) != _HEADER.size + cells_count * _CELL.size
+        ):
+            raise ValueError("Invalid serialized invertible Bloom lookup table.")
+        table = cls(cells_count, hashes_count)
+        for cell, (count, key_sum, check_sum) in enumerate(
+            _CELL.iter_unpack(data[_HEADER.size :])
+        ):
+            table._counts[cell] = count
+            table._key_sums[cell] = key_sum
+            table._check_sums[cell] = check_sum
+        return table
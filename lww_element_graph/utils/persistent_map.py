@@ -0,0 +1,409 @@
+"""This module contains implementation of a persistent hash map.
+
+The map is a Hash Array Mapped Trie (HAMT). Each node of the trie holds up to
+32 entries indexed by 5 bits of a key hash. Nodes are never modified once
+created - an update copies only the nodes on the path from the root to the
+updated entry (O(log n) nodes) and shares the rest of the trie.
+
+Thanks to that `PersistentMap.copy()` is O(1) and a copy updated with k
+changes costs O(k log n) additional memory. Merging two maps that share
+structure, or finding their differences, skips shared subtrees, so it costs
+O(changes log n) as well.
+"""
+from typing import Callable, Iterable, Iterator, MutableMapping, Optional, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+_HASH_MASK = (1 << 64) - 1
+
+# Leaves of the trie are plain tuples (hash, key, value).
+_Leaf = tuple
+
+
+def _hash(key) -> int:
+    return hash(key) & _HASH_MASK
+
+
+def _bit_count(value: int) -> int:
+    return bin(value).count("1")
+
+
+class _BitmapNode:
+    """Node holding entries (leaves or nodes) at positions set in bitmap."""
+
+    __slots__ = ("bitmap", "entries")
+
+    def __init__(self, bitmap: int, entries: tuple):
+        self.bitmap = bitmap
+        self.entries = entries
+
+
+class _CollisionNode:
+    """Node holding leaves of different keys with equal hashes."""
+
+    __slots__ = ("hash", "leaves")
+
+    def __init__(self, key_hash: int, leaves: tuple):
+        self.hash = key_hash
+        self.leaves = leaves
+
+
+_EMPTY = _BitmapNode(0, ())
+
+
+def _find(node, key_hash: int, key) -> Optional[_Leaf]:
+    """Returns leaf with the key, None if key not found."""
+    shift = 0
+    while True:
+        if type(node) is _CollisionNode:
+            for leaf in node.leaves:
+                if leaf[1] == key:
+                    return leaf
+            return None
+
+        bit = 1 << ((key_hash >> shift) & _MASK)
+        if not node.bitmap & bit:
+            return None
+
+        entry = node.entries[_bit_count(node.bitmap & (bit - 1))]
+        if type(entry) is tuple:
+            if entry[0] == key_hash and entry[1] == key:
+                return entry
+            return None
+
+        node = entry
+        shift += _BITS
+
+
+def _join(shift: int, first_entry, first_hash: int, second_entry, second_hash: int):
+    """Builds a node holding two entries (leaves or collision nodes)."""
+    if first_hash == second_hash:
+        return _CollisionNode(first_hash, (first_entry, second_entry))
+
+    first_index = (first_hash >> shift) & _MASK
+    second_index = (second_hash >> shift) & _MASK
+    if first_index == second_index:
+        child = _join(shift + _BITS, first_entry, first_hash, second_entry, second_hash)
+        return _BitmapNode(1 << first_index, (child,))
+
+    bitmap = (1 << first_index) | (1 << second_index)
+    if first_index < second_index:
+        return _BitmapNode(bitmap, (first_entry, second_entry))
+    return _BitmapNode(bitmap, (second_entry, first_entry))
+
+
+def _resolve_leaf(existing: _Leaf, leaf: _Leaf, resolve) -> _Leaf:
+    """Returns leaf with value resolved from existing and new leaf."""
+    value = leaf[2] if resolve is None else resolve(existing[2], leaf[2])
+    if value is existing[2]:
+        return existing
+    return (existing[0], existing[1], value)
+
+
+def _assoc(node, shift: int, leaf: _Leaf, resolve) -> tuple:
+    """Returns (node with the leaf, boolean indicating if key was added).
+
+    If key is already present, value is resolved with `resolve(existing, new)`,
+    or replaced if `resolve` is None. Returns the same node if nothing changed.
+    """
+    key_hash, key, _ = leaf
+
+    if type(node) is _CollisionNode:
+        if key_hash != node.hash:
+            return _join(shift, node, node.hash, leaf, key_hash), True
+        for index, existing in enumerate(node.leaves):
+            if existing[1] == key:
+                new_leaf = _resolve_leaf(existing, leaf, resolve)
+                if new_leaf is existing:
+                    return node, False
+                leaves = node.leaves[:index] + (new_leaf,) + node.leaves[index + 1 :]
+                return _CollisionNode(key_hash, leaves), False
+        return _CollisionNode(key_hash, node.leaves + (leaf,)), True
+
+    bit = 1 << ((key_hash >> shift) & _MASK)
+    index = _bit_count(node.bitmap & (bit - 1))
+    if not node.bitmap & bit:
+        entries = node.entries[:index] + (leaf,) + node.entries[index:]
+        return _BitmapNode(node.bitmap | bit, entries), True
+
+    entry = node.entries[index]
+    if type(entry) is tuple:
+        if entry[0] == key_hash and entry[1] == key:
+            new_entry, added = _resolve_leaf(entry, leaf, resolve), False
+        else:
+            new_entry, added = (
+                _join(shift + _BITS, entry, entry[0], leaf, key_hash),
+                True,
+            )
+    else:
+        new_entry, added = _assoc(entry, shift + _BITS, leaf, resolve)
+
+    if new_entry is entry:
+        return node, False
+    entries = node.entries[:index] + (new_entry,) + node.entries[index + 1 :]
+    return _BitmapNode(node.bitmap, entries), added
+
+
+def _dissoc(node, shift: int, key_hash: int, key) -> tuple:
+    """Returns (node without the key, boolean indicating if key was removed).
+
+    Returned node can be None (node became empty) or a single leaf, which
+    the parent inlines in place of the node.
+    """
+    if type(node) is _CollisionNode:
+        leaves = tuple(leaf for leaf in node.leaves if leaf[1] != key)
+        if len(leaves) == len(node.leaves):
+            return node, False
+        if len(leaves) == 1:
+            return leaves[0], True
+        return _CollisionNode(node.hash, leaves), True
+
+    bit = 1 << ((key_hash >> shift) & _MASK)
+    if not node.bitmap & bit:
+        return node, False
+
+    index = _bit_count(node.bitmap & (bit - 1))
+    entry = node.entries[index]
+    if type(entry) is tuple:
+        if entry[0] != key_hash or entry[1] != key:
+            return node, False
+        new_entry = None
+    else:
+        new_entry, removed = _dissoc(entry, shift + _BITS, key_hash, key)
+        if not removed:
+            return node, False
+
+    if new_entry is None:
+        bitmap = node.bitmap & ~bit
+        if not bitmap:
+            return None, True
+        entries = node.entries[:index] + node.entries[index + 1 :]
+    else:
+        bitmap = node.bitmap
+        entries = node.entries[:index] + (new_entry,) + node.entries[index + 1 :]
+
+    if len(entries) == 1 and type(entries[0]) is tuple:
+        return entries[0], True
+    return _BitmapNode(bitmap, entries), True
+
+
+def _iter_leaves(node) -> Iterator[_Leaf]:
+    if type(node) is tuple:
+        yield node
+    elif type(node) is _CollisionNode:
+        yield from node.leaves
+    else:
+        for entry in node.entries:
+            yield from _iter_leaves(entry)
+
+
+def _count(entry) -> int:
+    return sum(1 for _ in _iter_leaves(entry))
+
+
+def _merge(first, second, shift: int, resolve) -> tuple:
+    """Returns (union of two nodes, number of keys from second not in first).
+
+    Values of keys present in both nodes are resolved with
+    `resolve(first_value, second_value)`. Subtrees shared by both nodes
+    are not visited.
+    """
+    if first is second:
+        return first, 0
+
+    if type(first) is _CollisionNode or type(second) is _CollisionNode:
+        node, added = first, 0
+        for leaf in _iter_leaves(second):
+            node, leaf_added = _assoc(node, shift, leaf, resolve)
+            added += leaf_added
+        return node, added
+
+    def flipped_resolve(second_value, first_value):
+        return resolve(first_value, second_value)
+
+    bitmap = first.bitmap | second.bitmap
+    entries = []
+    added = 0
+    remaining = bitmap
+    while remaining:
+        bit = remaining & -remaining
+        remaining ^= bit
+
+        if not second.bitmap & bit:
+            entries.append(first.entries[_bit_count(first.bitmap & (bit - 1))])
+            continue
+
+        second_entry = second.entries[_bit_count(second.bitmap & (bit - 1))]
+        if not first.bitmap & bit:
+            entries.append(second_entry)
+            added += _count(second_entry)
+            continue
+
+        first_entry = first.entries[_bit_count(first.bitmap & (bit - 1))]
+        first_is_leaf = type(first_entry) is tuple
+        second_is_leaf = type(second_entry) is tuple
+        if first_entry is second_entry:
+            entry = first_entry
+        elif first_is_leaf and second_is_leaf:
+            if first_entry[0] == second_entry[0] and first_entry[1] == second_entry[1]:
+                entry = _resolve_leaf(first_entry, second_entry, resolve)
+            else:
+                entry = _join(
+                    shift + _BITS,
+                    first_entry,
+                    first_entry[0],
+                    second_entry,
+                    second_entry[0],
+                )
+                added += 1
+        elif first_is_leaf:
+            entry, leaf_added = _assoc(
+                second_entry, shift + _BITS, first_entry, flipped_resolve
+            )
+            added += _count(second_entry) - (not leaf_added)
+        elif second_is_leaf:
+            entry, leaf_added = _assoc(
+                first_entry, shift + _BITS, second_entry, resolve
+            )
+            added += leaf_added
+        else:
+            entry, entry_added = _merge(
+                first_entry, second_entry, shift + _BITS, resolve
+            )
+            added += entry_added
+        entries.append(entry)
+
+    if bitmap == first.bitmap and all(
+        entry is first_entry for entry, first_entry in zip(entries, first.entries)
+    ):
+        return first, added
+    return _BitmapNode(bitmap, tuple(entries)), added
+
+
+def _diff(first, second) -> Iterator:
+    """Yields keys of leaves which differ between two entries of tries.
+
+    Keys present in only one entry are yielded as well. Subtrees shared by
+    both entries are not visited.
+    """
+    if first is second:
+        return
+
+    if type(first) is not _BitmapNode or type(second) is not _BitmapNode:
+        first_leaves = {leaf[1]: leaf for leaf in _iter_leaves(first)}
+        for leaf in _iter_leaves(second):
+            first_leaf = first_leaves.pop(leaf[1], None)
+            if first_leaf is None or (
+                first_leaf is not leaf and first_leaf[2] != leaf[2]
+            ):
+                yield leaf[1]
+        yield from first_leaves
+        return
+
+    remaining = first.bitmap | second.bitmap
+    while remaining:
+        bit = remaining & -remaining
+        remaining ^= bit
+
+        if not second.bitmap & bit:
+            first_entry = first.entries[_bit_count(first.bitmap & (bit - 1))]
+            yield from (leaf[1] for leaf in _iter_leaves(first_entry))
+        elif not first.bitmap & bit:
+            second_entry = second.entries[_bit_count(second.bitmap & (bit - 1))]
+            yield from (leaf[1] for leaf in _iter_leaves(second_entry))
+        else:
+            yield from _diff(
+                first.entries[_bit_count(first.bitmap & (bit - 1))],
+                second.entries[_bit_count(second.bitmap & (bit - 1))],
+            )
+
+
+class PersistentMap(MutableMapping[K, V]):
+    """A mapping sharing structure with its copies.
+
+    It supports the usual dict operations. Updates never modify structure
+    shared with copies, so a copy made with `copy()` is independent
+    of the original.
+    """
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, items: Optional[Iterable[tuple[K, V]]] = None):
+        self._root = _EMPTY
+        self._size = 0
+        if items is not None:
+            self.update(items)
+
+    @classmethod
+    def _from_root(cls, root, size: int) -> "PersistentMap[K, V]":
+        persistent_map: PersistentMap[K, V] = cls()
+        persistent_map._root = root
+        persistent_map._size = size
+        return persistent_map
+
+    def __repr__(self):
+        return f"PersistentMap({dict(self)!r})"
+
+    def __getitem__(self, key: K) -> V:
+        leaf = _find(self._root, _hash(key), key)
+        if leaf is None:
+            raise KeyError(key)
+        return leaf[2]
+
+    def __contains__(self, key) -> bool:
+        return _find(self._root, _hash(key), key) is not None
+
+    def get(self, key: K, default=None):
+        leaf = _find(self._root, _hash(key), key)
+        return default if leaf is None else leaf[2]
+
+    def __setitem__(self, key: K, value: V) -> None:
+        self._root, added = _assoc(self._root, 0, (_hash(key), key, value), None)
+        self._size += added
+
+    def __delitem__(self, key: K) -> None:
+        key_hash = _hash(key)
+        root, removed = _dissoc(self._root, 0, key_hash, key)
+        if not removed:
+            raise KeyError(key)
+
+        if root is None:
+            root = _EMPTY
+        elif type(root) is tuple:
+            # Single leaf left in the whole trie, put it back into a root node.
+            root = _BitmapNode(1 << (root[0] & _MASK), (root,))
+        self._root = root
+        self._size -= 1
+
+    def __iter__(self) -> Iterator[K]:
+        for leaf in _iter_leaves(self._root):
+            yield leaf[1]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def copy(self) -> "PersistentMap[K, V]":
+        """Returns a copy of the map in O(1)."""
+        return self._from_root(self._root, self._size)
+
+    def merge(
+        self, other: "PersistentMap[K, V]", resolve: Callable[[V, V], V]
+    ) -> "PersistentMap[K, V]":
+        """Returns union of two maps.
+
+        Values of keys present in both maps are resolved with
+        `resolve(self_value, other_value)`.
+        """
+        root, added = _merge(self._root, other._root, 0, resolve)
+        return self._from_root(root, self._size + added)
+
+    def diff(self, other: "PersistentMap[K, V]") -> Iterator[K]:
+        """Yields keys with different values in both maps or present in one.
+
+        Subtrees shared by both maps are not visited, so for a map and its
+        copy updated with k changes it is O(k log n).
+        """
+        return _diff(self._root, other._root)
@@ -0,0 +1,617 @@
+"""This module contains implementation of a SQLite scratch storage of replicas.
+
+SqliteScratchStorage keeps mappings of replicas (timestamps of elements,
+values of vertices) in tables of a SQLite database, so replicas do not have
+to fit in memory. Every SqliteMap is a table indexed by its primary key,
+with a bounded LRU cache of recently used entries in front of it.
+
+Copies and merges of maps of the same storage run in SQL - a copy is
+a single `INSERT ... SELECT`, a merge is an upsert keeping the bigger
+value - so entries are never moved through Python.
+
+SqliteAdjacency keeps adjacent vertices of a graph in a table indexed by
+vertex. Storage also runs steps of LwwElementGraph.merge which depend on
+several maps of the merged graphs (merge of vertices values, adjacency of
+the merged graph) as joins of their tables.
+
+Keys are stored as JSON. Supported keys are strings, numbers, booleans, None
+and frozensets of those (edges).
+
+The storage is scratch space, not a database of replicas: tables get
+generated names, a table is dropped when its map is garbage collected, and
+there is no way to open maps of a database again. Replicas which should
+outlive the process have to be saved elsewhere.
+"""
+import itertools
+import json
+import pickle
+import sqlite3
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import ItemsView
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Optional,
+    TypeVar,
+)
+
+if TYPE_CHECKING:
+    from lww_element_graph.structures.lww_element_set import LwwElementSet
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+# Cached value of keys which are not in the map.
+_MISSING = object()
+_NOT_CACHED = object()
+# Number of rows fetched at once while iterating over a map.
+_PAGE_SIZE = 1000
+
+
+def _encode_key(key) -> str:
+    """Returns JSON of key, equal frozensets get equal JSON."""
+    if isinstance(key, frozenset):
+        return f"[{','.join(sorted(_encode_key(item) for item in key))}]"
+    if not isinstance(key, _SCALAR_TYPES):
+        raise TypeError(f"Unsupported key type {type(key)} of SqliteMap.")
+    return json.dumps(key)
+
+
+def _decode_key(encoded_key: str):
+    key = json.loads(encoded_key)
+    return frozenset(key) if isinstance(key, list) else key
+
+
+def _is_member(adds: str, removes: str, adds_win: bool) -> str:
+    """Returns SQL condition of membership of an element in a LWW-Element-Set.
+
+    `adds` and `removes` are aliases of the element's rows in add and remove
+    tables of the set, the remove row is LEFT JOINed. See LwwElementSet.lookup.
+    """
+    return (
+        f"({removes}.value IS NULL OR {adds}.value > {removes}.value"
+        f" OR ({adds}.value = {removes}.value AND {int(adds_win)}))"
+    )
+
+
+def _edge_key(adjacency: str) -> str:
+    """Returns SQL expression of encoded key of edge of a row of adjacency table.
+
+    Encoded vertices are sorted, like by `_encode_key`. Text is compared
+    as UTF-8 bytes, which orders it like Python strings.
+    """
+    first_key = f"min({adjacency}.key, {adjacency}.adjacent)"
+    second_key = f"max({adjacency}.key, {adjacency}.adjacent)"
+    return f"'[' || {first_key} || ',' || {second_key} || ']'"
+
+
+class SqliteScratchStorage:
+    """Creates SqliteMaps stored in a single SQLite scratch database.
+
+    Attributes:
+        path: path to the database file, in-memory database by default.
+            The file holds only working data of maps, it should not be used
+            by anything else.
+        cache_size: maximum number of cached entries of every map.
+    """
+
+    def __init__(self, path: str = ":memory:", cache_size: int = 10000):
+        if cache_size < 0:
+            raise ValueError("Cache size should not be negative.")
+        self.path = path
+        self.cache_size = cache_size
+        # Connection is shared by threads of ConcurrentLwwElementGraph and
+        # MergePipeline, the lock serializes its use.
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False
+        )
+        # Scratch tables are dropped with their maps, durability is not needed.
+        self._connection.execute("PRAGMA journal_mode = OFF")
+        self._connection.execute("PRAGMA synchronous = OFF")
+        self._table_ids = itertools.count()
+
+    def __repr__(self):
+        return f"<SqliteScratchStorage {self.path=} {self.cache_size=}>"
+
+    def __enter__(self) -> "SqliteScratchStorage":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the database, maps of the storage cannot be used afterwards."""
+        with self._lock:
+            self._connection.close()
+
+    def new_map(self, serialize_values: bool = False) -> "SqliteMap":
+        """Returns a new empty map.
+
+        Values of maps with `serialize_values` are pickled, otherwise they
+        have to be SQLite values (int, float, str, bytes or None).
+        """
+        return SqliteMap(self, serialize_values)
+
+    def _execute(self, sql: str, parameters: tuple = ()) -> list[tuple]:
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def new_adjacency(self) -> "SqliteAdjacency":
+        """Returns a new empty adjacency table."""
+        return SqliteAdjacency(self)
+
+    def _create_table(self) -> str:
+        table = f"map_{next(self._table_ids)}"
+        self._execute(
+            f"CREATE TABLE {table} (key TEXT PRIMARY KEY, value) WITHOUT ROWID"
+        )
+        return table
+
+    def _create_adjacency_table(self) -> str:
+        table = f"adjacency_{next(self._table_ids)}"
+        self._execute(
+            f"CREATE TABLE {table} (key TEXT, adjacent TEXT, "
+            "PRIMARY KEY (key, adjacent)) WITHOUT ROWID"
+        )
+        return table
+
+    def _drop_table(self, table: str) -> None:
+        try:
+            self._execute(f"DROP TABLE {table}")
+        except sqlite3.ProgrammingError:
+            # Storage already closed.
+            pass
+
+    def merge_vertices_values(
+        self,
+        first_values: "SqliteMap",
+        second_values: "SqliteMap",
+        first_vertices: "LwwElementSet",
+        second_vertices: "LwwElementSet",
+        merged_vertices: "LwwElementSet",
+        adds_win: bool,
+    ) -> "SqliteMap":
+        """Returns merged values of vertices, see LwwElementGraph.merge.
+
+        Vertex in merged vertices gets value of the graph whose add timestamp
+        won. Values set in both graphs at the same moment are compared in
+        Python - they are pickled.
+        """
+        merged_values = self.new_map(serialize_values=True)
+        tables = {
+            "merged_values": merged_values._table,
+            "first_values": first_values._table,
+            "second_values": second_values._table,
+            "first_adds": first_vertices.add_timestamps._table,
+            "second_adds": second_vertices.add_timestamps._table,
+            "merged_adds": merged_vertices.add_timestamps._table,
+            "merged_removes": merged_vertices.remove_timestamps._table,
+        }
+        is_member = _is_member("merged_add", "merged_remove", adds_win)
+        with self._lock:
+            self._execute(
+                "INSERT INTO {merged_values} "
+                "SELECT first.key, first.value FROM {first_values} AS first "
+                "JOIN {merged_adds} AS merged_add ON merged_add.key = first.key "
+                "LEFT JOIN {merged_removes} AS merged_remove "
+                "ON merged_remove.key = first.key "
+                "JOIN {first_adds} AS first_add ON first_add.key = first.key "
+                "LEFT JOIN {second_values} AS second ON second.key = first.key "
+                f"WHERE {is_member} "
+                "AND (second.key IS NULL OR merged_add.value = first_add.value)".format(
+                    **tables
+                )
+            )
+            self._execute(
+                "INSERT INTO {merged_values} "
+                "SELECT second.key, second.value FROM {second_values} AS second "
+                "JOIN {merged_adds} AS merged_add ON merged_add.key = second.key "
+                "LEFT JOIN {merged_removes} AS merged_remove "
+                "ON merged_remove.key = second.key "
+                "LEFT JOIN {first_adds} AS first_add ON first_add.key = second.key "
+                "LEFT JOIN {first_values} AS first ON first.key = second.key "
+                f"WHERE {is_member} "
+                "AND (first.key IS NULL OR merged_add.value != first_add.value)".format(
+                    **tables
+                )
+            )
+            # Edge case: different replicas assigned value in the exact same
+            # moment - take max of those two values.
+            ties = self._execute(
+                "SELECT first.key, first.value, second.value "
+                "FROM {first_values} AS first "
+                "JOIN {second_values} AS second ON second.key = first.key "
+                "JOIN {merged_adds} AS merged_add ON merged_add.key = first.key "
+                "LEFT JOIN {merged_removes} AS merged_remove "
+                "ON merged_remove.key = first.key "
+                "JOIN {first_adds} AS first_add ON first_add.key = first.key "
+                "JOIN {second_adds} AS second_add ON second_add.key = first.key "
+                f"WHERE {is_member} "
+                "AND merged_add.value = first_add.value "
+                "AND merged_add.value = second_add.value "
+                "AND first.value != second.value".format(**tables)
+            )
+            for encoded_key, first_value, second_value in ties:
+                merged_values[_decode_key(encoded_key)] = max(
+                    first_values._decode_value(first_value),
+                    second_values._decode_value(second_value),
+                )
+        return merged_values
+
+    def merge_membership_timestamps(
+        self,
+        first_timestamps: "SqliteMap",
+        second_timestamps: "SqliteMap",
+        first_vertices: "LwwElementSet",
+        second_vertices: "LwwElementSet",
+        merged_vertices: "LwwElementSet",
+    ) -> "SqliteMap":
+        """Returns merged membership timestamps, see LwwElementGraph.merge.
+
+        Vertex gets the later of its membership timestamps in both graphs,
+        taken from the add timestamps if the graph keeps no membership
+        timestamp of it. Timestamps equal to merged add timestamps are dropped.
+        """
+        merged_timestamps = self.new_map()
+        self._execute(
+            "INSERT INTO {merged} SELECT key, timestamp FROM ("
+            "SELECT keys.key AS key, max("
+            "coalesce(first.value, first_add.value, second.value, second_add.value), "
+            "coalesce(second.value, second_add.value, first.value, first_add.value)"
+            ") AS timestamp, merged_add.value AS add_timestamp "
+            "FROM (SELECT key FROM {first} UNION SELECT key FROM {second}) AS keys "
+            "JOIN {merged_adds} AS merged_add ON merged_add.key = keys.key "
+            "LEFT JOIN {first} AS first ON first.key = keys.key "
+            "LEFT JOIN {first_adds} AS first_add ON first_add.key = keys.key "
+            "LEFT JOIN {second} AS second ON second.key = keys.key "
+            "LEFT JOIN {second_adds} AS second_add ON second_add.key = keys.key"
+            ") WHERE timestamp != add_timestamp".format(
+                merged=merged_timestamps._table,
+                first=first_timestamps._table,
+                second=second_timestamps._table,
+                first_adds=first_vertices.add_timestamps._table,
+                second_adds=second_vertices.add_timestamps._table,
+                merged_adds=merged_vertices.add_timestamps._table,
+            )
+        )
+        return merged_timestamps
+
+    def merge_adjacency(
+        self,
+        first_adjacency: "SqliteAdjacency",
+        second_adjacency: "SqliteAdjacency",
+        merged_vertices: "LwwElementSet",
+        merged_edges: "LwwElementSet",
+        adds_win: bool,
+    ) -> tuple["SqliteAdjacency", list[frozenset]]:
+        """Returns adjacency of merged graph and its orphant edges.
+
+        Orphant edges are edges in merged edges connecting vertices not in
+        merged vertices, they are not in the returned adjacency. The caller
+        removes them from merged edges, see LwwElementGraph.merge. Merged edges
+        are a subset of the edges of both graphs, so adjacency of merged graph
+        is found among rows of both adjacency tables.
+        """
+        merged_adjacency = self.new_adjacency()
+        tables = {
+            "merged_adjacency": merged_adjacency.table,
+            "vertices_adds": merged_vertices.add_timestamps._table,
+            "vertices_removes": merged_vertices.remove_timestamps._table,
+            "edges_adds": merged_edges.add_timestamps._table,
+            "edges_removes": merged_edges.remove_timestamps._table,
+        }
+        is_edge_member = _is_member("edge_add", "edge_remove", adds_win)
+        is_vertex_member = _is_member("vertex_add", "vertex_remove", adds_win)
+
+        def is_not_vertex(column: str) -> str:
+            return (
+                "NOT EXISTS ("
+                "SELECT 1 FROM {vertices_adds} AS vertex_add "
+                "LEFT JOIN {vertices_removes} AS vertex_remove "
+                "ON vertex_remove.key = vertex_add.key "
+                f"WHERE vertex_add.key = {{merged_adjacency}}.{column} "
+                f"AND {is_vertex_member})"
+            ).format(**tables)
+
+        with self._lock:
+            self._execute(
+                f"INSERT INTO {merged_adjacency.table} "
+                f"SELECT key, adjacent FROM {first_adjacency.table} "
+                f"UNION SELECT key, adjacent FROM {second_adjacency.table}"
+            )
+            self._execute(
+                "DELETE FROM {merged_adjacency} WHERE NOT EXISTS ("
+                "SELECT 1 FROM {edges_adds} AS edge_add "
+                "LEFT JOIN {edges_removes} AS edge_remove "
+                "ON edge_remove.key = edge_add.key "
+                f"WHERE edge_add.key = {_edge_key(merged_adjacency.table)} "
+                f"AND {is_edge_member})".format(**tables)
+            )
+            # Rows are stored both ways, so every orphant edge has a row with
+            # the vertex not in merged vertices as the key.
+            orphant_edges = [
+                _decode_key(encoded_key)
+                for encoded_key, in self._execute(
+                    f"SELECT DISTINCT {_edge_key(merged_adjacency.table)} "
+                    f"FROM {merged_adjacency.table} WHERE {is_not_vertex('key')}"
+                )
+            ]
+            if orphant_edges:
+                self._execute(
+                    f"DELETE FROM {merged_adjacency.table} "
+                    f"WHERE {is_not_vertex('key')} OR {is_not_vertex('adjacent')}"
+                )
+        return merged_adjacency, orphant_edges
+
+
+class SqliteMap(MutableMapping[K, V]):
+    """A mapping stored in a table of a SqliteScratchStorage.
+
+    Create maps with `SqliteScratchStorage.new_map`.
+    """
+
+    def __init__(
+        self,
+        storage: SqliteScratchStorage,
+        serialize_values: bool = False,
+        _table: Optional[str] = None,
+    ):
+        self.storage = storage
+        self.serialize_values = serialize_values
+        self._table = storage._create_table() if _table is None else _table
+        # Maps encoded keys to values, or to _MISSING for keys not in the map.
+        self._cache: OrderedDict[str, Any] = OrderedDict()
+        weakref.finalize(self, storage._drop_table, self._table)
+
+    def __repr__(self):
+        return f"<SqliteMap {self._table=} {len(self)=}>"
+
+    def _encode_value(self, value):
+        if self.serialize_values:
+            return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        return value
+
+    def _decode_value(self, value):
+        return pickle.loads(value) if self.serialize_values else value
+
+    def _remember(self, encoded_key: str, value) -> None:
+        if self.storage.cache_size == 0:
+            return
+        self._cache[encoded_key] = value
+        self._cache.move_to_end(encoded_key)
+        if len(self._cache) > self.storage.cache_size:
+            self._cache.popitem(last=False)
+
+    def _lookup(self, key):
+        """Returns value of key, _MISSING if key is not in the map."""
+        encoded_key = _encode_key(key)
+        with self.storage._lock:
+            value = self._cache.get(encoded_key, _NOT_CACHED)
+            if value is not _NOT_CACHED:
+                self._cache.move_to_end(encoded_key)
+                return value
+
+            rows = self.storage._execute(
+                f"SELECT value FROM {self._table} WHERE key = ?", (encoded_key,)
+            )
+            value = self._decode_value(rows[0][0]) if rows else _MISSING
+            self._remember(encoded_key, value)
+            return value
+
+    def __getitem__(self, key: K) -> V:
+        value = self._lookup(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        return self._lookup(key) is not _MISSING
+
+    def get(self, key: K, default=None):
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def __setitem__(self, key: K, value: V) -> None:
+        encoded_key = _encode_key(key)
+        with self.storage._lock:
+            self.storage._execute(
+                f"INSERT OR REPLACE INTO {self._table} VALUES (?, ?)",
+                (encoded_key, self._encode_value(value)),
+            )
+            self._remember(encoded_key, value)
+
+    def __delitem__(self, key: K) -> None:
+        encoded_key = _encode_key(key)
+        with self.storage._lock:
+            if key not in self:
+                raise KeyError(key)
+            self.storage._execute(
+                f"DELETE FROM {self._table} WHERE key = ?", (encoded_key,)
+            )
+            self._remember(encoded_key, _MISSING)
+
+    def _iter_rows(self, columns: str) -> Iterator[tuple]:
+        # Keyset pagination - the map can be modified between pages.
+        rows = self.storage._execute(
+            f"SELECT {columns} FROM {self._table} ORDER BY key LIMIT ?",
+            (_PAGE_SIZE,),
+        )
+        while rows:
+            yield from rows
+            rows = self.storage._execute(
+                f"SELECT {columns} FROM {self._table} WHERE key > ? "
+                "ORDER BY key LIMIT ?",
+                (rows[-1][0], _PAGE_SIZE),
+            )
+
+    def __iter__(self) -> Iterator[K]:
+        for (encoded_key,) in self._iter_rows("key"):
+            yield _decode_key(encoded_key)
+
+    def items(self) -> ItemsView:
+        return _SqliteItemsView(self)
+
+    def __len__(self) -> int:
+        return self.storage._execute(f"SELECT count(*) FROM {self._table}")[0][0]
+
+    def copy(self) -> "SqliteMap[K, V]":
+        """Returns a copy of the map, copied by the database."""
+        table = self.storage._create_table()
+        self.storage._execute(f"INSERT INTO {table} SELECT * FROM {self._table}")
+        return SqliteMap(self.storage, self.serialize_values, _table=table)
+
+    def update_max(self, items: Iterable[tuple[K, V]]) -> None:
+        """Stores values of keys unless bigger values are stored already.
+
+        Runs as a single upsert. Values must not be serialized, they are
+        compared by the database.
+        """
+        if self.serialize_values:
+            raise ValueError("Serialized values cannot be compared.")
+
+        rows = [(_encode_key(key), value) for key, value in items]
+        with self.storage._lock:
+            self.storage._connection.executemany(
+                f"INSERT INTO {self._table} VALUES (?, ?) ON CONFLICT (key) "
+                "DO UPDATE SET value = max(value, excluded.value)",
+                rows,
+            )
+            # Stored values are not known without reading them back.
+            for encoded_key, _ in rows:
+                self._cache.pop(encoded_key, None)
+
+    def merge_max(self, other: "SqliteMap[K, V]") -> "SqliteMap[K, V]":
+        """Returns union of two maps of the same storage.
+
+        Keys present in both maps get the bigger value. Values must not be
+        serialized, they are compared by the database.
+        """
+        if other.storage is not self.storage:
+            raise ValueError("Merged maps should belong to the same storage.")
+        if self.serialize_values or other.serialize_values:
+            raise ValueError("Serialized values cannot be compared.")
+
+        merged_map = self.copy()
+        # `WHERE true` resolves parsing ambiguity of upsert after SELECT.
+        self.storage._execute(
+            f"INSERT INTO {merged_map._table} SELECT key, value FROM {other._table} "
+            "WHERE true ON CONFLICT (key) DO UPDATE "
+            "SET value = max(value, excluded.value)"
+        )
+        return merged_map
+
+
+class _SqliteItemsView(ItemsView):
+    """Items of a SqliteMap, read with a single query per page."""
+
+    _mapping: SqliteMap
+
+    def __iter__(self) -> Iterator[tuple]:
+        sqlite_map = self._mapping
+        for encoded_key, value in sqlite_map._iter_rows("key, value"):
+            yield _decode_key(encoded_key), sqlite_map._decode_value(value)
+
+
+class SqliteAdjacency(Mapping[K, frozenset]):
+    """Adjacency of vertices of a graph stored in a table of a SqliteScratchStorage.
+
+    Maps vertex to a frozenset of adjacent vertices, vertices without adjacent
+    vertices are not in the mapping. Every pair of adjacent vertices is
+    stored in two rows, so adjacent vertices of a vertex are read with
+    a lookup of the primary key. Create with `SqliteScratchStorage.new_adjacency`.
+    """
+
+    def __init__(self, storage: SqliteScratchStorage, _table: Optional[str] = None):
+        self.storage = storage
+        self.table = storage._create_adjacency_table() if _table is None else _table
+        weakref.finalize(self, storage._drop_table, self.table)
+
+    def __repr__(self):
+        return f"<SqliteAdjacency {self.table=} {len(self)=}>"
+
+    def link(self, first_key: K, second_key: K) -> None:
+        """Makes keys adjacent."""
+        self.link_all(((first_key, second_key),))
+
+    def link_all(self, pairs: Iterable[tuple[K, K]]) -> None:
+        """Makes keys of every pair adjacent."""
+        rows = []
+        for first_key, second_key in pairs:
+            encoded_keys = (_encode_key(first_key), _encode_key(second_key))
+            rows.extend((encoded_keys, encoded_keys[::-1]))
+        with self.storage._lock:
+            self.storage._connection.executemany(
+                f"INSERT OR IGNORE INTO {self.table} VALUES (?, ?)", rows
+            )
+
+    def unlink(self, first_key: K, second_key: K) -> None:
+        """Makes keys not adjacent."""
+        encoded_keys = (_encode_key(first_key), _encode_key(second_key))
+        self.storage._execute(
+            f"DELETE FROM {self.table} "
+            "WHERE (key, adjacent) IN (VALUES (?, ?), (?, ?))",
+            (*encoded_keys, *encoded_keys[::-1]),
+        )
+
+    def __getitem__(self, key: K) -> frozenset:
+        rows = self.storage._execute(
+            f"SELECT adjacent FROM {self.table} WHERE key = ?", (_encode_key(key),)
+        )
+        if not rows:
+            raise KeyError(key)
+        return frozenset(_decode_key(encoded_key) for encoded_key, in rows)
+
+    def _iter_rows(self) -> Iterator[tuple[str, str]]:
+        # Keyset pagination, like SqliteMap._iter_rows.
+        rows = self.storage._execute(
+            f"SELECT key, adjacent FROM {self.table} ORDER BY key, adjacent LIMIT ?",
+            (_PAGE_SIZE,),
+        )
+        while rows:
+            yield from rows
+            rows = self.storage._execute(
+                f"SELECT key, adjacent FROM {self.table} "
+                "WHERE (key, adjacent) > (?, ?) ORDER BY key, adjacent LIMIT ?",
+                (*rows[-1], _PAGE_SIZE),
+            )
+
+    def __iter__(self) -> Iterator[K]:
+        for encoded_key, _ in itertools.groupby(
+            self._iter_rows(), key=lambda row: row[0]
+        ):
+            yield _decode_key(encoded_key)
+
+    def items(self) -> ItemsView:
+        return _SqliteAdjacencyItemsView(self)
+
+    def __len__(self) -> int:
+        rows = self.storage._execute(f"SELECT count(DISTINCT key) FROM {self.table}")
+        return rows[0][0]
+
+    def copy(self) -> "SqliteAdjacency[K]":
+        """Returns a copy of the adjacency, copied by the database."""
+        table = self.storage._create_adjacency_table()
+        self.storage._execute(f"INSERT INTO {table} SELECT * FROM {self.table}")
+        return SqliteAdjacency(self.storage, _table=table)
+
+
+class _SqliteAdjacencyItemsView(ItemsView):
+    """Items of a SqliteAdjacency, read with a single query per page."""
+
+    _mapping: SqliteAdjacency
+
+    def __iter__(self) -> Iterator[tuple]:
+        for encoded_key, rows in itertools.groupby(
+            self._mapping._iter_rows(), key=lambda row: row[0]
+        ):
+            yield _decode_key(encoded_key), frozenset(
+                _decode_key(encoded_adjacent_key) for _, encoded_adjacent_key in rows
+            )
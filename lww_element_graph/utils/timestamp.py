@@ -1,5 +1,27 @@
 import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+# Clock used instead of the monotonic clock, see `use_clock`.
+_clock: Optional[Callable[[], int]] = None
 
 
 def timestamp_now() -> int:
+    if _clock is not None:
+        return _clock()
     return time.monotonic_ns()
+
+
+@contextmanager
+def use_clock(clock: Callable[[], int]) -> Iterator[None]:
+    """Makes `timestamp_now` return timestamps of given clock.
+
+    Used by simulations to replace wall time with a deterministic logical clock.
+    """
+    global _clock
+    previous_clock = _clock
+    _clock = clock
+    try:
+        yield
+    finally:
+        _clock = previous_clock
@@ -0,0 +1,54 @@
+import pytest
+
+from benchmarks.gossip_simulation import GossipSimulator, SimulationConfig, Topology
+
+CONFIG = SimulationConfig(
+    replicas=5, write_rounds=5, operations_per_round=5, vertices=20, seed=7
+)
+
+
+def test_simulation_is_deterministic():
+    # Act.
+    first_report = GossipSimulator(CONFIG).run()
+    second_report = GossipSimulator(CONFIG).run()
+
+    # Assert.
+    assert first_report.replicas == second_report.replicas
+    assert first_report.rounds_to_converge == second_report.rounds_to_converge
+    assert [stats.tombstones for stats in first_report.rounds] == [
+        stats.tombstones for stats in second_report.rounds
+    ]
+
+
+@pytest.mark.parametrize("topology", list(Topology))
+def test_simulation_converges(topology):
+    # Act.
+    report = GossipSimulator(CONFIG._replace(topology=topology)).run()
+
+    # Assert.
+    assert report.converged is True
+    assert all(replica == report.replicas[0] for replica in report.replicas)
+    assert report.operations == 5 * 5 * 5
+    assert report.merges > 0
+    assert 0 < report.merge_latency_percentiles[50]
+    assert report.rounds[-1].memory > 0
+
+
+def test_full_topology_keeps_crdt_properties():
+    # Act.
+    report = GossipSimulator(CONFIG._replace(topology=Topology.FULL)).run()
+
+    # Assert.
+    assert report.rounds_to_converge == 1
+    assert report.crdt_property_violations == []
+
+
+def test_simulation_does_not_converge_without_gossip_rounds():
+    # Act.
+    report = GossipSimulator(
+        CONFIG._replace(topology=Topology.RING, fan_out=1, max_gossip_rounds=0)
+    ).run()
+
+    # Assert.
+    assert report.converged is False
+    assert report.rounds_to_converge is None
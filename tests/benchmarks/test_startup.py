@@ -0,0 +1,27 @@
+import pytest
+
+from benchmarks.startup import measure_construction, measure_import
+
+
+def test_importing_graph_does_not_load_lazy_modules():
+    # Act.
+    import_time, eagerly_loaded = measure_import(runs=1)
+
+    # Assert.
+    assert import_time > 0
+    assert eagerly_loaded == []
+
+
+def test_measure_import_rejects_no_runs():
+    # Act & Assert.
+    with pytest.raises(ValueError):
+        measure_import(runs=0)
+
+
+def test_measure_construction():
+    # Act.
+    construction_time, fork_time = measure_construction(number=10)
+
+    # Assert.
+    assert construction_time > 0
+    assert fork_time > 0
@@ -0,0 +1,147 @@
+import itertools
+
+import pytest
+
+from lww_element_graph.structures.lww_element_graph import (
+    GraphIndex,
+    GraphOperationError,
+    LwwElementGraph,
+)
+from lww_element_graph.structures.lww_element_set import AsOf
+from lww_element_graph.utils.timestamp import use_clock
+
+
+def _build_graph(
+    index_first: bool = False, indexes: GraphIndex = GraphIndex.ALL
+) -> LwwElementGraph:
+    """Builds a graph with operations at timestamps 1, 2, ..., 9."""
+    graph: LwwElementGraph = LwwElementGraph(indexes=indexes)
+    if index_first:
+        graph._get_vertices_history()
+        graph._get_incident_edges()
+    clock = itertools.count(1)
+    with use_clock(lambda: next(clock)):
+        graph.add_vertex("1")  # 1
+        graph.add_vertex("2")  # 2
+        graph.add_vertex("3")  # 3
+        graph.add_edge("1", "2")  # 4
+        graph.add_edge("1", "3")  # 5
+        graph.remove_edge("1", "2")  # 6
+        graph.add_vertex("4")  # 7
+        graph.add_edge("1", "4")  # 8
+        graph.remove_vertex("3", cascade=True)  # 9
+    return graph
+
+
+def test_vertices_as_of():
+    # Arrange.
+    graph = _build_graph()
+
+    # Act & Assert.
+    assert graph.vertices_as_of(0) == AsOf(members=[], unknown=["3"])
+    assert graph.vertices_as_of(3) == AsOf(members=["1", "2", "3"], unknown=[])
+    assert graph.vertices_as_of(8) == AsOf(members=["1", "2", "3", "4"], unknown=[])
+    assert graph.vertices_as_of(9) == AsOf(members=["1", "2", "4"], unknown=[])
+    assert graph.has_vertex_as_of("3", 0) is None
+    assert graph.has_vertex_as_of("3", 8) is True
+    assert graph.has_vertex_as_of("3", 9) is False
+
+
+def test_has_edge_as_of():
+    # Arrange.
+    graph = _build_graph()
+
+    # Act & Assert.
+    assert graph.has_edge_as_of("1", "2", 3) is None
+    assert graph.has_edge_as_of("1", "4", 7) is False
+    assert graph.has_edge_as_of("2", "1", 5) is True
+    assert graph.has_edge_as_of("1", "2", 6) is False
+    assert graph.has_edge_as_of("1", "3", 8) is True
+    assert graph.has_edge_as_of("1", "3", 9) is False
+
+
+@pytest.mark.parametrize(
+    "index_first, indexes",
+    [
+        (False, GraphIndex.ALL),
+        (True, GraphIndex.ALL),
+        (True, GraphIndex.ALL & ~GraphIndex.HISTORY),
+    ],
+)
+def test_get_adjacent_vertices_as_of(index_first, indexes):
+    # Arrange.
+    graph = _build_graph(index_first, indexes)
+
+    # Act & Assert.
+    assert graph.get_adjacent_vertices_as_of("1", 3) == AsOf(
+        members=[], unknown=["2", "3"]
+    )
+    assert graph.get_adjacent_vertices_as_of("1", 5) == AsOf(
+        members=["2", "3"], unknown=[]
+    )
+    assert graph.get_adjacent_vertices_as_of("1", 7) == AsOf(members=["3"], unknown=[])
+    assert graph.get_adjacent_vertices_as_of("1", 8) == AsOf(
+        members=["3", "4"], unknown=[]
+    )
+    assert graph.get_adjacent_vertices_as_of("1", 9) == AsOf(members=["4"], unknown=[])
+    assert graph.get_adjacent_vertices_as_of("4", 9) == AsOf(members=["1"], unknown=[])
+
+
+def test_history_index_is_kept_only_if_enabled():
+    # Arrange.
+    graph = _build_graph(indexes=GraphIndex.ALL & ~GraphIndex.HISTORY)
+    indexed_graph = _build_graph()
+
+    # Act.
+    graph.vertices_as_of(9)
+    graph.get_adjacent_vertices_as_of("1", 9)
+    indexed_graph.vertices_as_of(9)
+    indexed_graph.get_adjacent_vertices_as_of("1", 9)
+
+    # Assert.
+    assert graph._vertices_history is None
+    assert graph._incident_edges is None
+    assert indexed_graph._vertices_history is not None
+    assert indexed_graph._incident_edges is not None
+
+
+@pytest.mark.parametrize("index_first", [False, True])
+def test_setting_value_does_not_change_as_of_answers(index_first):
+    # Arrange.
+    graph = _build_graph(index_first)
+    with use_clock(lambda: 10):
+        graph.set_vertex_value("1", "value")
+
+    # Act & Assert.
+    assert graph.has_vertex_as_of("1", 9) is True
+    assert graph.vertices_as_of(9) == AsOf(members=["1", "2", "4"], unknown=[])
+    assert graph.get_adjacent_vertices_as_of("1", 9) == AsOf(members=["4"], unknown=[])
+    assert graph.get_adjacent_vertices_as_of("4", 9) == AsOf(members=["1"], unknown=[])
+    assert graph.fork().has_vertex_as_of("1", 9) is True
+    assert graph.merge(_build_graph()).has_vertex_as_of("1", 9) is True
+    assert _build_graph().merge(graph).has_vertex_as_of("1", 9) is True
+
+
+def test_get_adjacent_vertices_as_of_missing_vertex():
+    # Arrange.
+    graph = _build_graph()
+
+    # Act & Assert.
+    with pytest.raises(GraphOperationError):
+        graph.get_adjacent_vertices_as_of("4", 6)
+
+
+def test_as_of_queries_of_merged_graph():
+    # Arrange.
+    graph = _build_graph()
+    other_graph: LwwElementGraph = LwwElementGraph()
+    with use_clock(lambda: 100):
+        other_graph.add_vertex("5")
+
+    # Act.
+    merged_graph = graph.merge(other_graph)
+
+    # Assert.
+    assert merged_graph.vertices_as_of(9).members == ["1", "2", "4"]
+    assert merged_graph.vertices_as_of(100).members == ["1", "2", "4", "5"]
+    assert merged_graph.get_adjacent_vertices_as_of("1", 5).members == ["2", "3"]
@@ -0,0 +1,154 @@
+from lww_element_graph.structures.change_feed import Change, ChangeKind
+from lww_element_graph.structures.lww_element_graph import LwwElementGraph
+
+
+def test_operations_publish_changes():
+    # Arrange.
+    graph: LwwElementGraph[int] = LwwElementGraph()
+    subscription = graph.subscribe()
+
+    # Act.
+    graph.add_vertex("1")
+    graph.add_vertex("2")
+    graph.add_edge("1", "2")
+    graph.set_vertex_value("1", 123)
+    graph.set_vertex_value("1", 123)  # Same value - no change.
+    graph.remove_vertex("1", cascade=True)
+
+    # Assert.
+    assert list(subscription.changes()) == [
+        Change(ChangeKind.VERTEX_ADDED, "1"),
+        Change(ChangeKind.VERTEX_ADDED, "2"),
+        Change(ChangeKind.EDGE_ADDED, frozenset(("1", "2"))),
+        Change(ChangeKind.VALUE_CHANGED, "1", 123),
+        Change(ChangeKind.EDGE_REMOVED, frozenset(("1", "2"))),
+        Change(ChangeKind.VERTEX_REMOVED, "1"),
+    ]
+    assert list(subscription.changes()) == [], "Changes should be drained."
+
+
+def test_callback_receives_batches():
+    # Arrange.
+    graph: LwwElementGraph[int] = LwwElementGraph()
+    batches = []
+    subscription = graph.subscribe(batches.append, batch_size=2)
+
+    # Act.
+    graph.add_vertex("1")
+    graph.add_vertex("2")
+    graph.add_vertex("3")
+
+    # Assert.
+    assert batches == [
+        [Change(ChangeKind.VERTEX_ADDED, "1"), Change(ChangeKind.VERTEX_ADDED, "2")]
+    ]
+    subscription.flush()
+    assert batches[-1] == [Change(ChangeKind.VERTEX_ADDED, "3")]
+
+
+def test_closed_subscription_receives_no_changes():
+    # Arrange.
+    graph: LwwElementGraph[int] = LwwElementGraph()
+    subscription = graph.subscribe()
+    subscription.close()
+
+    # Act.
+    graph.add_vertex("1")
+
+    # Assert.
+    assert list(subscription.changes()) == []
+
+
+def test_merge_publishes_differences():
+    # Arrange.
+    first_replica: LwwElementGraph[int] = LwwElementGraph()
+    first_replica.add_vertex("1")
+    first_replica.add_vertex("2")
+    first_replica.add_edge("1", "2")
+
+    second_replica = first_replica.fork()
+    second_replica.remove_edge("1", "2")
+    second_replica.remove_vertex("2")
+    second_replica.add_vertex("3")
+    second_replica.add_edge("1", "3")
+    second_replica.set_vertex_value("3", 456)
+
+    subscription = first_replica.subscribe()
+
+    # Act.
+    merged_replica = first_replica.merge(second_replica, move_subscriptions=True)
+    merged_replica.add_vertex("4")
+
+    # Assert.
+    assert list(subscription.changes()) == [
+        Change(ChangeKind.VERTEX_ADDED, "3"),
+        Change(ChangeKind.VALUE_CHANGED, "3", 456),
+        Change(ChangeKind.EDGE_ADDED, frozenset(("1", "3"))),
+        Change(ChangeKind.EDGE_REMOVED, frozenset(("1", "2"))),
+        Change(ChangeKind.VERTEX_REMOVED, "2"),
+        Change(ChangeKind.VERTEX_ADDED, "4"),
+    ]
+
+
+def test_vertex_added_again_publishes_its_value():
+    # Arrange.
+    first_replica: LwwElementGraph[int] = LwwElementGraph()
+    first_replica.add_vertex("1")
+    first_replica.set_vertex_value("1", 123)
+    first_replica.add_vertex("2")
+    first_replica.set_vertex_value("2", 456)
+    first_replica.remove_vertex("1")
+    first_replica.remove_vertex("2")
+    # Other replica has no value of the vertex.
+    second_replica: LwwElementGraph[int] = LwwElementGraph()
+    second_replica.add_vertex("2")
+
+    subscription = first_replica.subscribe()
+
+    # Act.
+    first_replica.add_vertex("1")
+    merged_replica = first_replica.merge(second_replica, move_subscriptions=True)
+
+    # Assert.
+    assert merged_replica.get_vertex_value("2") == 456
+    assert list(subscription.changes()) == [
+        Change(ChangeKind.VERTEX_ADDED, "1"),
+        Change(ChangeKind.VALUE_CHANGED, "1", 123),
+        Change(ChangeKind.VERTEX_ADDED, "2"),
+        Change(ChangeKind.VALUE_CHANGED, "2", 456),
+    ]
+
+
+def test_subscriptions_move_to_merged_graph():
+    # Arrange.
+    first_replica: LwwElementGraph[int] = LwwElementGraph()
+    second_replica: LwwElementGraph[int] = LwwElementGraph()
+    second_replica.add_vertex("1")
+    subscription = first_replica.subscribe()
+
+    # Act.
+    merged_replica = first_replica.merge(second_replica, move_subscriptions=True)
+    first_replica.add_vertex("2")
+    merged_replica.add_vertex("3")
+
+    # Assert.
+    assert list(subscription.changes()) == [
+        Change(ChangeKind.VERTEX_ADDED, "1"),
+        Change(ChangeKind.VERTEX_ADDED, "3"),
+    ]
+
+
+def test_merge_does_not_move_subscriptions_by_default():
+    # Arrange.
+    first_replica: LwwElementGraph[int] = LwwElementGraph()
+    second_replica: LwwElementGraph[int] = LwwElementGraph()
+    second_replica.add_vertex("1")
+    subscription = first_replica.subscribe()
+
+    # Act.
+    merged_replica = first_replica.merge(second_replica)
+    first_replica.add_vertex("2")
+    merged_replica.add_vertex("3")
+
+    # Assert.
+    assert list(subscription.changes()) == [Change(ChangeKind.VERTEX_ADDED, "2")]
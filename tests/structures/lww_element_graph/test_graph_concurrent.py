@@ -0,0 +1,218 @@
+import threading
+import time
+
+import pytest
+
+from lww_element_graph.structures.concurrent_graph import ConcurrentLwwElementGraph
+from lww_element_graph.structures.lww_element_graph import (
+    GraphOperationError,
+    LwwElementGraph,
+)
+
+
+def test_operations():
+    # Arrange.
+    graph: ConcurrentLwwElementGraph[int] = ConcurrentLwwElementGraph()
+
+    # Act.
+    graph.add_vertex("1")
+    graph.add_vertex("2")
+    graph.add_vertex("3")
+    graph.add_edge("1", "2")
+    graph.add_edge("2", "3")
+    graph.set_vertex_value("1", 123)
+    graph.remove_vertex("3", cascade=True)
+
+    # Assert.
+    assert graph.vertices() == frozenset({"1", "2"})
+    assert graph.edges() == frozenset({frozenset(("1", "2"))})
+    assert graph.get_vertex_value("1") == 123
+    assert graph.find_any_path("1", "2") == ("1", "2")
+    assert graph.degree("2") == 1
+    with pytest.raises(GraphOperationError, match="already in graph."):
+        graph.add_vertex("1")
+
+
+def test_merge_in_background():
+    # Arrange.
+    graph: ConcurrentLwwElementGraph[int] = ConcurrentLwwElementGraph()
+    graph.add_vertex("1")
+    other: LwwElementGraph[int] = LwwElementGraph()
+    other.add_vertex("2")
+    other.add_edge("1", "2")
+
+    # Act.
+    graph.merge_in_background(other).result(timeout=10)
+
+    # Assert.
+    assert graph.vertices() == frozenset({"1", "2"})
+    assert graph.has_edge("1", "2") is True
+
+
+def test_concurrent_readers_writers_and_merges():
+    """Fails if concurrent operations raise errors or lose writes."""
+    # Arrange.
+    graph: ConcurrentLwwElementGraph[int] = ConcurrentLwwElementGraph()
+    graph.add_vertex("hub")
+    errors = []
+    writers_done = threading.Event()
+
+    def write(writer_id: int):
+        try:
+            for i in range(200):
+                vertex_id = f"{writer_id}-{i}"
+                graph.add_vertex(vertex_id)
+                graph.add_edge("hub", vertex_id)
+                graph.set_vertex_value(vertex_id, i)
+                if i % 2:
+                    graph.remove_vertex(vertex_id, cascade=True)
+        except Exception as error:
+            errors.append(error)
+
+    def read():
+        try:
+            while not writers_done.is_set():
+                graph.get_adjacent_vertices("hub")
+                graph.vertex_count()
+                graph.edges()
+                # Queries using indexes dropped by removals and modifications.
+                graph.is_connected("hub", "hub")
+                graph.k_hop_neighbourhood(["hub"], 1)
+                graph.vertices_in_value_range(0, 10)
+                for vertex_id in graph.vertices():
+                    graph.has_edge("hub", vertex_id)
+        except Exception as error:
+            errors.append(error)
+
+    def merge():
+        try:
+            while not writers_done.is_set():
+                other = graph.snapshot()
+                graph.merge_in_background(other).result()
+        except Exception as error:
+            errors.append(error)
+
+    writers = [threading.Thread(target=write, args=(i,)) for i in range(4)]
+    others = [threading.Thread(target=read) for _ in range(4)]
+    others.append(threading.Thread(target=merge))
+
+    # Act.
+    for thread in writers + others:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    writers_done.set()
+    for thread in others:
+        thread.join()
+
+    # Assert.
+    assert errors == []
+    assert graph.vertex_count() == 1 + 4 * 100
+    assert graph.degree("hub") == 4 * 100
+    assert graph.get_vertex_value("0-198") == 198
+
+
+def test_find_paths():
+    # Arrange.
+    graph: ConcurrentLwwElementGraph[int] = ConcurrentLwwElementGraph()
+    for vertex_id in ("1", "2", "3"):
+        graph.add_vertex(vertex_id)
+    graph.add_edge("1", "2")
+
+    # Act.
+    results = graph.find_paths([("1", "2"), ("1", "3")])
+    # Paths are searched in a snapshot, lock is not held.
+    graph.add_edge("2", "3")
+
+    # Assert.
+    assert [result.path for result in results] == [("1", "2"), None]
+
+
+def _vertices_in_different_stripes(
+    graph: ConcurrentLwwElementGraph,
+) -> tuple[str, str]:
+    vertex_id = "0"
+    other_vertex_id = next(
+        str(i)
+        for i in range(1, 100)
+        if graph._stripes_of((str(i),)) != graph._stripes_of((vertex_id,))
+    )
+    return vertex_id, other_vertex_id
+
+
+def test_writer_blocks_only_queries_of_its_stripes():
+    # Arrange.
+    wrapped_graph: LwwElementGraph[int] = LwwElementGraph()
+    writing = threading.Event()
+    finish_writing = threading.Event()
+
+    def block_writer(changes):
+        writing.set()
+        finish_writing.wait(timeout=10)
+
+    graph = ConcurrentLwwElementGraph(graph=wrapped_graph, stripes_count=2)
+    vertex_id, other_vertex_id = _vertices_in_different_stripes(graph)
+    for some_vertex_id in (vertex_id, other_vertex_id):
+        graph.add_vertex(some_vertex_id)
+    wrapped_graph.subscribe(block_writer)
+    writer = threading.Thread(target=graph.set_vertex_value, args=(vertex_id, 1))
+    blocked_values = []
+    blocked_reader = threading.Thread(
+        target=lambda: blocked_values.append(graph.get_vertex_value(vertex_id))
+    )
+
+    # Act.
+    writer.start()
+    assert writing.wait(timeout=10)
+    blocked_reader.start()
+    other_value = graph.get_vertex_value(other_vertex_id)
+    blocked_reader.join(timeout=0.1)
+    reader_was_blocked = blocked_reader.is_alive()
+    finish_writing.set()
+    writer.join()
+    blocked_reader.join()
+
+    # Assert.
+    assert other_value is None
+    assert reader_was_blocked is True
+    assert blocked_values == [1]
+
+
+def test_read_throughput_scales_with_threads():
+    """Readers share locks, so throughput of queries waiting for I/O
+    (simulated by a predicate sleeping for every visited vertex) grows
+    linearly with the number of threads."""
+    # Arrange.
+    graph: ConcurrentLwwElementGraph[int] = ConcurrentLwwElementGraph()
+    for vertex_id in ("1", "2", "3"):
+        graph.add_vertex(vertex_id)
+    graph.add_edge("1", "2")
+    graph.add_edge("2", "3")
+    queries_per_thread = 10
+
+    def predicate(vertex_id: str) -> bool:
+        time.sleep(0.001)
+        return True
+
+    def read():
+        for _ in range(queries_per_thread):
+            assert graph.shortest_path("1", "3", predicate=predicate) is not None
+
+    def throughput(threads_count: int) -> float:
+        threads = [threading.Thread(target=read) for _ in range(threads_count)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return threads_count * queries_per_thread / (time.perf_counter() - start)
+
+    # Act.
+    throughputs = {
+        threads_count: throughput(threads_count) for threads_count in (1, 2, 4, 8)
+    }
+
+    # Assert.
+    for threads_count, threads_throughput in throughputs.items():
+        # Half of the linear speedup leaves room for scheduling noise.
+        assert threads_throughput >= threads_count * throughputs[1] / 2
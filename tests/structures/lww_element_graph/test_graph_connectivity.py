@@ -0,0 +1,82 @@
+from lww_element_graph.structures.lww_element_graph import LwwElementGraph
+
+
+def _build_graph() -> LwwElementGraph:
+    graph = LwwElementGraph()
+    graph.add_vertex("1")
+    graph.add_vertex("2")
+    graph.add_vertex("3")
+    graph.add_vertex("4")
+    graph.add_vertex("5")
+    graph.add_edge("1", "2")
+    graph.add_edge("2", "3")
+    graph.add_edge("4", "5")
+    return graph
+
+
+def test_is_connected():
+    # Arrange.
+    graph = _build_graph()
+
+    # Act & assert.
+    assert graph.is_connected("1", "3") is True
+    assert graph.is_connected("1", "4") is False
+    assert graph.component_of("1") == graph.component_of("3")
+    assert graph.component_size("1") == 3
+    assert graph.component_size("5") == 2
+
+
+def test_is_connected_after_edge_added():
+    # Arrange.
+    graph = _build_graph()
+    assert graph.is_connected("1", "4") is False
+
+    # Act.
+    graph.add_edge("3", "4")
+
+    # Assert.
+    assert graph.is_connected("1", "4") is True
+    assert graph.component_size("5") == 5
+
+
+def test_is_connected_after_edge_removed():
+    # Arrange.
+    graph = _build_graph()
+    assert graph.is_connected("1", "3") is True
+
+    # Act.
+    graph.remove_edge("2", "3")
+
+    # Assert.
+    assert graph.is_connected("1", "3") is False
+    assert graph.component_size("3") == 1
+
+
+def test_is_connected_after_vertex_added_and_removed():
+    # Arrange.
+    graph = _build_graph()
+    graph.add_vertex("6")
+    assert graph.component_size("6") == 1
+
+    # Act.
+    graph.remove_vertex("2", cascade=True)
+
+    # Assert.
+    assert graph.is_connected("1", "3") is False
+    assert graph.component_size("1") == 1
+
+
+def test_is_connected_after_merge():
+    # Arrange.
+    first_replica = _build_graph()
+    second_replica = LwwElementGraph()
+    second_replica.add_vertex("3")
+    second_replica.add_vertex("4")
+    second_replica.add_edge("3", "4")
+
+    # Act.
+    merged_replica = first_replica.merge(second_replica)
+
+    # Assert.
+    assert merged_replica.is_connected("1", "5") is True
+    assert first_replica.is_connected("1", "5") is False
@@ -0,0 +1,96 @@
+import pytest
+
+from lww_element_graph.structures.lww_element_graph import LwwElementGraph
+
+
+def _build_graph() -> LwwElementGraph[int]:
+    graph: LwwElementGraph[int] = LwwElementGraph()
+    for vertex_id in ("1", "2", "3", "4"):
+        graph.add_vertex(vertex_id)
+    graph.add_edge("1", "2")
+    graph.add_edge("1", "3")
+    graph.add_edge("3", "4")
+    graph.set_vertex_value("2", 20)
+    return graph
+
+
+def _csr_adjacency(graph: LwwElementGraph[int]) -> dict[str, set[str]]:
+    csr = graph.to_csr()
+    return {
+        vertex_id: {csr.vertices_ids[index] for index in csr.neighbours(i)}
+        for i, vertex_id in enumerate(csr.vertices_ids)
+    }
+
+
+def test_to_csr():
+    # Arrange.
+    graph = _build_graph()
+
+    # Act.
+    csr = graph.to_csr()
+
+    # Assert.
+    assert sorted(csr.vertices_ids) == ["1", "2", "3", "4"]
+    assert len(csr.indptr) == 5
+    assert len(csr.indices) == 6
+    assert _csr_adjacency(graph) == {
+        "1": {"2", "3"},
+        "2": {"1"},
+        "3": {"1", "4"},
+        "4": {"3"},
+    }
+    assert csr.degree(csr.index_of("1")) == 2
+    assert csr.values[csr.index_of("2")] == 20
+    assert csr.values[csr.index_of("1")] is None
+
+
+def test_to_csr_is_read_only():
+    # Arrange.
+    csr = _build_graph().to_csr()
+
+    # Act & Assert.
+    with pytest.raises(TypeError):
+        csr.indices[0] = 1
+
+
+def test_to_csr_is_cached_until_modified():
+    # Arrange.
+    graph = _build_graph()
+    csr = graph.to_csr()
+
+    # Act & Assert.
+    assert graph.to_csr() is csr
+
+    graph.remove_edge("1", "3")
+    assert graph.to_csr() is not csr
+    assert len(csr.indices) == 6  # Old export is not modified.
+    assert _csr_adjacency(graph)["1"] == {"2"}
+
+    csr = graph.to_csr()
+    graph.set_vertex_value("1", 10)
+    assert graph.to_csr().values[graph.to_csr().index_of("1")] == 10
+
+
+def test_to_csr_skips_removed_vertices():
+    # Arrange.
+    graph = _build_graph()
+
+    # Act.
+    graph.remove_vertex("4", cascade=True)
+
+    # Assert.
+    assert _csr_adjacency(graph) == {"1": {"2", "3"}, "2": {"1"}, "3": {"1"}}
+
+
+def test_to_numpy():
+    # Arrange.
+    numpy = pytest.importorskip("numpy")
+    csr = _build_graph().to_csr()
+
+    # Act.
+    indptr, indices = csr.to_numpy()
+
+    # Assert.
+    assert indptr.dtype == numpy.int64
+    assert list(numpy.diff(indptr)) == [csr.degree(i) for i in range(4)]
+    assert list(indices) == list(csr.indices)
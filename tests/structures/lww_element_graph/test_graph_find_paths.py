@@ -0,0 +1,108 @@
+import random
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from lww_element_graph.structures.lww_element_graph import (
+    GraphOperationError,
+    LwwElementGraph,
+    PathResult,
+)
+
+
+def _build_random_graph(seed: int = 0) -> LwwElementGraph:
+    generator = random.Random(seed)
+    graph: LwwElementGraph = LwwElementGraph()
+    for vertex_id in range(40):
+        graph.add_vertex(str(vertex_id))
+    for _ in range(45):
+        first_vertex_id, second_vertex_id = generator.sample(range(40), 2)
+        if not graph.has_edge(str(first_vertex_id), str(second_vertex_id)):
+            graph.add_edge(str(first_vertex_id), str(second_vertex_id))
+    return graph
+
+
+def _random_pairs(seed: int = 0) -> list[tuple[str, str]]:
+    generator = random.Random(seed)
+    return [
+        (str(generator.randrange(10)), str(generator.randrange(40))) for _ in range(200)
+    ]
+
+
+def _assert_results_valid(
+    graph: LwwElementGraph, pairs: list[tuple[str, str]], results: list[PathResult]
+) -> None:
+    assert sorted((result.source, result.target) for result in results) == sorted(
+        set(pairs)
+    )
+    for source, target, path in results:
+        shortest_path = graph.shortest_path(source, target)
+        if shortest_path is None:
+            assert path is None
+            continue
+        assert path[0] == source and path[-1] == target
+        assert all(graph.has_edge(*edge) for edge in zip(path, path[1:]))
+        assert len(path) - 1 == shortest_path.cost
+
+
+def test_find_paths():
+    # Arrange.
+    graph: LwwElementGraph = LwwElementGraph()
+    for vertex_id in "abcde":
+        graph.add_vertex(vertex_id)
+    graph.add_edge("a", "b")
+    graph.add_edge("b", "c")
+    graph.add_edge("a", "c")
+
+    # Act.
+    results = list(
+        graph.find_paths([("a", "c"), ("a", "a"), ("d", "e"), ("a", "b"), ("a", "c")])
+    )
+
+    # Assert.
+    assert results == [
+        PathResult("a", "c", ("a", "c")),
+        PathResult("a", "a", ("a",)),
+        PathResult("a", "b", ("a", "b")),
+        PathResult("d", "e", None),
+    ]
+
+
+def test_find_paths_of_random_pairs():
+    # Arrange.
+    graph = _build_random_graph()
+    pairs = _random_pairs()
+
+    # Act.
+    results = list(graph.find_paths(pairs))
+
+    # Assert.
+    _assert_results_valid(graph, pairs, results)
+
+
+@pytest.mark.parametrize("executor_class", [ThreadPoolExecutor, ProcessPoolExecutor])
+def test_find_paths_in_executor(executor_class):
+    # Arrange.
+    graph = _build_random_graph()
+    pairs = _random_pairs()
+
+    # Act.
+    with executor_class(max_workers=2) as executor:
+        results = graph.find_paths(pairs, executor=executor, sources_per_task=3)
+        # Tasks search a snapshot taken by the call.
+        graph.remove_vertices(graph.vertices.values(), cascade=True)
+        results = list(results)
+
+    # Assert.
+    _assert_results_valid(_build_random_graph(), pairs, results)
+
+
+def test_find_paths_checks_vertices_before_search():
+    # Arrange.
+    graph = _build_random_graph()
+
+    # Act & Assert.
+    with pytest.raises(GraphOperationError):
+        graph.find_paths([("1", "2"), ("1", "missing")])
+    with pytest.raises(ValueError):
+        graph.find_paths([("1", "2")], sources_per_task=0)
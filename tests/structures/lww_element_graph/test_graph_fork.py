@@ -0,0 +1,113 @@
+from lww_element_graph.structures.lww_element_graph import LwwElementGraph
+from lww_element_graph.structures.lww_element_set import LwwElementSet
+from lww_element_graph.utils.persistent_map import PersistentMap
+
+
+def _build_graph(persistent: bool) -> LwwElementGraph[int]:
+    graph: LwwElementGraph[int] = LwwElementGraph(persistent=persistent)
+    graph.add_vertex("1")
+    graph.add_vertex("2")
+    graph.add_edge("1", "2")
+    graph.set_vertex_value("1", 123)
+    return graph
+
+
+def test_fork_is_independent():
+    for persistent in (False, True):
+        # Arrange.
+        graph = _build_graph(persistent)
+
+        # Act.
+        forked_graph = graph.fork()
+        forked_graph.add_vertex("3")
+        forked_graph.set_vertex_value("1", 456)
+        forked_graph.remove_edge("1", "2")
+
+        # Assert.
+        assert graph.has_vertex("3") is False
+        assert graph.get_vertex_value("1") == 123
+        assert graph.has_edge("1", "2") is True
+        assert forked_graph.has_vertex("3") is True
+        assert forked_graph.get_vertex_value("1") == 456
+
+
+def _to_regular(graph: LwwElementGraph[int]) -> LwwElementGraph[int]:
+    """Returns copy of a persistent graph stored in dicts."""
+    return LwwElementGraph(
+        _initial_vertices=LwwElementSet(
+            _initial_add_timestamps=dict(graph.vertices.add_timestamps),
+            _initial_remove_timestamps=dict(graph.vertices.remove_timestamps),
+        ),
+        _initial_edges=LwwElementSet(
+            _initial_add_timestamps=dict(graph.edges.add_timestamps),
+            _initial_remove_timestamps=dict(graph.edges.remove_timestamps),
+        ),
+        _initial_vertices_values=dict(graph.vertices_values),
+    )
+
+
+def test_persistent_graph_merge_equals_regular_graph_merge():
+    # Arrange.
+    first_replica = _build_graph(persistent=True)
+    second_replica = first_replica.fork()
+    second_replica.add_vertex("3")
+    second_replica.add_edge("2", "3")
+    second_replica.set_vertex_value("1", 456)
+    first_replica.remove_edge("1", "2")
+
+    # Act.
+    persistent_merged = first_replica.merge(second_replica)
+    regular_merged = _to_regular(first_replica).merge(_to_regular(second_replica))
+
+    # Assert.
+    assert isinstance(persistent_merged.vertices.add_timestamps, PersistentMap)
+    assert isinstance(persistent_merged.vertices_values, PersistentMap)
+    assert persistent_merged == regular_merged
+    assert persistent_merged.get_vertex_value("1") == 456
+    assert persistent_merged.has_edge("2", "3") is True
+
+
+def test_persistent_graph_merge_visits_only_changed_entries(monkeypatch):
+    # Arrange.
+    first_replica: LwwElementGraph[int] = LwwElementGraph(persistent=True)
+    for vertex_id in map(str, range(100)):
+        first_replica.add_vertex(vertex_id)
+        first_replica.set_vertex_value(vertex_id, 0)
+    for vertex_id in map(str, range(1, 100)):
+        first_replica.add_edge("0", vertex_id)
+    second_replica = first_replica.fork()
+    second_replica.set_vertex_value("1", 1)
+    first_replica.remove_vertex("2", cascade=True)
+    second_replica.add_edge("2", "3")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("All entries should not be visited.")
+
+    # Act.
+    with monkeypatch.context() as patch:
+        patch.setattr(PersistentMap, "__iter__", fail)
+        merged_replica = first_replica.merge(second_replica)
+
+    # Assert.
+    assert merged_replica.get_vertex_value("1") == 1
+    assert merged_replica.has_vertex("2") is False
+    assert merged_replica.has_edge("2", "3") is False
+    assert merged_replica.degree("0") == 98
+
+
+def test_persistent_graph_merge_removes_edges_and_values_of_missing_vertices():
+    # Arrange.
+    first_replica = _build_graph(persistent=True)
+    first_replica.add_edge("1", "3")
+    first_replica.remove_vertex("1", cascade=True)
+    first_replica.add_edge("2", "3")
+    second_replica = first_replica.fork()
+
+    # Act.
+    persistent_merged = first_replica.merge(second_replica)
+    regular_merged = _to_regular(first_replica).merge(_to_regular(second_replica))
+
+    # Assert.
+    assert persistent_merged == regular_merged
+    assert persistent_merged.has_edge("2", "3") is False
+    assert "1" not in persistent_merged.vertices_values
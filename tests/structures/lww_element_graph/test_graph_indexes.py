@@ -0,0 +1,144 @@
+import random
+
+import pytest
+
+from lww_element_graph.structures.change_feed import ChangeKind
+from lww_element_graph.structures.graph_loader import load_graph
+from lww_element_graph.structures.lww_element_graph import GraphIndex, LwwElementGraph
+
+
+def _build_graph(indexes: GraphIndex, seed: int = 0) -> LwwElementGraph[int]:
+    generator = random.Random(seed)
+    graph: LwwElementGraph[int] = LwwElementGraph(indexes=indexes)
+    for vertex_id in range(30):
+        graph.add_vertex(str(vertex_id))
+        graph.set_vertex_value(str(vertex_id), generator.randrange(10))
+    for _ in range(40):
+        first_vertex_id, second_vertex_id = generator.sample(range(30), 2)
+        if not graph.has_edge(str(first_vertex_id), str(second_vertex_id)):
+            graph.add_edge(str(first_vertex_id), str(second_vertex_id))
+    return graph
+
+
+def _query(graph: LwwElementGraph[int]) -> tuple:
+    return (
+        graph.degree("0"),
+        graph.find_any_path("0", "29"),
+        graph.is_connected("0", "29"),
+        graph.component_size("0"),
+        sorted(graph.vertices_in_value_range(2, 5)),
+        graph.to_csr().indices.tolist(),
+    )
+
+
+def test_indexes_are_not_built_on_construction():
+    # Act.
+    graph: LwwElementGraph = LwwElementGraph()
+
+    # Assert.
+    assert graph.indexes == GraphIndex.ALL
+    assert graph._adjacency is None
+    assert graph._components is None
+    assert graph._value_index is None
+    assert graph._csr is None
+    assert graph._query_cache is None
+
+
+def test_enabled_indexes_are_kept():
+    # Arrange.
+    graph = _build_graph(GraphIndex.ALL)
+
+    # Act.
+    _query(graph)
+
+    # Assert.
+    assert graph._adjacency is not None
+    assert graph._components is not None
+    assert graph._value_index is not None
+    assert graph._csr is not None
+
+
+def test_disabled_indexes_are_not_kept():
+    # Arrange.
+    graph = _build_graph(GraphIndex.VALUES)
+
+    # Act.
+    _query(graph)
+
+    # Assert.
+    assert graph._adjacency is None
+    assert graph._components is None
+    assert graph._value_index is not None
+    assert graph._csr is None
+
+
+@pytest.mark.parametrize(
+    "indexes",
+    [GraphIndex.NONE, GraphIndex.ADJACENCY, GraphIndex.COMPONENTS | GraphIndex.CSR],
+)
+def test_queries_do_not_depend_on_indexes(indexes):
+    # Arrange.
+    graph = _build_graph(GraphIndex.ALL)
+    graph_with_indexes = _build_graph(indexes)
+    _query(graph)
+    _query(graph_with_indexes)
+
+    # Act.
+    for some_graph in (graph, graph_with_indexes):
+        some_graph.remove_vertex("1", cascade=True)
+        some_graph.set_vertex_value("2", 3)
+
+    # Assert.
+    assert _query(graph_with_indexes) == _query(graph)
+
+
+def test_fork_and_merge_keep_indexes():
+    # Arrange.
+    graph = _build_graph(GraphIndex.ADJACENCY)
+    other_graph = _build_graph(GraphIndex.ALL, seed=1)
+    other_graph.vertices_in_value_range(0, 10)
+
+    # Act.
+    fork = graph.fork()
+    merged_graph = graph.merge(other_graph)
+    merged_graph.vertices_in_value_range(0, 10)
+
+    # Assert.
+    assert fork.indexes == GraphIndex.ADJACENCY
+    assert merged_graph.indexes == GraphIndex.ADJACENCY
+    assert merged_graph._value_index is None
+
+
+def test_load_graph_with_indexes():
+    # Act.
+    graph = load_graph(["1", "2"], ["1,2"], indexes=GraphIndex.NONE)
+    graph.degree("1")
+
+    # Assert.
+    assert graph.indexes == GraphIndex.NONE
+    assert graph._adjacency is None
+
+
+def test_remove_vertices_without_adjacency_index_removes_shared_edge_once():
+    # Arrange.
+    graph: LwwElementGraph = LwwElementGraph(indexes=GraphIndex.NONE)
+    for vertex_id in ("a", "b", "c"):
+        graph.add_vertex(vertex_id)
+    graph.add_edge("a", "b")
+    graph.add_edge("b", "c")
+    graph.edge_count()
+    subscription = graph.subscribe()
+    version = graph.version
+
+    # Act.
+    graph.remove_vertices(("a", "b"), cascade=True)
+
+    # Assert.
+    assert graph.edge_count() == 0
+    assert graph.vertex_count() == 1
+    assert graph.version == version + 4
+    assert sorted(
+        sorted(change.element)
+        for change in subscription.changes()
+        if change.kind == ChangeKind.EDGE_REMOVED
+    ) == [["a", "b"], ["b", "c"]]
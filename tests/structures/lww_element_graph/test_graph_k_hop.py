@@ -0,0 +1,89 @@
+import pytest
+
+from lww_element_graph.structures.lww_element_graph import (
+    GraphOperationError,
+    LwwElementGraph,
+)
+
+
+def _build_path_graph(vertices_count: int) -> LwwElementGraph[int]:
+    graph: LwwElementGraph[int] = LwwElementGraph()
+    for i in range(vertices_count):
+        graph.add_vertex(str(i))
+    for i in range(vertices_count - 1):
+        graph.add_edge(str(i), str(i + 1))
+    return graph
+
+
+def test_k_hop_neighbourhood():
+    # Arrange.
+    graph = _build_path_graph(10)
+
+    # Act.
+    neighbourhoods = graph.k_hop_neighbourhood(["0", "5"], k=2)
+
+    # Assert.
+    assert neighbourhoods == {
+        "0": frozenset({"0", "1", "2"}),
+        "5": frozenset({"3", "4", "5", "6", "7"}),
+    }
+
+
+def test_k_hop_neighbourhood_union():
+    # Arrange.
+    graph = _build_path_graph(10)
+
+    # Act.
+    neighbourhood = graph.k_hop_neighbourhood(["0", "9"], k=1, union=True)
+
+    # Assert.
+    assert neighbourhood == frozenset({"0", "1", "8", "9"})
+
+
+def test_k_hop_neighbourhood_zero_hops():
+    # Arrange.
+    graph = _build_path_graph(3)
+
+    # Act.
+    neighbourhoods = graph.k_hop_neighbourhood(["1"], k=0)
+
+    # Assert.
+    assert neighbourhoods == {"1": frozenset({"1"})}
+
+
+def test_k_hop_neighbourhood_after_modification():
+    # Arrange.
+    graph = _build_path_graph(5)
+    graph.k_hop_neighbourhood(["0"], k=4)
+
+    # Act.
+    graph.remove_edge("1", "2")
+
+    # Assert.
+    assert graph.k_hop_neighbourhood(["0"], k=4) == {"0": frozenset({"0", "1"})}
+
+
+def test_k_hop_neighbourhood_many_seeds():
+    # Arrange.
+    graph = _build_path_graph(1000)
+    seeds = [str(i) for i in range(1000)]
+
+    # Act.
+    neighbourhoods = graph.k_hop_neighbourhood(seeds, k=3)
+
+    # Assert.
+    for seed in seeds:
+        assert neighbourhoods[seed] == frozenset(
+            str(i) for i in range(max(0, int(seed) - 3), min(1000, int(seed) + 4))
+        )
+
+
+def test_k_hop_neighbourhood_errors():
+    # Arrange.
+    graph = _build_path_graph(3)
+
+    # Act & Assert.
+    with pytest.raises(GraphOperationError):
+        graph.k_hop_neighbourhood(["missing"], k=1)
+    with pytest.raises(ValueError):
+        graph.k_hop_neighbourhood(["0"], k=-1)
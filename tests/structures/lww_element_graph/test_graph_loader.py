@@ -0,0 +1,101 @@
+import gc
+import io
+
+import pytest
+
+from lww_element_graph.structures.graph_loader import load_graph
+from lww_element_graph.structures.lww_element_graph import (
+    GraphOperationError,
+    LwwElementGraph,
+)
+
+
+def test_load_graph(tmp_path):
+    # Arrange.
+    vertices_path = tmp_path / "vertices.csv"
+    vertices_path.write_text("id\n1\n2\n3\n2\n")
+    edges_path = tmp_path / "edges.csv"
+    edges_path.write_text("first,second\n1,2\n2,1\n2,3\n")
+    values_path = tmp_path / "values.csv"
+    values_path.write_text("id,value\n1,10\n2,20\n1,30\n")
+
+    # Act.
+    graph = load_graph(
+        vertices_path,
+        edges_path,
+        values_path,
+        parse_value=int,
+        skip_header=True,
+        chunk_size=2,
+    )
+
+    # Assert.
+    expected_graph: LwwElementGraph[int] = LwwElementGraph()
+    for vertex_id in ("1", "2", "3"):
+        expected_graph.add_vertex(vertex_id)
+    expected_graph.add_edge("1", "2")
+    expected_graph.add_edge("2", "3")
+    expected_graph.set_vertex_value("1", 30)
+    expected_graph.set_vertex_value("2", 20)
+    assert graph == expected_graph
+    assert graph.edge_count() == 2
+
+
+def test_load_graph_tsv():
+    # Arrange.
+    vertices = io.StringIO("a b\nc d\n")
+    edges = io.StringIO("a b\tc d\n\n")
+
+    # Act.
+    graph = load_graph(vertices, edges, delimiter="\t", persistent=True)
+
+    # Assert.
+    assert graph.has_edge("a b", "c d") is True
+    assert graph.vertices.persistent is True
+
+
+@pytest.mark.parametrize("pause_gc", [False, True])
+def test_load_graph_pauses_gc_only_if_asked_to(pause_gc):
+    # Arrange.
+    gc_enabled = []
+
+    def parse_value(value: str) -> int:
+        gc_enabled.append(gc.isenabled())
+        return int(value)
+
+    # Act.
+    load_graph(["1"], values=["1,10"], parse_value=parse_value, pause_gc=pause_gc)
+
+    # Assert.
+    assert gc_enabled == [not pause_gc]
+    assert gc.isenabled() is True
+
+
+def test_loaded_graph_can_be_updated_and_merged():
+    # Arrange.
+    graph = load_graph(["1", "2"], ["1,2"])
+    replica = graph.fork()
+
+    # Act.
+    replica.remove_edge("1", "2")
+    merged_graph = graph.merge(replica)
+
+    # Assert.
+    assert merged_graph.has_edge("1", "2") is False
+    assert merged_graph.has_vertex("1") is True
+
+
+@pytest.mark.parametrize(
+    "edges, values, error",
+    [
+        (["1,3"], [], GraphOperationError),
+        (["1,1"], [], GraphOperationError),
+        (["1"], [], ValueError),
+        ([], ["3,30"], GraphOperationError),
+        ([], ["1"], ValueError),
+    ],
+)
+def test_load_graph_errors(edges, values, error):
+    # Act & Assert.
+    with pytest.raises(error):
+        load_graph(["1", "2"], edges, values)
@@ -0,0 +1,141 @@
+import random
+
+from lww_element_graph.structures.lww_element_graph import LwwElementGraph
+from lww_element_graph.structures.lww_element_set import LwwElementSet
+
+
+def test_merge_with_dominated_graph_skips_merging_timestamps(monkeypatch):
+    # Arrange.
+    first_replica: LwwElementGraph[int] = LwwElementGraph()
+    first_replica.add_vertex("1")
+    second_replica = first_replica.fork()
+    second_replica.add_vertex("2")
+    second_replica.set_vertex_value("2", 123)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Timestamps should not be merged.")
+
+    monkeypatch.setattr(LwwElementSet, "_merge_timestamps", fail)
+
+    # Act.
+    first_merged = first_replica.merge(second_replica)
+    second_merged = second_replica.merge(first_replica)
+
+    # Assert.
+    assert first_merged == second_merged == second_replica
+    assert first_merged.get_vertex_value("2") == 123
+
+
+def test_merge_with_dominated_graph_takes_its_value():
+    # Arrange.
+    first_replica: LwwElementGraph[int] = LwwElementGraph()
+    first_replica.add_vertex("v")
+    first_replica.set_vertex_value("v", 7)
+    second_replica = first_replica.fork()
+    second_replica.remove_vertex("v")
+    first_replica.remove_vertex("v")
+    first_replica = first_replica.merge(second_replica)
+    first_replica.add_vertex("v")
+
+    # Act.
+    merged_replica = first_replica.merge(second_replica)
+
+    # Assert.
+    assert merged_replica.get_vertex_value("v") == 7
+
+
+def test_merge_with_dominated_graph_removes_orphant_edges():
+    # Arrange.
+    first_replica: LwwElementGraph[int] = LwwElementGraph()
+    first_replica.add_vertex("a")
+    first_replica.add_edge("a", "zz")
+
+    # Act.
+    merged_replica = first_replica.merge(LwwElementGraph())
+
+    # Assert.
+    assert merged_replica.has_edge("a", "zz") is False
+
+
+def _update_randomly(
+    generator: random.Random, replicas: list[LwwElementGraph[int]]
+) -> None:
+    index = generator.randrange(len(replicas))
+    replica = replicas[index]
+    vertex_id, other_vertex_id = generator.sample("abcde", 2)
+    operation = generator.randrange(7)
+    if operation == 0 and not replica.has_vertex(vertex_id):
+        replica.add_vertex(vertex_id)
+    elif operation == 1 and replica.has_vertex(vertex_id):
+        replica.set_vertex_value(vertex_id, generator.randrange(3))
+    elif operation == 2 and replica.has_vertex(vertex_id):
+        replica.remove_vertex(vertex_id, cascade=True)
+    elif operation == 3 and not replica.has_edge(vertex_id, other_vertex_id):
+        replica.add_edge(vertex_id, other_vertex_id)
+    elif operation == 4:
+        replicas[index] = replica.merge(generator.choice(replicas))
+    elif operation == 5:
+        replicas[index] = generator.choice(replicas).fork()
+    elif operation == 6:
+        replicas[index] = replica.merge(
+            generator.choice(replicas).extract(lambda v: v < "c")
+        )
+
+
+def test_merge_equals_merge_without_dominance_checks(monkeypatch):
+    # Arrange.
+    generator = random.Random(0)
+    checked_merges = 0
+
+    # Act & assert.
+    for _ in range(100):
+        replicas: list[LwwElementGraph[int]] = [LwwElementGraph() for _ in range(3)]
+        for _ in range(30):
+            _update_randomly(generator, replicas)
+            first_replica, second_replica = generator.sample(replicas, 2)
+            merged_replica = first_replica.merge(second_replica)
+            with monkeypatch.context() as patch:
+                patch.setattr(LwwElementSet, "dominates", lambda *args: False)
+                fully_merged_replica = first_replica.merge(second_replica)
+            assert merged_replica == fully_merged_replica
+            assert dict(merged_replica.vertices.add_timestamps) == dict(
+                fully_merged_replica.vertices.add_timestamps
+            )
+            # Edges removed by merge get timestamps of the merge.
+            assert set(merged_replica.edges.remove_timestamps) == set(
+                fully_merged_replica.edges.remove_timestamps
+            )
+            checked_merges += first_replica.vertices.dominates(second_replica.vertices)
+    assert checked_merges > 100
+
+
+def test_merge_result_is_independent_of_dominating_graph():
+    # Arrange.
+    first_replica: LwwElementGraph[int] = LwwElementGraph()
+    first_replica.add_vertex("1")
+    second_replica: LwwElementGraph[int] = LwwElementGraph()
+
+    # Act.
+    merged_replica = first_replica.merge(second_replica)
+    merged_replica.add_vertex("2")
+    first_replica.add_vertex("3")
+
+    # Assert.
+    assert first_replica.has_vertex("2") is False
+    assert merged_replica.has_vertex("3") is False
+    assert merged_replica.merge(first_replica).has_vertex("3") is True
+
+
+def test_concurrently_updated_graphs_are_fully_merged():
+    # Arrange.
+    first_replica: LwwElementGraph[int] = LwwElementGraph()
+    first_replica.add_vertex("1")
+    second_replica = first_replica.fork()
+    first_replica.add_vertex("2")
+    second_replica.add_vertex("3")
+
+    # Act.
+    merged_replica = first_replica.merge(second_replica)
+
+    # Assert.
+    assert set(merged_replica.vertices.values()) == {"1", "2", "3"}
@@ -0,0 +1,101 @@
+import pytest
+
+from lww_element_graph.structures.lww_element_graph import (
+    GraphOperationError,
+    LwwElementGraph,
+)
+from lww_element_graph.structures.lww_element_set import Bias
+from lww_element_graph.structures.merge_pipeline import MergePipeline
+
+
+def _replica_with_vertex(vertex_id: str) -> LwwElementGraph:
+    replica = LwwElementGraph()
+    replica.add_vertex(vertex_id)
+    return replica
+
+
+def test_pipeline_merges_submitted_replicas():
+    # Arrange.
+    graph = _replica_with_vertex("0")
+
+    # Act.
+    with MergePipeline(graph) as pipeline:
+        for i in range(1, 20):
+            pipeline.submit(_replica_with_vertex(str(i)))
+        assert pipeline.flush(timeout=10) is True
+        current = pipeline.current
+        metrics = pipeline.metrics()
+
+    # Assert.
+    assert set(current.vertices.values()) == {str(i) for i in range(20)}
+    assert set(graph.vertices.values()) == {"0"}, "Graph should not be modified."
+    assert metrics.queue_depth == 0
+    assert metrics.merged_replicas == 19
+    assert 1 <= metrics.merges <= 19
+    assert metrics.max_merge_lag >= metrics.last_merge_lag >= 0
+
+
+def test_pipeline_coalesces_queued_replicas():
+    # Arrange.
+    pipeline = MergePipeline(_replica_with_vertex("0"))
+    for i in range(1, 5):
+        pipeline.submit(_replica_with_vertex(str(i)))
+    assert pipeline.metrics().queue_depth == 4
+
+    # Act.
+    pipeline.start()
+    pipeline.stop()
+
+    # Assert.
+    assert pipeline.metrics().merges == 1
+    assert set(pipeline.current.vertices.values()) == {"0", "1", "2", "3", "4"}
+
+
+def test_pipeline_rejects_replica_with_different_bias():
+    # Arrange.
+    pipeline = MergePipeline(_replica_with_vertex("0"))
+
+    # Act & assert.
+    with pytest.raises(GraphOperationError):
+        pipeline.submit(LwwElementGraph(bias=Bias.REMOVES))
+    assert pipeline.metrics().queue_depth == 0
+
+
+def test_pipeline_drops_only_replicas_failing_to_merge():
+    # Arrange.
+    pipeline = MergePipeline(_replica_with_vertex("0"))
+    failing_replica = _replica_with_vertex("2")
+    for replica in (_replica_with_vertex("1"), failing_replica):
+        pipeline.submit(replica)
+    pipeline.submit(_replica_with_vertex("3"))
+    failing_replica.edges.bias = Bias.REMOVES
+
+    # Act.
+    with pipeline:
+        pipeline.flush(timeout=10)
+        pipeline.submit(_replica_with_vertex("4"))
+        pipeline.flush(timeout=10)
+
+    # Assert.
+    assert isinstance(pipeline.last_error, GraphOperationError)
+    assert pipeline.metrics().merged_replicas == 3
+    assert set(pipeline.current.vertices.values()) == {"0", "1", "3", "4"}
+
+
+def test_pipeline_publishes_merges_to_subscriptions_of_the_graph():
+    # Arrange.
+    graph = _replica_with_vertex("0")
+    subscription = graph.subscribe()
+    replicas = [_replica_with_vertex("1"), _replica_with_vertex("2")]
+    replica_subscription = replicas[0].subscribe()
+
+    # Act.
+    with MergePipeline(graph) as pipeline:
+        for replica in replicas:
+            pipeline.submit(replica)
+        pipeline.flush(timeout=10)
+    replicas[0].add_vertex("3")
+
+    # Assert.
+    assert {change.element for change in subscription.changes()} == {"1", "2"}
+    assert [change.element for change in replica_subscription.changes()] == ["3"]
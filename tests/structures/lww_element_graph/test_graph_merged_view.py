@@ -0,0 +1,104 @@
+import pytest
+from freezegun import freeze_time
+
+from lww_element_graph.structures.lww_element_graph import (
+    GraphOperationError,
+    LwwElementGraph,
+)
+from lww_element_graph.structures.lww_element_set import Bias
+from lww_element_graph.structures.merged_view import MergedView
+
+
+def _build_replicas() -> tuple[LwwElementGraph[int], ...]:
+    first_replica: LwwElementGraph[int] = LwwElementGraph()
+    first_replica.add_vertex("1")
+    first_replica.add_vertex("2")
+    first_replica.add_edge("1", "2")
+    first_replica.set_vertex_value("1", 123)
+
+    second_replica: LwwElementGraph[int] = first_replica.fork()
+    second_replica.add_vertex("3")
+    second_replica.add_edge("2", "3")
+    second_replica.set_vertex_value("1", 456)
+
+    third_replica: LwwElementGraph[int] = first_replica.fork()
+    third_replica.remove_edge("1", "2")
+    third_replica.remove_vertex("2")
+
+    return first_replica, second_replica, third_replica
+
+
+def test_merged_view_matches_materialized_merge():
+    # Arrange.
+    replicas = _build_replicas()
+    merged_view = MergedView(*replicas)
+
+    # Act.
+    merged_replica = merged_view.materialize()
+
+    # Assert.
+    for vertex_id in ("1", "2", "3", "4"):
+        assert merged_view.has_vertex(vertex_id) == merged_replica.has_vertex(vertex_id)
+    for edge in (("1", "2"), ("2", "3"), ("1", "3")):
+        assert merged_view.has_edge(*edge) == merged_replica.has_edge(*edge)
+    assert merged_view.get_vertex_value("1") == merged_replica.get_vertex_value("1")
+    assert merged_view.get_vertex_value("3") is None
+
+
+def test_merged_view_edge_of_removed_vertex_not_in_view():
+    # Arrange.
+    _, second_replica, third_replica = _build_replicas()
+
+    # Act.
+    merged_view = MergedView(second_replica, third_replica)
+
+    # Assert.
+    assert merged_view.has_vertex("2") is False
+    assert merged_view.has_edge("2", "3") is False
+
+
+def test_merged_view_bias_towards_removes():
+    # Arrange.
+    first_replica = LwwElementGraph(bias=Bias.REMOVES)
+    second_replica = LwwElementGraph(bias=Bias.REMOVES)
+    with freeze_time() as frozen_time:
+        first_replica.add_vertex("1")
+        frozen_time.tick()
+        first_replica.remove_vertex("1")
+        second_replica.add_vertex("1")
+
+    # Act.
+    merged_view = MergedView(first_replica, second_replica)
+
+    # Assert.
+    assert merged_view.has_vertex("1") is False
+
+
+def test_merged_view_values_set_in_the_same_time_higher_value_wins():
+    # Arrange.
+    first_replica: LwwElementGraph[int] = LwwElementGraph()
+    second_replica: LwwElementGraph[int] = LwwElementGraph()
+    with freeze_time():
+        first_replica.add_vertex("1")
+        second_replica.add_vertex("1")
+        first_replica.set_vertex_value("1", 456)
+        second_replica.set_vertex_value("1", 123)
+
+    # Act & assert.
+    assert MergedView(first_replica, second_replica).get_vertex_value("1") == 456
+    assert MergedView(second_replica, first_replica).get_vertex_value("1") == 456
+
+
+def test_merged_view_missing_vertex_value_raises_error():
+    # Arrange.
+    merged_view = MergedView(*_build_replicas())
+
+    # Act & Assert.
+    with pytest.raises(GraphOperationError, match="not found in graph"):
+        merged_view.get_vertex_value("4")
+
+
+def test_merged_view_different_bias_raises_error():
+    # Act & Assert.
+    with pytest.raises(GraphOperationError, match="same bias"):
+        MergedView(LwwElementGraph(bias=Bias.ADDS), LwwElementGraph(bias=Bias.REMOVES))
@@ -0,0 +1,116 @@
+from lww_element_graph.structures.lww_element_graph import LwwElementGraph
+from lww_element_graph.structures.query_cache import CacheStats
+
+
+def _build_graph() -> LwwElementGraph:
+    graph = LwwElementGraph()
+    graph.add_vertex("1")
+    graph.add_vertex("2")
+    graph.add_vertex("3")
+    graph.add_vertex("4")
+    graph.add_vertex("5")
+    graph.add_edge("1", "2")
+    graph.add_edge("2", "3")
+    graph.add_edge("4", "5")
+    return graph
+
+
+def test_version_is_bumped_by_operations_and_merge():
+    # Arrange.
+    graph = _build_graph()
+    version = graph.version
+
+    # Act & assert.
+    graph.set_vertex_value("1", 123)
+    assert graph.version > version
+    version = graph.version
+
+    graph.remove_edge("1", "2")
+    assert graph.version > version
+
+    merged_graph = graph.merge(LwwElementGraph())
+    assert merged_graph.version > graph.version
+
+
+def test_repeated_queries_hit_cache():
+    # Arrange.
+    graph = _build_graph()
+
+    # Act.
+    first_path = graph.find_any_path("1", "3")
+    second_path = graph.find_any_path("1", "3")
+    graph.get_adjacent_vertices("2")
+    graph.get_adjacent_vertices("2")
+
+    # Assert.
+    assert first_path == second_path == ("1", "2", "3")
+    assert graph.query_cache_stats() == CacheStats(hits=2, misses=2, size=2)
+
+
+def test_cached_path_invalidated_by_touched_vertex():
+    # Arrange.
+    graph = _build_graph()
+    graph.find_any_path("1", "3")
+    graph.find_any_path("4", "5")
+
+    # Act.
+    graph.remove_edge("2", "3")
+
+    # Assert.
+    assert graph.find_any_path("1", "3") is None
+    assert graph.find_any_path("4", "5") == ("4", "5")
+    assert graph.query_cache_stats().hits == 1, "Unrelated path should stay cached."
+
+
+def test_cached_lack_of_path_invalidated_by_new_edge():
+    # Arrange.
+    graph = _build_graph()
+    assert graph.find_any_path("1", "5") is None
+
+    # Act.
+    graph.add_edge("3", "4")
+
+    # Assert.
+    assert graph.find_any_path("1", "5") == ("1", "2", "3", "4", "5")
+
+
+def test_cached_adjacent_vertices_invalidated_by_new_edge():
+    # Arrange.
+    graph = _build_graph()
+    assert graph.get_adjacent_vertices("1") == frozenset({"2"})
+
+    # Act.
+    graph.add_edge("1", "5")
+
+    # Assert.
+    assert graph.get_adjacent_vertices("1") == frozenset({"2", "5"})
+
+
+def test_cache_is_bounded():
+    # Arrange.
+    graph = LwwElementGraph(query_cache_size=2)
+    graph.add_vertex("1")
+    graph.add_vertex("2")
+    graph.add_vertex("3")
+
+    # Act.
+    graph.get_adjacent_vertices("1")
+    graph.get_adjacent_vertices("2")
+    graph.get_adjacent_vertices("3")
+    graph.get_adjacent_vertices("1")
+
+    # Assert.
+    assert graph.query_cache_stats() == CacheStats(hits=0, misses=4, size=2)
+
+
+def test_disabled_cache():
+    # Arrange.
+    graph = LwwElementGraph(query_cache_size=0)
+    graph.add_vertex("1")
+
+    # Act.
+    graph.get_adjacent_vertices("1")
+    graph.get_adjacent_vertices("1")
+
+    # Assert.
+    assert graph.query_cache_stats() == CacheStats(hits=0, misses=0, size=0)
@@ -0,0 +1,93 @@
+import pytest
+
+from lww_element_graph.structures.lww_element_graph import (
+    GraphOperationError,
+    LwwElementGraph,
+)
+
+
+def test_remove_vertex_cascade_removes_connected_edges():
+    # Arrange.
+    graph = LwwElementGraph()
+    graph.add_vertex("1")
+    graph.add_vertex("2")
+    graph.add_vertex("3")
+    graph.add_edge("1", "2")
+    graph.add_edge("1", "3")
+    graph.add_edge("2", "3")
+
+    # Act.
+    graph.remove_vertex("1", cascade=True)
+
+    # Assert.
+    assert graph.has_vertex("1") is False
+    assert graph.has_edge("1", "2") is False
+    assert graph.has_edge("1", "3") is False
+    assert graph.has_edge("2", "3") is True
+    assert graph.get_adjacent_vertices("2") == frozenset({"3"})
+
+
+def test_remove_vertex_cascade_uses_single_timestamp():
+    # Arrange.
+    graph = LwwElementGraph()
+    graph.add_vertex("1")
+    graph.add_vertex("2")
+    graph.add_edge("1", "2")
+
+    # Act.
+    graph.remove_vertex("1", cascade=True)
+
+    # Assert.
+    assert (
+        graph.vertices.remove_timestamps["1"]
+        == graph.edges.remove_timestamps[frozenset(("1", "2"))]
+    )
+
+
+def test_remove_vertices_removes_edges_between_removed_vertices():
+    # Arrange.
+    graph = LwwElementGraph()
+    graph.add_vertex("1")
+    graph.add_vertex("2")
+    graph.add_vertex("3")
+    graph.add_edge("1", "2")
+    graph.add_edge("2", "3")
+
+    # Act.
+    graph.remove_vertices(["1", "2"], cascade=True)
+
+    # Assert.
+    assert set(graph.vertices.values()) == {"3"}
+    assert len(tuple(graph.edges.values())) == 0
+
+
+def test_remove_vertices_with_connected_edges_raises_error():
+    # Arrange.
+    graph = LwwElementGraph()
+    graph.add_vertex("1")
+    graph.add_vertex("2")
+    graph.add_vertex("3")
+    graph.add_edge("2", "3")
+
+    # Act & Assert.
+    with pytest.raises(GraphOperationError, match="has edges connected."):
+        graph.remove_vertices(["1", "2"])
+    assert graph.has_vertex("1") is True, "Graph should not be modified."
+
+
+def test_removed_cascade_vertex_edges_stay_removed_after_merge():
+    # Arrange.
+    first_replica = LwwElementGraph()
+    first_replica.add_vertex("1")
+    first_replica.add_vertex("2")
+    first_replica.add_edge("1", "2")
+    second_replica = first_replica.merge(LwwElementGraph())
+
+    # Act.
+    first_replica.remove_vertex("1", cascade=True)
+    merged_replica = second_replica.merge(first_replica)
+
+    # Assert.
+    assert merged_replica.has_vertex("1") is False
+    assert merged_replica.has_edge("1", "2") is False
+    assert merged_replica.get_adjacent_vertices("2") == frozenset()
@@ -0,0 +1,139 @@
+import pytest
+
+from lww_element_graph.structures.lww_element_graph import (
+    GraphOperationError,
+    LwwElementGraph,
+    ShortestPath,
+)
+
+
+def _build_graph() -> LwwElementGraph[int]:
+    """Builds graph with two routes from "a" to "d".
+
+    a - b - d is shorter, a - c - d is cheaper by vertex values.
+    """
+    graph: LwwElementGraph[int] = LwwElementGraph()
+    for vertex_id, value in (("a", 0), ("b", 10), ("c", 1), ("e", 1), ("d", 1)):
+        graph.add_vertex(vertex_id)
+        graph.set_vertex_value(vertex_id, value)
+    graph.add_edge("a", "b")
+    graph.add_edge("b", "d")
+    graph.add_edge("a", "c")
+    graph.add_edge("c", "e")
+    graph.add_edge("e", "d")
+    return graph
+
+
+def test_shortest_path_with_unit_costs():
+    # Arrange.
+    graph = _build_graph()
+
+    # Act.
+    shortest_path = graph.shortest_path("a", "d")
+
+    # Assert.
+    assert shortest_path == ShortestPath(("a", "b", "d"), 1 + 1)
+
+
+def test_shortest_path_with_cost_function():
+    # Arrange.
+    graph = _build_graph()
+
+    def cost(first_vertex_id, second_vertex_id):
+        return graph.get_vertex_value(second_vertex_id)
+
+    # Act.
+    shortest_path = graph.shortest_path("a", "d", cost=cost)
+    a_star_path = graph.shortest_path("a", "d", cost=cost, heuristic=lambda v: 0)
+
+    # Assert.
+    assert shortest_path == ShortestPath(("a", "c", "e", "d"), 3)
+    assert a_star_path == shortest_path
+
+
+def test_shortest_path_pruning():
+    # Arrange.
+    graph = _build_graph()
+
+    # Act & Assert.
+    assert graph.shortest_path("a", "d", max_cost=1) is None
+    assert graph.shortest_path("a", "d", predicate=lambda v: v != "b") == (
+        ShortestPath(("a", "c", "e", "d"), 3)
+    )
+    assert graph.shortest_path("a", "a") == ShortestPath(("a",), 0)
+
+
+def test_a_star_with_inconsistent_heuristic():
+    # Arrange.
+    graph: LwwElementGraph[int] = LwwElementGraph()
+    for vertex_id in ("s", "a", "b", "c", "t"):
+        graph.add_vertex(vertex_id)
+    costs = {"sa": 1, "sb": 2, "ac": 1, "bc": 2, "ct": 3}
+    for edge in costs:
+        graph.add_edge(edge[0], edge[1])
+
+    def cost(first_vertex_id, second_vertex_id):
+        return costs.get(first_vertex_id + second_vertex_id) or costs.get(
+            second_vertex_id + first_vertex_id
+        )
+
+    # Admissible, but not consistent - "c" is first reached through "b".
+    heuristic = {"s": 0, "a": 3.5, "b": 0, "c": 0, "t": 0}.get
+
+    # Act.
+    shortest_path = graph.shortest_path("s", "t", cost=cost, heuristic=heuristic)
+
+    # Assert.
+    assert shortest_path == ShortestPath(("s", "a", "c", "t"), 5)
+
+
+def test_shortest_path_errors():
+    # Arrange.
+    graph = _build_graph()
+    graph.add_vertex("isolated")
+
+    # Act & Assert.
+    assert graph.shortest_path("a", "isolated") is None
+    with pytest.raises(GraphOperationError):
+        graph.shortest_path("a", "missing")
+    with pytest.raises(ValueError):
+        graph.shortest_path("a", "d", cost=lambda first, second: -1)
+
+
+def test_k_shortest_paths():
+    # Arrange.
+    graph = _build_graph()
+    graph.add_edge("b", "c")
+
+    # Act.
+    paths = graph.k_shortest_paths("a", "d", k=10)
+
+    # Assert.
+    assert paths == [
+        ShortestPath(("a", "b", "d"), 2),
+        ShortestPath(("a", "c", "b", "d"), 3),
+        ShortestPath(("a", "c", "e", "d"), 3),
+        ShortestPath(("a", "b", "c", "e", "d"), 4),
+    ]
+
+
+def test_k_shortest_paths_on_grid():
+    # Arrange.
+    graph: LwwElementGraph[int] = LwwElementGraph()
+    for i in range(3):
+        for j in range(3):
+            graph.add_vertex(f"{i}{j}")
+            if i:
+                graph.add_edge(f"{i - 1}{j}", f"{i}{j}")
+            if j:
+                graph.add_edge(f"{i}{j - 1}", f"{i}{j}")
+
+    # Act.
+    paths = graph.k_shortest_paths("00", "22", k=6, max_cost=4)
+
+    # Assert.
+    # There are 6 monotone paths of 4 edges between opposite corners.
+    assert len(paths) == 6
+    assert len({path.path for path in paths}) == 6
+    assert all(path.cost == 4 for path in paths)
+    assert graph.k_shortest_paths("00", "22", k=7, max_cost=4) == paths
@@ -0,0 +1,142 @@
+import random
+
+import pytest
+from freezegun import freeze_time
+
+from lww_element_graph.structures.lww_element_graph import LwwElementGraph
+from lww_element_graph.utils.sqlite_storage import SqliteMap, SqliteScratchStorage
+from lww_element_graph.utils.timestamp import use_clock
+
+
+@pytest.fixture
+def storage():
+    with SqliteScratchStorage(cache_size=16) as storage:
+        yield storage
+
+
+def _apply_random_operations(
+    graphs: list[LwwElementGraph[int]], generator: random.Random
+) -> None:
+    for _ in range(300):
+        vertices_ids = [str(generator.randrange(20)) for _ in range(2)]
+        value = generator.randrange(5)
+        for graph in graphs:
+            if not graph.has_vertex(vertices_ids[0]):
+                graph.add_vertex(vertices_ids[0])
+            elif not graph.has_vertex(vertices_ids[1]):
+                graph.add_vertex(vertices_ids[1])
+            elif vertices_ids[0] == vertices_ids[1]:
+                graph.set_vertex_value(vertices_ids[0], value)
+            elif graph.has_edge(*vertices_ids):
+                graph.remove_edge(*vertices_ids)
+            else:
+                graph.add_edge(*vertices_ids)
+
+
+def test_graph_in_sqlite_storage(storage):
+    # Arrange.
+    graph: LwwElementGraph[int] = LwwElementGraph(storage=storage)
+
+    # Act.
+    graph.add_vertex("1")
+    graph.add_vertex("2")
+    graph.add_edge("1", "2")
+    graph.set_vertex_value("1", 10)
+
+    # Assert.
+    assert isinstance(graph.vertices.add_timestamps, SqliteMap)
+    assert isinstance(graph.edges.remove_timestamps, SqliteMap)
+    assert isinstance(graph.vertices_values, SqliteMap)
+    assert graph.get_adjacent_vertices("1") == frozenset({"2"})
+    assert graph.get_vertex_value("1") == 10
+
+
+def test_merge_in_sqlite_storage_matches_in_memory_merge(storage):
+    # Arrange.
+    generator = random.Random(3)
+    first_replica: LwwElementGraph[int] = LwwElementGraph(storage=storage)
+    first_in_memory: LwwElementGraph[int] = LwwElementGraph()
+    with freeze_time("2020-01-01", tick=True):
+        _apply_random_operations([first_replica, first_in_memory], generator)
+    second_replica = first_replica.fork()
+    second_in_memory = first_in_memory.fork()
+    with freeze_time("2021-01-01", tick=True):
+        _apply_random_operations([first_replica, first_in_memory], generator)
+        _apply_random_operations([second_replica, second_in_memory], generator)
+
+    # Act.
+    merged_replica = first_replica.merge(second_replica)
+
+    # Assert.
+    assert isinstance(merged_replica.edges.add_timestamps, SqliteMap)
+    assert merged_replica == first_in_memory.merge(second_in_memory)
+    first_timestamps = dict(first_replica.edges.add_timestamps)
+    second_timestamps = dict(second_replica.edges.add_timestamps)
+    assert dict(merged_replica.edges.add_timestamps) == {
+        edge: max(first_timestamps.get(edge, 0), second_timestamps.get(edge, 0))
+        for edge in first_timestamps.keys() | second_timestamps.keys()
+    }
+
+
+def test_merge_in_sqlite_storage_runs_in_sql(storage):
+    # Arrange.
+    first_replica: LwwElementGraph[int] = LwwElementGraph(storage=storage)
+    for i in range(2000):
+        first_replica.add_vertex(str(i))
+    for i in range(1999):
+        first_replica.add_edge(str(i), str(i + 1))
+    second_replica = first_replica.fork()
+    for i in range(100):
+        first_replica.set_vertex_value(str(i), i)
+        second_replica.add_vertex(f"new-{i}")
+    statements = []
+    storage._connection.set_trace_callback(statements.append)
+
+    # Act.
+    merged_replica = first_replica.merge(second_replica)
+
+    # Assert.
+    storage._connection.set_trace_callback(None)
+    assert len(statements) < 50
+    assert merged_replica.vertex_count() == 2100
+    assert merged_replica.get_vertex_value("5") == 5
+
+
+def test_merge_in_sqlite_storage_removes_orphant_edges(storage):
+    # Arrange.
+    first_replica: LwwElementGraph[int] = LwwElementGraph(storage=storage)
+    for vertex_id in ("1", "2", "3"):
+        first_replica.add_vertex(vertex_id)
+    first_replica.add_edge("1", "2")
+    second_replica = first_replica.fork()
+    first_replica.remove_vertex("2", cascade=True)
+    second_replica.add_edge("2", "3")
+
+    # Act.
+    merged_replica = first_replica.merge(second_replica)
+
+    # Assert.
+    assert merged_replica.has_vertex("2") is False
+    assert merged_replica.has_edge("2", "3") is False
+    assert merged_replica.get_adjacent_vertices("3") == frozenset()
+    assert dict(merged_replica._get_adjacency()) == {}
+    assert frozenset({"2", "3"}) in merged_replica.edges.remove_timestamps
+    merged_edges = merged_replica.edges
+    assert merged_edges.version_vector[merged_edges.replica_id] == 1
+
+
+def test_merge_in_sqlite_storage_of_values_set_at_same_time(storage):
+    # Arrange.
+    first_replica: LwwElementGraph[int] = LwwElementGraph(storage=storage)
+    first_replica.add_vertex("1")
+    second_replica = first_replica.fork()
+    with use_clock(lambda: 100):
+        first_replica.set_vertex_value("1", 3)
+        second_replica.set_vertex_value("1", 7)
+
+    # Act.
+    merged_replica = first_replica.merge(second_replica)
+
+    # Assert.
+    assert merged_replica.get_vertex_value("1") == 7
+    assert second_replica.merge(first_replica).get_vertex_value("1") == 7
@@ -0,0 +1,97 @@
+from lww_element_graph.structures.lww_element_graph import LwwElementGraph
+
+
+def _build_graph() -> LwwElementGraph:
+    graph = LwwElementGraph()
+    graph.add_vertex("1")
+    graph.add_vertex("2")
+    graph.add_vertex("3")
+    graph.add_vertex("4")
+    graph.add_edge("1", "2")
+    graph.add_edge("1", "3")
+    graph.add_edge("1", "4")
+    graph.add_edge("2", "3")
+    return graph
+
+
+def test_counts_follow_operations():
+    # Arrange.
+    graph = _build_graph()
+    assert graph.vertex_count() == 4
+    assert graph.edge_count() == 4
+
+    # Act.
+    graph.add_vertex("5")
+    graph.add_edge("4", "5")
+    graph.remove_vertex("1", cascade=True)
+
+    # Assert.
+    assert graph.vertex_count() == 4
+    assert graph.edge_count() == 2
+
+
+def test_counts_of_merged_graph():
+    # Arrange.
+    first_replica = _build_graph()
+    second_replica = first_replica.fork()
+    second_replica.remove_vertex("4", cascade=True)
+    second_replica.add_vertex("5")
+
+    # Act.
+    merged_replica = first_replica.merge(second_replica)
+
+    # Assert.
+    assert merged_replica.vertex_count() == 4
+    assert merged_replica.edge_count() == 3
+
+
+def test_degree():
+    # Arrange.
+    graph = _build_graph()
+
+    # Act & assert.
+    assert graph.degree("1") == 3
+    assert graph.degree("4") == 1
+    graph.remove_edge("1", "4")
+    assert graph.degree("4") == 0
+
+
+def test_highest_degree_vertices():
+    # Arrange.
+    graph = _build_graph()
+
+    # Act.
+    highest_degree_vertices = graph.highest_degree_vertices(2)
+
+    # Assert.
+    assert highest_degree_vertices[0] == ("1", 3)
+    assert highest_degree_vertices[1][1] == 2
+
+
+def test_iter_vertices_in_batches():
+    # Arrange.
+    graph = _build_graph()
+    graph.remove_vertex("1", cascade=True)
+
+    # Act.
+    batches = list(graph.iter_vertices(batch_size=2))
+
+    # Assert.
+    assert [len(batch) for batch in batches] == [2, 1]
+    assert {vertex_id for batch in batches for vertex_id in batch} == {"2", "3", "4"}
+
+
+def test_iter_edges_skips_edges_removed_during_iteration():
+    # Arrange.
+    graph = _build_graph()
+    batches = graph.iter_edges(batch_size=1)
+    first_batch = next(batches)
+
+    # Act.
+    for edge in graph.iter_edges(batch_size=1):
+        if edge != first_batch:
+            graph.remove_edge(*edge[0])
+    remaining_batches = list(batches)
+
+    # Assert.
+    assert remaining_batches == []
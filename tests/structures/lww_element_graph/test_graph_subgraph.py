@@ -0,0 +1,72 @@
+from freezegun import freeze_time
+
+from lww_element_graph.structures.lww_element_graph import LwwElementGraph
+
+
+def _build_path_graph() -> LwwElementGraph[int]:
+    graph: LwwElementGraph[int] = LwwElementGraph()
+    with freeze_time("2020-01-01", tick=True):
+        for i in range(6):
+            graph.add_vertex(str(i))
+            graph.set_vertex_value(str(i), i * 10)
+        for i in range(5):
+            graph.add_edge(str(i), str(i + 1))
+        graph.add_vertex("removed")
+        graph.add_edge("1", "removed")
+        graph.remove_vertex("removed", cascade=True)
+    return graph
+
+
+def test_extract_neighbourhood():
+    # Arrange.
+    graph = _build_path_graph()
+
+    # Act.
+    subgraph = graph.extract_neighbourhood(["1"], k=1)
+
+    # Assert.
+    assert set(subgraph.vertices.values()) == {"0", "1", "2"}
+    assert set(subgraph.edges.values()) == {
+        frozenset({"0", "1"}),
+        frozenset({"1", "2"}),
+    }
+    assert subgraph.get_vertex_value("2") == 20
+    # Edge leaving the neighbourhood is left out.
+    assert subgraph.has_edge("2", "3") is False
+    assert graph.merge(subgraph) == graph
+
+
+def test_extract_with_predicate():
+    # Arrange.
+    graph = _build_path_graph()
+
+    # Act.
+    subgraph = graph.extract(lambda vertex_id: vertex_id in {"1", "removed"})
+
+    # Assert.
+    assert set(subgraph.vertices.values()) == {"1"}
+    # Tombstones of the removed vertex and its edge are kept.
+    assert "removed" in subgraph.vertices.remove_timestamps
+    assert frozenset({"1", "removed"}) in subgraph.edges.remove_timestamps
+
+
+def test_extracted_subgraph_updates_merge_back():
+    # Arrange.
+    graph = _build_path_graph()
+    subgraph = graph.extract_neighbourhood(["1"], k=1)
+
+    # Act.
+    with freeze_time("2021-01-01", tick=True):
+        subgraph.set_vertex_value("1", 100)
+        subgraph.remove_edge("0", "1")
+        subgraph.add_edge("0", "2")
+        graph.add_vertex("6")
+    merged_graph = graph.merge(subgraph)
+
+    # Assert.
+    assert merged_graph.get_vertex_value("1") == 100
+    assert merged_graph.has_edge("0", "1") is False
+    assert merged_graph.has_edge("0", "2") is True
+    assert merged_graph.has_edge("4", "5") is True
+    assert merged_graph.has_vertex("6") is True
+    assert merged_graph == subgraph.merge(graph)
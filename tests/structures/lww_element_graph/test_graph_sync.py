@@ -0,0 +1,135 @@
+from lww_element_graph.structures.lww_element_graph import LwwElementGraph
+
+
+def _build_replicas() -> tuple[LwwElementGraph[int], LwwElementGraph[int]]:
+    first_replica: LwwElementGraph[int] = LwwElementGraph()
+    for i in range(200):
+        first_replica.add_vertex(str(i))
+    for i in range(199):
+        first_replica.add_edge(str(i), str(i + 1))
+
+    second_replica = first_replica.fork()
+    first_replica.add_vertex("new")
+    first_replica.add_edge("0", "new")
+    first_replica.set_vertex_value("5", 123)
+    first_replica.remove_edge("10", "11")
+    return first_replica, second_replica
+
+
+def test_delta_contains_only_missing_entries():
+    # Arrange.
+    first_replica, second_replica = _build_replicas()
+
+    # Act.
+    delta = first_replica.delta(second_replica.summary(error_rate=0.001))
+
+    # Assert.
+    entries_count = (
+        len(delta.vertices.add_timestamps)
+        + len(delta.vertices.remove_timestamps)
+        + len(delta.edges.add_timestamps)
+        + len(delta.edges.remove_timestamps)
+    )
+    # Changed entries and the entry of vertex "0" of the added edge.
+    assert entries_count <= 5
+    assert delta.vertices_values.keys() == {"5"}
+
+
+def test_sync_with_summary_and_digests():
+    # Arrange.
+    first_replica, second_replica = _build_replicas()
+    # High error rate, so the exact round has work to do.
+    summary = second_replica.summary(error_rate=0.5)
+
+    # Act.
+    second_replica = second_replica.merge(first_replica.delta(summary))
+    digests = second_replica.digests(expected_difference=8)
+    exact_delta = first_replica.exact_delta(digests)
+    assert exact_delta is not None
+    second_replica = second_replica.merge(exact_delta)
+
+    # Assert.
+    assert second_replica == first_replica.merge(second_replica)
+    assert second_replica.has_vertex("new") is True
+    assert second_replica.has_edge("0", "new") is True
+    assert second_replica.has_edge("10", "11") is False
+    assert second_replica.get_vertex_value("5") == 123
+
+
+def test_exact_delta_of_equal_replicas_is_empty():
+    # Arrange.
+    first_replica, _ = _build_replicas()
+    second_replica = first_replica.fork()
+
+    # Act.
+    delta = first_replica.exact_delta(second_replica.digests())
+
+    # Assert.
+    assert delta is not None
+    assert len(delta.vertices.add_timestamps) == 0
+    assert len(delta.edges.add_timestamps) == 0
+
+
+def test_exact_delta_is_proportional_to_difference():
+    # Arrange.
+    first_replica: LwwElementGraph[int] = LwwElementGraph()
+    for i in range(5000):
+        first_replica.add_vertex(str(i))
+    second_replica = first_replica.fork()
+    for i in range(100):
+        first_replica.add_vertex(f"first-{i}")
+        second_replica.add_vertex(f"second-{i}")
+    # Summary round left out a few entries of the first replica.
+    second_replica = second_replica.merge(
+        first_replica._partial(
+            first_replica.vertices._partial(
+                first_replica.vertices._entries_of(f"first-{i}" for i in range(95))
+            ),
+            first_replica.edges._partial(()),
+        )
+    )
+
+    # Act.
+    digests = second_replica.digests(expected_difference=105)
+    delta = first_replica.exact_delta(digests)
+
+    # Assert.
+    assert digests.vertices.cells_count < 200
+    assert delta is not None
+    assert set(delta.vertices.add_timestamps) == {f"first-{i}" for i in range(95, 100)}
+    assert second_replica.merge(delta) == first_replica.merge(second_replica)
+
+
+def test_exact_delta_of_too_small_digests():
+    # Arrange.
+    first_replica, second_replica = _build_replicas()
+    for i in range(100):
+        second_replica.add_vertex(f"second-{i}")
+
+    # Act.
+    delta = first_replica.exact_delta(second_replica.digests(expected_difference=4))
+    retried_delta = first_replica.exact_delta(
+        second_replica.digests(expected_difference=128)
+    )
+
+    # Assert.
+    assert delta is None
+    assert retried_delta is not None
+    assert second_replica.merge(retried_delta).has_vertex("new") is True
+
+
+def test_delta_includes_vertices_of_edges():
+    # Arrange.
+    first_replica, second_replica = _build_replicas()
+    # Summarized replica has the new vertex, like a Bloom filter false positive.
+    summarized_replica = second_replica.fork()
+    summarized_replica.vertices.add(
+        "new", timestamp=first_replica.vertices.add_timestamps["new"]
+    )
+
+    # Act.
+    delta = first_replica.delta(summarized_replica.summary())
+
+    # Assert.
+    assert "new" in delta.vertices.add_timestamps
+    assert second_replica.merge(delta).has_edge("0", "new") is True
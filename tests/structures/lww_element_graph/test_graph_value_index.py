@@ -0,0 +1,111 @@
+import random
+
+from freezegun import freeze_time
+
+from lww_element_graph.structures.lww_element_graph import LwwElementGraph
+
+
+def _build_graph() -> LwwElementGraph[int]:
+    graph: LwwElementGraph[int] = LwwElementGraph()
+    for vertex_id, value in (("1", 10), ("2", 20), ("3", 20), ("4", 40)):
+        graph.add_vertex(vertex_id)
+        graph.set_vertex_value(vertex_id, value)
+    graph.add_vertex("5")
+    return graph
+
+
+def _brute_force_range(graph: LwwElementGraph[int], low: int, high: int) -> set[str]:
+    return {
+        vertex_id
+        for vertex_id in graph.vertices.values()
+        if graph.get_vertex_value(vertex_id) is not None
+        and low <= graph.get_vertex_value(vertex_id) <= high
+    }
+
+
+def test_find_vertices_with_value():
+    # Arrange.
+    graph = _build_graph()
+
+    # Act & Assert.
+    assert sorted(graph.find_vertices_with_value(20)) == ["2", "3"]
+    assert graph.find_vertices_with_value(30) == []
+
+
+def test_vertices_in_value_range():
+    # Arrange.
+    graph = _build_graph()
+
+    # Act.
+    vertices = graph.vertices_in_value_range(15, 40)
+
+    # Assert.
+    assert vertices[-1] == "4"
+    assert sorted(vertices) == ["2", "3", "4"]
+
+
+def test_value_index_is_maintained():
+    # Arrange.
+    graph = _build_graph()
+    graph.find_vertices_with_value(20)  # Build the index.
+
+    # Act.
+    graph.set_vertex_value("2", 40)
+    graph.remove_vertex("4")
+    graph.set_vertex_value("5", 20)
+
+    # Assert.
+    assert sorted(graph.find_vertices_with_value(20)) == ["3", "5"]
+    assert graph.find_vertices_with_value(40) == ["2"]
+
+    # Act.
+    graph.add_vertex("4")
+
+    # Assert.
+    assert sorted(graph.find_vertices_with_value(40)) == ["2", "4"]
+
+
+def test_value_index_after_merge():
+    # Arrange.
+    first_replica = _build_graph()
+    with freeze_time("2999-01-01"):
+        second_replica = _build_graph()
+        second_replica.set_vertex_value("1", 20)
+    with freeze_time("2999-01-02"):
+        second_replica.remove_vertex("3")
+    first_replica.find_vertices_with_value(20)  # Build the index.
+
+    # Act.
+    merged_replica = first_replica.merge(second_replica)
+
+    # Assert.
+    assert merged_replica._value_index is not None
+    assert sorted(merged_replica.find_vertices_with_value(20)) == ["1", "2"]
+
+
+def test_value_index_matches_brute_force():
+    # Arrange.
+    generator = random.Random(1)
+    first_replica: LwwElementGraph[int] = LwwElementGraph()
+    second_replica = first_replica.fork()
+    first_replica.find_vertices_with_value(0)  # Build the index.
+
+    # Act.
+    for _ in range(500):
+        replica = generator.choice((first_replica, second_replica))
+        vertex_id = str(generator.randrange(50))
+        if not replica.has_vertex(vertex_id):
+            replica.add_vertex(vertex_id)
+        elif generator.random() < 0.3:
+            replica.remove_vertex(vertex_id)
+        else:
+            replica.set_vertex_value(vertex_id, generator.randrange(10))
+        if generator.random() < 0.05:
+            first_replica = first_replica.merge(second_replica)
+
+    # Assert.
+    for low in range(10):
+        for high in range(low, 10):
+            assert set(first_replica.vertices_in_value_range(low, high)) == (
+                _brute_force_range(first_replica, low, high)
+            )
@@ -0,0 +1,95 @@
+import random
+
+import pytest
+
+from lww_element_graph.structures.lww_element_set import AsOf, Bias, LwwElementSet
+
+
+def test_lookup_as_of():
+    # Arrange.
+    lww: LwwElementSet[str] = LwwElementSet()
+    lww.add("abc", timestamp=10)
+    lww.remove("abc", timestamp=20)
+
+    # Act & Assert.
+    assert lww.lookup_as_of("abc", 5) is None
+    assert lww.lookup_as_of("abc", 10) is True
+    assert lww.lookup_as_of("abc", 15) is True
+    assert lww.lookup_as_of("abc", 20) is False
+    assert lww.lookup_as_of("missing", 20) is False
+
+
+def test_lookup_as_of_after_re_add():
+    # Arrange.
+    lww: LwwElementSet[str] = LwwElementSet()
+    lww.add("abc", timestamp=10)
+    lww.remove("abc", timestamp=20)
+    lww.add("abc", timestamp=30)
+
+    # Act & Assert.
+    assert lww.lookup_as_of("abc", 5) is None
+    assert lww.lookup_as_of("abc", 25) is False
+    assert lww.lookup_as_of("abc", 30) is True
+
+
+@pytest.mark.parametrize("bias, expected", [(Bias.ADDS, True), (Bias.REMOVES, False)])
+def test_lookup_as_of_uses_bias(bias, expected):
+    # Arrange.
+    lww: LwwElementSet[str] = LwwElementSet(bias=bias)
+    lww.add("abc", timestamp=10)
+    lww.remove("abc", timestamp=10)
+
+    # Act & Assert.
+    assert lww.lookup_as_of("abc", 10) is expected
+
+
+def test_values_as_of():
+    # Arrange.
+    lww: LwwElementSet[frozenset[str]] = LwwElementSet()
+    lww.add(frozenset({"a", "b"}), timestamp=10)
+    lww.add(frozenset({"c", "d"}), timestamp=10)
+    lww.add(frozenset({"a", "c"}), timestamp=20)
+    lww.remove(frozenset({"c", "d"}), timestamp=30)
+
+    # Act & Assert.
+    assert lww.values_as_of(5) == AsOf(members=[], unknown=[frozenset({"c", "d"})])
+    assert set(lww.values_as_of(10).members) == {
+        frozenset({"a", "b"}),
+        frozenset({"c", "d"}),
+    }
+    assert len(lww.values_as_of(25).members) == 3
+    assert lww.values_as_of(25).unknown == []
+    assert set(lww.values_as_of(30).members) == {
+        frozenset({"a", "b"}),
+        frozenset({"a", "c"}),
+    }
+
+
+def test_values_as_of_after_updates():
+    # Arrange.
+    generator = random.Random(0)
+    lww: LwwElementSet[int] = LwwElementSet()
+    lww.values_as_of(0)  # Build index, so that updates maintain it.
+
+    # Act.
+    for timestamp in range(1, 500):
+        element = generator.randrange(50)
+        if generator.random() < 0.7:
+            lww.add(element, timestamp=timestamp)
+        else:
+            lww.remove(element, timestamp=timestamp)
+
+    # Assert.
+    for timestamp in range(0, 500, 25):
+        values = lww.values_as_of(timestamp)
+        assert sorted(values.members) == sorted(
+            element
+            for element in lww.add_timestamps
+            if lww.lookup_as_of(element, timestamp)
+        )
+        assert sorted(values.unknown) == sorted(
+            element
+            for element in lww.add_timestamps
+            if lww.lookup_as_of(element, timestamp) is None
+        )
+    assert sorted(lww.values_as_of(500).members) == sorted(lww.values())
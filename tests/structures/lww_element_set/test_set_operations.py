@@ -22,3 +22,18 @@ def test_remove():
 
     # Assert.
     assert lww.lookup("abc") is False
+
+
+def test_remove_all():
+    # Arrange.
+    lww: LwwElementSet[str] = LwwElementSet()
+    lww.add("abc", timestamp=1)
+    lww.add("def", timestamp=1)
+    lww.remove("def", timestamp=3)
+
+    # Act.
+    lww.remove_all(["abc", "def"], timestamp=2)
+
+    # Assert.
+    assert lww.lookup("abc") is False
+    assert lww.remove_timestamps == {"abc": 2, "def": 3}
@@ -0,0 +1,106 @@
+from lww_element_graph.structures.lww_element_set import LwwElementSet
+
+
+def test_updates_are_counted_in_version_vector():
+    # Arrange.
+    lww: LwwElementSet[str] = LwwElementSet(replica_id="a")
+
+    # Act.
+    lww.add("abc")
+    lww.remove("abc")
+
+    # Assert.
+    assert lww.version_vector == {"a": 2}
+
+
+def test_removes_of_many_elements_are_counted_in_version_vector():
+    # Arrange.
+    lww: LwwElementSet[str] = LwwElementSet(replica_id="a")
+
+    # Act.
+    lww.remove_all(["abc", "def"])
+    lww.remove_all([])
+
+    # Assert.
+    assert lww.version_vector == {"a": 2}
+
+
+def test_merged_set_dominates_both_sets():
+    # Arrange.
+    first_lww: LwwElementSet[str] = LwwElementSet()
+    first_lww.add("abc")
+    second_lww: LwwElementSet[str] = LwwElementSet()
+    second_lww.add("def")
+    assert first_lww.dominates(second_lww) is False
+    assert second_lww.dominates(first_lww) is False
+
+    # Act.
+    merged_lww = first_lww.merge(second_lww)
+
+    # Assert.
+    assert merged_lww.dominates(first_lww) is True
+    assert merged_lww.dominates(second_lww) is True
+
+
+def test_set_does_not_dominate_after_other_update():
+    # Arrange.
+    first_lww: LwwElementSet[str] = LwwElementSet()
+    first_lww.add("abc")
+    second_lww = first_lww.fork()
+    assert first_lww.dominates(second_lww) is True
+
+    # Act.
+    second_lww.remove("abc")
+
+    # Assert.
+    assert first_lww.dominates(second_lww) is False
+    assert first_lww.merge(second_lww).lookup("abc") is False
+
+
+def test_set_with_unknown_version_vector_is_never_dominated():
+    # Arrange.
+    first_lww: LwwElementSet[str] = LwwElementSet()
+    first_lww.add("abc")
+    partial_lww: LwwElementSet[str] = LwwElementSet(_initial_add_timestamps={"def": 1})
+
+    # Act & assert.
+    assert partial_lww.version_vector is None
+    assert first_lww.dominates(partial_lww) is False
+    assert first_lww.merge(partial_lww).lookup("def") is True
+
+
+def test_merge_with_set_with_unknown_version_vector_has_known_version_vector():
+    # Arrange.
+    first_lww: LwwElementSet[str] = LwwElementSet()
+    first_lww.add("abc")
+    second_lww = first_lww.fork()
+    partial_lww: LwwElementSet[str] = LwwElementSet(_initial_add_timestamps={"def": 1})
+
+    # Act.
+    merged_lww = first_lww.merge(partial_lww)
+    other_merged_lww = second_lww.merge(partial_lww)
+
+    # Assert.
+    assert merged_lww.dominates(first_lww) is True
+    assert merged_lww.fork().merge(merged_lww).dominates(merged_lww) is True
+    # Each merge with entries of unknown origin counts as a different update.
+    assert merged_lww.dominates(other_merged_lww) is False
+    assert other_merged_lww.dominates(merged_lww) is False
+
+
+def test_update_with_older_timestamp_keeps_dominated_merge_exact():
+    # Arrange.
+    first_lww: LwwElementSet[str] = LwwElementSet()
+    first_lww.add("abc", timestamp=100)
+    second_lww = LwwElementSet().merge(first_lww)
+
+    # Act.
+    # Clock of the second replica is behind the clock of the first one.
+    second_lww.add("abc", timestamp=50)
+    second_lww.remove("abc", timestamp=60)
+
+    # Assert.
+    assert second_lww.dominates(first_lww) is True
+    assert second_lww.add_timestamps["abc"] == 100
+    assert second_lww.lookup("abc") is True
+    assert second_lww.merge(first_lww).add_timestamps == {"abc": 100}
@@ -0,0 +1,39 @@
+from lww_element_graph.utils.bloom_filter import BloomFilter
+
+
+def test_no_false_negatives():
+    # Arrange.
+    bloom_filter = BloomFilter(capacity=1000)
+
+    # Act.
+    for i in range(1000):
+        bloom_filter.add(str(i).encode())
+
+    # Assert.
+    assert all(str(i).encode() in bloom_filter for i in range(1000))
+
+
+def test_false_positive_rate():
+    # Arrange.
+    bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom_filter.add(str(i).encode())
+
+    # Act.
+    false_positives = sum(str(-i).encode() in bloom_filter for i in range(1, 10001))
+
+    # Assert.
+    assert false_positives < 300
+
+
+def test_serialization():
+    # Arrange.
+    bloom_filter = BloomFilter(capacity=10)
+    bloom_filter.add(b"abc")
+
+    # Act.
+    deserialized_filter = BloomFilter.from_bytes(bloom_filter.to_bytes())
+
+    # Assert.
+    assert b"abc" in deserialized_filter
+    assert deserialized_filter.to_bytes() == bloom_filter.to_bytes()
@@ -0,0 +1,54 @@
+import pytest
+
+from lww_element_graph.utils.iblt import InvertibleBloomLookupTable
+
+
+def test_decode_difference():
+    # Arrange.
+    table = InvertibleBloomLookupTable.for_difference(100)
+    other_table = InvertibleBloomLookupTable.for_difference(100)
+    table.add_all(range(10000))
+    other_table.add_all(range(50, 10050))
+
+    # Act.
+    decoded_keys = table.subtract(other_table).decode()
+
+    # Assert.
+    assert decoded_keys is not None
+    own_keys, other_keys = decoded_keys
+    assert sorted(own_keys) == list(range(50))
+    assert sorted(other_keys) == list(range(10000, 10050))
+
+
+def test_decode_too_big_difference():
+    # Arrange.
+    table = InvertibleBloomLookupTable.for_difference(10)
+    table.add_all(range(1000))
+
+    # Act & Assert.
+    assert (
+        table.subtract(InvertibleBloomLookupTable.for_difference(10)).decode() is None
+    )
+
+
+def test_subtract_tables_of_different_sizes():
+    # Arrange.
+    table = InvertibleBloomLookupTable(30)
+    other_table = InvertibleBloomLookupTable(60)
+
+    # Act & Assert.
+    with pytest.raises(ValueError):
+        table.subtract(other_table)
+
+
+def test_serialization():
+    # Arrange.
+    table = InvertibleBloomLookupTable.for_difference(10)
+    table.add_all([2 ** 64 - 1, 0, 123])
+
+    # Act.
+    deserialized_table = InvertibleBloomLookupTable.from_bytes(table.to_bytes())
+
+    # Assert.
+    assert deserialized_table.to_bytes() == table.to_bytes()
+    assert deserialized_table.decode() == table.decode()
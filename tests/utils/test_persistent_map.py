@@ -0,0 +1,101 @@
+from lww_element_graph.utils.persistent_map import PersistentMap
+
+
+class CollidingKey:
+    """Key with a hash shared by many other keys."""
+
+    def __init__(self, value: int):
+        self.value = value
+
+    def __hash__(self):
+        return self.value % 3
+
+    def __eq__(self, other):
+        return isinstance(other, CollidingKey) and other.value == self.value
+
+
+def test_set_get_delete():
+    # Arrange.
+    persistent_map: PersistentMap[int, str] = PersistentMap()
+
+    # Act.
+    for key in range(1000):
+        persistent_map[key] = str(key)
+    for key in range(0, 1000, 2):
+        del persistent_map[key]
+
+    # Assert.
+    assert len(persistent_map) == 500
+    assert dict(persistent_map) == {key: str(key) for key in range(1, 1000, 2)}
+    assert 2 not in persistent_map
+    assert persistent_map.get(3) == "3"
+
+
+def test_copy_is_independent():
+    # Arrange.
+    persistent_map = PersistentMap((key, key) for key in range(100))
+
+    # Act.
+    copied_map = persistent_map.copy()
+    copied_map[0] = -1
+    del copied_map[1]
+    copied_map[100] = 100
+
+    # Assert.
+    assert dict(persistent_map) == {key: key for key in range(100)}
+    assert copied_map[0] == -1
+    assert 1 not in copied_map
+    assert len(copied_map) == 100
+
+
+def test_colliding_keys():
+    # Arrange.
+    persistent_map = PersistentMap((CollidingKey(key), key) for key in range(10))
+
+    # Act.
+    del persistent_map[CollidingKey(4)]
+
+    # Assert.
+    assert len(persistent_map) == 9
+    assert CollidingKey(4) not in persistent_map
+    assert persistent_map[CollidingKey(7)] == 7
+
+
+def test_merge():
+    # Arrange.
+    first_map = PersistentMap((key, key) for key in range(100))
+    second_map = first_map.copy()
+    second_map[0] = 50
+    second_map[50] = 0
+    second_map[100] = 100
+
+    # Act.
+    merged_map = first_map.merge(second_map, max)
+
+    # Assert.
+    assert len(merged_map) == 101
+    assert merged_map[0] == 50
+    assert merged_map[50] == 50
+    assert merged_map[100] == 100
+
+
+def test_diff():
+    # Arrange.
+    first_map = PersistentMap((key, key) for key in range(1000))
+    first_map[CollidingKey(1)] = 1
+    first_map[CollidingKey(4)] = 4
+    second_map = first_map.copy()
+    second_map[0] = 50
+    second_map[50] = 50
+    second_map[1000] = 1000
+    del second_map[500]
+    second_map[CollidingKey(4)] = 5
+    del first_map[999]
+
+    # Act.
+    changed_keys = list(first_map.diff(second_map))
+
+    # Assert.
+    assert len(changed_keys) == 5
+    assert set(changed_keys) == {0, 500, 999, 1000, CollidingKey(4)}
+    assert list(first_map.diff(first_map.copy())) == []
@@ -0,0 +1,167 @@
+import gc
+
+import pytest
+
+from lww_element_graph.utils.sqlite_storage import SqliteScratchStorage
+
+
+@pytest.fixture
+def storage():
+    with SqliteScratchStorage(cache_size=2) as storage:
+        yield storage
+
+
+def _tables(storage: SqliteScratchStorage) -> int:
+    return storage._execute("SELECT count(*) FROM sqlite_master WHERE type='table'")[0][
+        0
+    ]
+
+
+def test_mapping_operations(storage):
+    # Arrange.
+    sqlite_map = storage.new_map()
+
+    # Act.
+    sqlite_map["a"] = 1
+    sqlite_map[frozenset({"b", "c"})] = 2
+    sqlite_map["d"] = 3
+    sqlite_map["a"] = 4
+    del sqlite_map["d"]
+
+    # Assert.
+    assert dict(sqlite_map) == {"a": 4, frozenset({"c", "b"}): 2}
+    assert dict(sqlite_map.items()) == {"a": 4, frozenset({"c", "b"}): 2}
+    assert len(sqlite_map) == 2
+    assert "d" not in sqlite_map
+    assert sqlite_map.get("d") is None
+    with pytest.raises(KeyError):
+        sqlite_map["d"]
+    with pytest.raises(KeyError):
+        del sqlite_map["d"]
+
+
+def test_cache_is_bounded(storage):
+    # Arrange.
+    sqlite_map = storage.new_map()
+
+    # Act.
+    for i in range(10):
+        sqlite_map[str(i)] = i
+
+    # Assert.
+    assert len(sqlite_map._cache) == 2
+    assert [sqlite_map[str(i)] for i in range(10)] == list(range(10))
+
+
+def test_serialized_values(storage):
+    # Arrange.
+    sqlite_map = storage.new_map(serialize_values=True)
+
+    # Act.
+    sqlite_map["a"] = ("tuple", 1)
+    sqlite_map["b"] = None
+
+    # Assert.
+    assert dict(sqlite_map.items()) == {"a": ("tuple", 1), "b": None}
+    assert "b" in sqlite_map
+
+
+def test_iteration_over_many_pages(storage):
+    # Arrange.
+    sqlite_map = storage.new_map()
+    for i in range(2500):
+        sqlite_map[i] = i
+
+    # Act.
+    keys = list(sqlite_map)
+
+    # Assert.
+    assert sorted(keys) == list(range(2500))
+
+
+def test_copy_and_merge_max(storage):
+    # Arrange.
+    first_map = storage.new_map()
+    first_map.update({"a": 1, "b": 5})
+    second_map = first_map.copy()
+    second_map["a"] = 3
+    second_map["c"] = 1
+
+    # Act.
+    merged_map = first_map.merge_max(second_map)
+
+    # Assert.
+    assert dict(first_map) == {"a": 1, "b": 5}
+    assert dict(merged_map) == {"a": 3, "b": 5, "c": 1}
+
+
+def test_update_max(storage):
+    # Arrange.
+    sqlite_map = storage.new_map()
+    sqlite_map.update({"a": 1, "b": 5})
+    assert "c" not in sqlite_map
+
+    # Act.
+    sqlite_map.update_max([("a", 3), ("b", 3), ("c", 3)])
+
+    # Assert.
+    assert dict(sqlite_map) == {"a": 3, "b": 5, "c": 3}
+    assert sqlite_map["c"] == 3
+
+
+def test_table_is_dropped_with_map(storage):
+    # Arrange.
+    sqlite_map = storage.new_map()
+
+    # Act.
+    del sqlite_map
+    gc.collect()
+
+    # Assert.
+    assert _tables(storage) == 0
+
+
+def test_unsupported_key(storage):
+    # Act & Assert.
+    with pytest.raises(TypeError):
+        storage.new_map()[("a", "b")] = 1
+
+
+def test_adjacency_operations(storage):
+    # Arrange.
+    adjacency = storage.new_adjacency()
+
+    # Act.
+    adjacency.link("a", "b")
+    adjacency.link_all([("a", "c"), ("c", "d"), ("a", "b")])
+    adjacency.unlink("d", "c")
+    copied_adjacency = adjacency.copy()
+    adjacency.unlink("a", "b")
+
+    # Assert.
+    assert dict(adjacency.items()) == {
+        "a": frozenset({"c"}),
+        "c": frozenset({"a"}),
+    }
+    assert dict(copied_adjacency) == {
+        "a": frozenset({"b", "c"}),
+        "b": frozenset({"a"}),
+        "c": frozenset({"a"}),
+    }
+    assert len(copied_adjacency) == 3
+    assert adjacency.get("b") is None
+    assert "d" not in adjacency
+
+
+def test_adjacency_items_over_many_pages(storage):
+    # Arrange.
+    adjacency = storage.new_adjacency()
+    adjacency.link_all((str(i), str(i + 1)) for i in range(1500))
+
+    # Act.
+    items = dict(adjacency.items())
+
+    # Assert.
+    assert len(items) == 1501
+    assert items["0"] == frozenset({"1"})
+    assert items["700"] == frozenset({"699", "701"})
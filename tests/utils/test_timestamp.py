@@ -0,0 +1,16 @@
+import itertools
+
+from lww_element_graph.utils.timestamp import timestamp_now, use_clock
+
+
+def test_use_clock():
+    # Arrange.
+    clock = itertools.count(1)
+
+    # Act.
+    with use_clock(lambda: next(clock)):
+        timestamps = [timestamp_now(), timestamp_now()]
+
+    # Assert.
+    assert timestamps == [1, 2]
+    assert timestamp_now() > 2